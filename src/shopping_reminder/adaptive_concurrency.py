@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# 同時実行数の上限の初期値と範囲
+DEFAULT_INITIAL_LIMIT = 3
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 16
+
+# 過負荷とみなした際に上限に掛ける係数
+DEFAULT_BACKOFF = 0.5
+
+# 成功したリクエストでも、この秒数より遅ければ混雑しているとみなす
+DEFAULT_LATENCY_THRESHOLD_SECONDS = 3.0
+
+# 同じ混雑（同時に送信していたリクエストの 429 など）で繰り返し減らさないための間隔
+DEFAULT_DECREASE_COOLDOWN_SECONDS = 1.0
+
+# 他のスレッドによる上限の増加に気付くため、空きを待つ際に状態を確認し直す間隔
+_WAIT_POLL_SECONDS = 0.05
+
+
+def is_overload(status: Optional[int]) -> bool:
+    """Notion の処理能力を超えていることを示す結果か（None は応答が得られなかったことを表す）"""
+    return status is None or status == 429 or status >= 500
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD（加算増加・乗算減少）で調整する同時実行数の上限
+
+    成功したリクエストごとに 1/上限 ずつ（上限の数だけ成功すると1つ）増やし、429・5xx・
+    接続エラー・しきい値を超えた応答時間を観測すると backoff 倍に減らす。Notion の
+    レート制限は連携（APIキー）単位のため、同じAPIキーのクライアントと並行処理で共有する。
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff: float = DEFAULT_BACKOFF,
+        latency_threshold: float = DEFAULT_LATENCY_THRESHOLD_SECONDS,
+        decrease_cooldown: float = DEFAULT_DECREASE_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+        self.decrease_cooldown = decrease_cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._decreased_at: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """現在の同時実行数の上限"""
+        with self._lock:
+            return int(self._limit)
+
+    def record(self, status: Optional[int], seconds: float) -> None:
+        """リクエストの結果（応答ステータスと所要秒数）を反映"""
+        if is_overload(status):
+            self._decrease(f"status {status}" if status is not None else "connection error")
+        elif status is not None and status < 400:
+            if seconds > self.latency_threshold:
+                self._decrease(f"latency {seconds:.2f}s")
+            else:
+                self._increase()
+        # それ以外の 4xx はリクエスト自体の誤りのため上限を変えない
+
+    def _increase(self) -> None:
+        with self._lock:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _decrease(self, reason: str) -> None:
+        with self._lock:
+            now = self.clock()
+            if self._decreased_at is not None and now - self._decreased_at < self.decrease_cooldown:
+                return
+            self._decreased_at = now
+            previous = int(self._limit)
+            self._limit = max(float(self.min_limit), self._limit * self.backoff)
+            limit = int(self._limit)
+        logger.warning(f"Reducing concurrency limit {previous} -> {limit} ({reason})")
+
+
+class AdaptiveLimiter:
+    """スレッドの並行処理で、同時に実行する数を AdaptiveConcurrencyLimit の範囲に抑える
+
+    max_concurrency はスレッドプールの大きさなど、並行処理側の上限。
+    """
+
+    def __init__(self, limit: AdaptiveConcurrencyLimit, max_concurrency: int) -> None:
+        self.limit = limit
+        self.max_concurrency = max_concurrency
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= min(self.limit.limit, self.max_concurrency):
+                self._condition.wait(_WAIT_POLL_SECONDS)
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncAdaptiveLimiter:
+    """AdaptiveLimiter の asyncio 版（1つのイベントループ内で使う）"""
+
+    def __init__(self, limit: AdaptiveConcurrencyLimit, max_concurrency: int) -> None:
+        self.limit = limit
+        self.max_concurrency = max_concurrency
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            while self._in_flight >= min(self.limit.limit, self.max_concurrency):
+                try:
+                    await asyncio.wait_for(self._condition.wait(), _WAIT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+_limits_lock = threading.Lock()
+_limits: Dict[str, AdaptiveConcurrencyLimit] = {}
+
+
+def get_concurrency_limit(api_key: str) -> AdaptiveConcurrencyLimit:
+    """APIキーごとに共有される同時実行数の上限を返す"""
+    with _limits_lock:
+        limit = _limits.get(api_key)
+        if limit is None:
+            limit = _limits[api_key] = AdaptiveConcurrencyLimit()
+        return limit
+
+
+def reset_concurrency_limits() -> None:
+    """共有している上限を破棄（主にテスト用）"""
+    with _limits_lock:
+        _limits.clear()
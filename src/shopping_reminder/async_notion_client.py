@@ -0,0 +1,512 @@
+import asyncio
+import email.utils
+import ssl
+import time
+import urllib.error
+import urllib.parse
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lambda環境での絶対インポート
+from adaptive_concurrency import AdaptiveConcurrencyLimit, get_concurrency_limit
+from circuit_breaker import (
+    CircuitBreakerRegistry,
+    endpoint_key,
+    get_default_registry,
+    is_failure_status,
+)
+from config import Config
+import json_codec
+from logger import get_logger
+from models import NotificationResult, OmittedItems, ShoppingItem
+from notion_client import OLDEST_FIRST, NotionAPIError, NotionClientBase
+from usage import UsageTracker, get_usage_tracker
+
+logger = get_logger(__name__)
+
+
+class HttpProtocolError(Exception):
+    """HTTPレスポンスの形式が不正な場合のエラー"""
+
+    pass
+
+
+@dataclass
+class HttpResponse:
+    """HTTPレスポンス"""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class AsyncRateLimiter:
+    """トークンバケット方式のレートリミッター
+
+    Notion API の平均リクエストレート（1インテグレーションあたり毎秒3リクエスト）に
+    合わせるため、イベントループ上の全リクエストで共有して使用する。
+    """
+
+    def __init__(self, rate_per_second: float = 3.0, burst: int = 3) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self) -> None:
+        """トークンを1つ取得するまで待機"""
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                elapsed = now - self._updated_at
+                self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+
+# レート制限はインテグレーション（APIキー）単位のため、同じキーのクライアント間で共有する
+_shared_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def get_shared_rate_limiter(api_key: str) -> AsyncRateLimiter:
+    """APIキーごとに共有されるレートリミッターを返す"""
+    limiter = _shared_rate_limiters.get(api_key)
+    if limiter is None:
+        limiter = _shared_rate_limiters.setdefault(api_key, AsyncRateLimiter())
+    return limiter
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Retry-After ヘッダー（秒数またはHTTP日付）を待機秒数に変換"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Unparseable Retry-After header: {value!r}")
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+
+
+@dataclass
+class _ConnectionPool:
+    """イベントループ単位で保持するkeep-alive接続のプール"""
+
+    loop: asyncio.AbstractEventLoop
+    semaphore: asyncio.Semaphore
+    idle: List[_Connection] = field(default_factory=list)
+
+
+class AsyncHTTPClient:
+    """asyncio ストリーム上の最小限の HTTP/1.1 クライアント（keep-alive 対応）"""
+
+    def __init__(self, base_url: str, max_connections: int = 10, timeout: float = 30.0) -> None:
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname or ""
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.base_path = parsed.path.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._pool: Optional[_ConnectionPool] = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes = b"",
+        idempotent: bool = False,
+    ) -> HttpResponse:
+        """リクエストを送信してレスポンスを返す
+
+        再利用した keep-alive 接続が切れていた場合は、idempotent=True の
+        リクエストに限り新しい接続で1回だけ再送する。コメント投稿のような
+        非冪等なリクエストは、サーバーが処理済みの可能性があるため再送しない。
+        """
+        pool = self._get_pool()
+        async with pool.semaphore:
+            connection, reused = await self._acquire_connection(pool)
+            try:
+                response, keep_alive = await asyncio.wait_for(
+                    self._send(connection, method, path, headers, body), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                self._close(connection)
+                if not (reused and idempotent):
+                    raise
+                # 再利用した接続がサーバー側で閉じられていた場合は新しい接続で再送
+                logger.info(f"Reused connection was closed, reconnecting: {e}")
+                connection = await self._open_connection()
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._send(connection, method, path, headers, body), self.timeout
+                    )
+                except BaseException:
+                    self._close(connection)
+                    raise
+            except BaseException:
+                self._close(connection)
+                raise
+
+            if keep_alive:
+                pool.idle.append(connection)
+            else:
+                self._close(connection)
+            return response
+
+    async def close(self) -> None:
+        """保持している接続を全て閉じる"""
+        if self._pool is None:
+            return
+        idle, self._pool.idle = self._pool.idle, []
+        for connection in idle:
+            self._close(connection)
+            try:
+                await connection.writer.wait_closed()
+            except OSError:
+                pass
+
+    def _get_pool(self) -> _ConnectionPool:
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool.loop is not loop:
+            # 別のイベントループの接続は使えないため破棄する
+            self._pool = _ConnectionPool(
+                loop=loop, semaphore=asyncio.Semaphore(self.max_connections)
+            )
+        return self._pool
+
+    async def _acquire_connection(self, pool: _ConnectionPool) -> Tuple[_Connection, bool]:
+        while pool.idle:
+            connection = pool.idle.pop()
+            if not connection.writer.is_closing() and not connection.reader.at_eof():
+                return connection, True
+            self._close(connection)
+        return await self._open_connection(), False
+
+    async def _open_connection(self) -> _Connection:
+        if self.scheme == "https" and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                self.host,
+                self.port,
+                ssl=self._ssl_context,
+                server_hostname=self.host if self._ssl_context else None,
+            ),
+            self.timeout,
+        )
+        return _Connection(reader=reader, writer=writer)
+
+    async def _send(
+        self,
+        connection: _Connection,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Tuple[HttpResponse, bool]:
+        request_headers = {
+            "Host": self.host if self.port in (80, 443) else f"{self.host}:{self.port}",
+            "Connection": "keep-alive",
+            "Content-Length": str(len(body)),
+            **headers,
+        }
+        head = f"{method} {self.base_path}{path} HTTP/1.1\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+        connection.writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await connection.writer.drain()
+
+        return await self._read_response(connection.reader)
+
+    async def _read_response(self, reader: asyncio.StreamReader) -> Tuple[HttpResponse, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise HttpProtocolError(f"Malformed status line: {status_line!r}")
+        version, status = parts[0], int(parts[1])
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            content_length = response_headers["content-length"]
+            if not content_length.isdigit():
+                raise HttpProtocolError(f"Malformed Content-Length: {content_length!r}")
+            body = await reader.readexactly(int(content_length))
+        else:
+            body = await reader.read()
+            response_headers["connection"] = "close"
+
+        connection_header = response_headers.get("connection", "").lower()
+        keep_alive = connection_header != "close" and version != "HTTP/1.0"
+        return HttpResponse(status=status, headers=response_headers, body=body), keep_alive
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError as e:
+                raise HttpProtocolError(f"Malformed chunk size: {size_line!r}") from e
+            if size == 0:
+                # トレーラーを読み捨てる
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    @staticmethod
+    def _close(connection: _Connection) -> None:
+        if not connection.writer.is_closing():
+            connection.writer.close()
+
+
+class AsyncNotionClient(NotionClientBase):
+    """asyncio ネイティブな Notion API クライアント
+
+    NotionClient と同じ操作を提供し、1つのイベントループ上で多数のクエリや
+    コメント投稿を同時に実行できる。リクエストはレートリミッター（省略時は
+    同じAPIキーのクライアント間で共有）と同時接続数の上限で制御され、
+    429 応答は Retry-After に従って再試行する。`async with` で使用すると
+    終了時に接続を閉じる。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        usage: Optional[UsageTracker] = None,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+    ) -> None:
+        super().__init__(config, base_url)
+        self.http = AsyncHTTPClient(self.base_url, max_connections=max_connections, timeout=timeout)
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(config.notion_api_key)
+        self.max_retries = max_retries
+        # 同期クライアントと同じレジストリを使い、障害の検知をエンドポイント単位で共有する
+        self.circuit_breakers = circuit_breakers or get_default_registry()
+        self.usage = usage or get_usage_tracker()
+        # 応答に応じて調整する同時実行数の上限（複数ページへの投稿などの並行処理で使う）
+        self.concurrency = concurrency or get_concurrency_limit(config.notion_api_key)
+
+    async def __aenter__(self) -> "AsyncNotionClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def query_unchecked_items(self) -> List[ShoppingItem]:
+        """未チェック項目をデータベースから取得"""
+        path = f"/databases/{self.config.notion_database_id}/query"
+        logger.info(f"Querying Notion database asynchronously: {path}")
+
+        results, _ = await self._paginate(path, self._build_filter_for_unchecked_items())
+        logger.info(f"Query completed. Total items found: {len(results)}")
+        return results
+
+    async def probe_watermark(self) -> str:
+        """1件だけのクエリでデータベースの最終編集のウォーターマークを取得（NotionClient と同じ）"""
+        path = f"/databases/{self.config.notion_database_id}/query"
+        logger.info(f"Probing database for changes asynchronously: {path}")
+        response_data = await self._post(path, self._build_probe_body(), idempotent=True)
+        return self._parse_watermark(response_data)
+
+    async def query_top_unchecked_items(
+        self, limit: int
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """古い順に未チェック項目を limit 件まで取得（NotionClient と同じ）"""
+        path = f"/databases/{self.config.notion_database_id}/query"
+        logger.info(f"Querying top {limit} unchecked items asynchronously: {path}")
+
+        results, has_more = await self._paginate(
+            path, self._build_filter_for_unchecked_items(), sorts=OLDEST_FIRST, limit=limit
+        )
+        return self._truncate_top_items(results, limit, has_more)
+
+    async def _paginate(
+        self,
+        path: str,
+        filter_obj: Dict[str, Any],
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[ShoppingItem], bool]:
+        """カーソルをたどって結果を取得（limit 件集まった時点で打ち切る）"""
+        results: List[ShoppingItem] = []
+        start_cursor = None
+        page_count = 0
+
+        while True:
+            page_count += 1
+            body = self._build_query_body(filter_obj, start_cursor, sorts=sorts)
+            logger.info(f"Sending request for page {page_count}")
+
+            # データベースクエリは読み取り専用のため、接続切れ時の再送を許可する
+            response_data = await self._post(path, body, idempotent=True)
+            results.extend(self._parse_query_results(response_data))
+
+            has_more = bool(response_data["has_more"])
+            if not has_more or (limit is not None and len(results) >= limit):
+                return results, has_more
+
+            start_cursor = response_data.get("next_cursor")
+            logger.info(f"Moving to next page with cursor: {start_cursor}")
+
+    async def create_comment(
+        self,
+        items: List[ShoppingItem],
+        stale_items: Optional[Dict[str, int]] = None,
+        omitted: Optional[OmittedItems] = None,
+    ) -> NotificationResult:
+        """未チェック項目のリストからコメントを作成"""
+        if not items:
+            logger.info("No unchecked items found - skipping comment creation")
+            return NotificationResult(
+                success=True, message="未チェック項目はありません。通知は送信されませんでした。"
+            )
+
+        try:
+            message = self.format_comment_message(items, stale_items, omitted)
+            logger.info(f"Comment message: {message}")
+
+            body = self.build_comment_body(message, self.config.notion_page_id)
+            await self._post("/comments", body)
+
+            logger.info(f"Comment created successfully for {len(items)} items")
+            return NotificationResult(
+                success=True, message=f"{len(items)}件の未チェック項目について通知を送信しました。"
+            )
+
+        except NotionAPIError as e:
+            logger.exception(f"Failed to create comment: {str(e)}")
+            return NotificationResult(
+                success=False, message="コメントの作成に失敗しました。", error=str(e)
+            )
+
+    async def post_comment_payload(self, payload: bytes) -> Dict[str, Any]:
+        """エンコード済みのコメント作成リクエストを送信（再送はしない）"""
+        return await self._post_bytes("/comments", payload)
+
+    async def close(self) -> None:
+        """保持しているHTTP接続を閉じる"""
+        await self.http.close()
+
+    async def _post(
+        self, path: str, data: Dict[str, Any], idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """Notion APIにPOSTリクエストを送信"""
+        return await self._post_bytes(path, json_codec.dumps(data), idempotent)
+
+    async def _post_bytes(
+        self, path: str, payload: bytes, idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """エンコード済みのボディでPOSTリクエストを送信（429は再試行）"""
+        logger.info(f"Making async POST request to: {path} ({len(payload)} bytes)")
+        endpoint = endpoint_key("POST", f"{self.base_url}{path}")
+        breaker = self.circuit_breakers.get(endpoint)
+        target = self.config.notion_database_id
+
+        attempt = 0
+        while True:
+            try:
+                breaker.before_request()
+            except urllib.error.URLError as e:
+                # サーキットが開いている（CircuitOpenError）
+                logger.warning(f"Skipping request: {e.reason}")
+                raise NotionAPIError(f"URL error: {e.reason}") from e
+
+            await self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = await self.http.request(
+                    "POST", path, self._build_headers(), payload, idempotent=idempotent
+                )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                breaker.record_failure()
+                elapsed = time.perf_counter() - started
+                self.usage.record(target, endpoint, len(payload), 0, elapsed, error=True)
+                self.concurrency.record(None, elapsed)
+                logger.exception(f"Connection error occurred: {e}")
+                raise NotionAPIError(f"Connection error: {e}") from e
+            except HttpProtocolError as e:
+                breaker.record_failure()
+                self.usage.record(
+                    target, endpoint, len(payload), 0, time.perf_counter() - started, error=True
+                )
+                logger.exception(f"Malformed response: {e}")
+                raise NotionAPIError(f"Malformed response: {e}") from e
+
+            elapsed = time.perf_counter() - started
+            self.usage.record(
+                target,
+                endpoint,
+                len(payload),
+                len(response.body),
+                elapsed,
+                error=response.status != 200,
+            )
+            self.concurrency.record(response.status, elapsed)
+            logger.info(f"Response status code: {response.status}")
+            if is_failure_status(response.status):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status == 429 and attempt < self.max_retries:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                logger.warning(f"Rate limited by Notion API, retrying after {retry_after}s")
+                self.usage.record_retry(target, endpoint)
+                await asyncio.sleep(retry_after)
+                attempt += 1
+                continue
+
+            if response.status != 200:
+                error_message = response.body.decode("utf-8", errors="replace")
+                logger.error(f"API request failed with status {response.status}")
+                raise NotionAPIError(f"HTTP error {response.status}: {error_message}")
+
+            try:
+                return json_codec.loads(response.body)
+            except json_codec.JSONDecodeError as e:
+                logger.exception(f"JSON decode error occurred: {e}")
+                raise NotionAPIError(f"JSON decode error: {e}") from e
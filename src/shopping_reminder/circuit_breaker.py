@@ -0,0 +1,200 @@
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Callable, Dict, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+from transport import Transport, TransportRequest, TransportResponse
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# パス中でIDが続くコレクション（エンドポイント単位で集計するためIDは伏せる）
+_ID_COLLECTIONS = ("databases", "pages", "blocks", "users", "comments")
+
+
+class CircuitOpenError(urllib.error.URLError):
+    """サーキットが開いているためリクエストを送信しなかった"""
+
+    def __init__(self, key: str, retry_after: float) -> None:
+        super().__init__(f"Circuit open for {key} (retry after {retry_after:.1f}s)")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """1つのエンドポイントのサーキットブレーカー
+
+    closed: 通常どおり送信し、連続失敗が failure_threshold に達すると open にする。
+    open: recovery_timeout が経過するまで送信せずに失敗させる。
+    half_open: half_open_max_calls 件だけ試験的に送信し、成功すれば closed、
+    失敗すれば再び open にする。試験的な送信の結果が recovery_timeout 以内に
+    記録されない場合（呼び出しのキャンセルなど）は、改めて試験的な送信を許可する。
+    """
+
+    def __init__(
+        self,
+        key: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_request(self) -> None:
+        """送信してよいか判定（送信できない場合は CircuitOpenError）"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                raise CircuitOpenError(self.key, self._remaining_open_time())
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.key, 0.0)
+                self._half_open_calls += 1
+                logger.info(f"Circuit half-open for {self.key}: sending probe request")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit closed for {self.key}")
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit opened for {self.key} after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = self.clock()
+                self._half_open_calls = 0
+
+    def _maybe_half_open(self) -> None:
+        now = self.clock()
+        if self._state == OPEN and self._remaining_open_time() <= 0:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_at = now
+        elif self._state == HALF_OPEN and now - self._half_open_at >= self.recovery_timeout:
+            self._half_open_calls = 0
+            self._half_open_at = now
+
+    def _remaining_open_time(self) -> float:
+        return self._opened_at + self.recovery_timeout - self.clock()
+
+
+class CircuitBreakerRegistry:
+    """エンドポイントごとのサーキットブレーカーを保持する"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(
+                    key,
+                    failure_threshold=self.failure_threshold,
+                    recovery_timeout=self.recovery_timeout,
+                    half_open_max_calls=self.half_open_max_calls,
+                    clock=self.clock,
+                )
+            return breaker
+
+    def reset(self) -> None:
+        """全てのサーキットを破棄（テスト用）"""
+        with self._lock:
+            self._breakers.clear()
+
+
+# ウォームスタートした実行環境では同じレジストリを共有する
+_default_registry = CircuitBreakerRegistry()
+
+
+def get_default_registry() -> CircuitBreakerRegistry:
+    return _default_registry
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """メソッドとURLからエンドポイントのキーを作成（ページIDなどは伏せる）"""
+    parsed = urllib.parse.urlsplit(url)
+    segments = parsed.path.split("/")
+    for index in range(1, len(segments)):
+        if segments[index - 1] in _ID_COLLECTIONS and segments[index]:
+            segments[index] = "{id}"
+    return f"{method.upper()} {parsed.netloc}{'/'.join(segments)}"
+
+
+def is_failure_status(status: int) -> bool:
+    """Notion 側の障害とみなす応答ステータスか"""
+    return status >= 500
+
+
+class CircuitBreakerTransport(Transport):
+    """エンドポイントごとのサーキットブレーカーを通して送信する
+
+    接続エラー・タイムアウト・5xx 応答を失敗として数える。4xx はリクエスト側の問題のため
+    Notion は正常に応答しているものとして扱う。
+    """
+
+    def __init__(self, inner: Transport, registry: Optional[CircuitBreakerRegistry] = None) -> None:
+        self.inner = inner
+        self.registry = registry or get_default_registry()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        breaker = self.registry.get(endpoint_key(request.method, request.url))
+        breaker.before_request()
+        try:
+            response = self.inner.send(request)
+        except urllib.error.HTTPError as e:
+            if is_failure_status(e.code):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except Exception:
+            # URLError などの接続エラーと、タイムアウトまで応答が無かった場合（socket.timeout）
+            breaker.record_failure()
+            raise
+
+        if is_failure_status(response.status):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
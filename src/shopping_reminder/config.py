@@ -1,13 +1,26 @@
-import os
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import FrozenInstanceError, dataclass
+from typing import Dict, Any, List, Optional
 
 # Lambda環境での絶対インポート
+from config_source import ConfigSource, ConfigSourceError, get_default_source
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# 長期間未チェックとして強調表示するまでの既定の日数
+DEFAULT_STALE_ITEM_DAYS = 5
+
+# Webhook で組み立てた項目の状態を、全件取得で再同期するまでの既定の日数
+DEFAULT_ITEM_STATE_MAX_AGE_DAYS = 7
+
+# 変更が無い場合に前回のクエリ結果を再利用する既定の日数（項目の削除を補うための全件取得の間隔）
+DEFAULT_QUERY_CACHE_MAX_AGE_DAYS = 7
+
+# HTTP で未チェック項目を返す際に、Notion に問い合わせずに直近の結果を返す既定の秒数
+DEFAULT_ITEMS_CACHE_TTL_SECONDS = 30
+
+
 class ConfigError(Exception):
     """設定に関するエラー"""
 
@@ -16,58 +29,310 @@ class ConfigError(Exception):
 
 @dataclass
 class Config:
-    """アプリケーションの設定を管理するクラス"""
+    """アプリケーションの設定を管理するクラス
+
+    複数のスレッドから同じ設定を共有できるよう、読み込み後は変更できない。
+    """
 
     notion_api_key: str
     notion_database_id: str
     notion_page_id: str
+    notion_page_ids: List[str]
+    history_db_path: Optional[str]
+    stale_item_days: int
+    query_shards: int
+    max_comment_items: Optional[int]
+    item_state_db_path: Optional[str]
+    item_state_max_age_days: int
+    webhook_verification_token: Optional[str]
+    hedge_read_percentile: Optional[int]
+    notion_api_base_url: Optional[str]
+    query_cache_db_path: Optional[str]
+    query_cache_max_age_days: int
+    idempotency_db_path: Optional[str]
+    daily_request_quota: Optional[int]
+    items_access_token: Optional[str]
+    items_cache_ttl_seconds: int
 
-    def __init__(self) -> None:
-        """環境変数から設定を読み込み"""
-        logger.info("Loading configuration from environment variables")
+    def __init__(self, source: Optional[ConfigSource] = None) -> None:
+        """設定の取得元（省略時は環境変数など既定の取得元）から設定を読み込み"""
+        if source is None:
+            try:
+                source = get_default_source()
+            except ConfigSourceError as e:
+                logger.error(f"Failed to build configuration source: {e}")
+                raise ConfigError(str(e)) from e
+        logger.info(f"Loading configuration from {source.name}")
 
-        self.notion_api_key = self._get_required_env_var("NOTION_API_KEY")
+        self.notion_api_key = self._get_required_source_value(source, "NOTION_API_KEY")
         logger.info(f"NOTION_API_KEY loaded (length: {len(self.notion_api_key)} chars)")
 
-        self.notion_database_id = self._get_required_env_var("NOTION_DATABASE_ID")
+        self.notion_database_id = self._get_required_source_value(source, "NOTION_DATABASE_ID")
         logger.info(f"NOTION_DATABASE_ID: {self.notion_database_id}")
 
-        self.notion_page_id = self._get_required_env_var("NOTION_PAGE_ID")
+        self.notion_page_id = self._get_required_source_value(source, "NOTION_PAGE_ID")
         logger.info(f"NOTION_PAGE_ID: {self.notion_page_id}")
 
+        # 通知先ページの追加指定（任意、カンマ区切り）
+        extra_page_ids = self._get_optional_source_value(source, "NOTION_PAGE_IDS")
+        self.notion_page_ids = self._build_page_ids(self.notion_page_id, extra_page_ids)
+        logger.info(f"Notification destinations: {len(self.notion_page_ids)} pages")
+
+        # 未チェック項目の履歴（任意）
+        self.history_db_path = self._get_optional_source_value(source, "HISTORY_DB_PATH")
+        self.stale_item_days = self._parse_positive_int(
+            self._get_optional_source_value(source, "STALE_ITEM_DAYS"),
+            "STALE_ITEM_DAYS",
+            DEFAULT_STALE_ITEM_DAYS,
+        )
+        if self.history_db_path:
+            logger.info(f"HISTORY_DB_PATH: {self.history_db_path}")
+
+        # データベースを作成日時で分割して並行取得する数（1の場合は分割しない）
+        self.query_shards = self._parse_positive_int(
+            self._get_optional_source_value(source, "QUERY_SHARDS"), "QUERY_SHARDS", 1
+        )
+
+        # コメントに載せる項目数の上限（任意、指定時は古い順に上位のみ取得）
+        self.max_comment_items = self._parse_optional_positive_int(
+            self._get_optional_source_value(source, "MAX_COMMENT_ITEMS"), "MAX_COMMENT_ITEMS"
+        )
+
+        # Webhook のイベントで更新する項目の状態（任意）
+        self.item_state_db_path = self._get_optional_source_value(source, "ITEM_STATE_DB_PATH")
+        self.item_state_max_age_days = self._parse_positive_int(
+            self._get_optional_source_value(source, "ITEM_STATE_MAX_AGE_DAYS"),
+            "ITEM_STATE_MAX_AGE_DAYS",
+            DEFAULT_ITEM_STATE_MAX_AGE_DAYS,
+        )
+        self.webhook_verification_token = self._get_optional_source_value(
+            source, "NOTION_WEBHOOK_VERIFICATION_TOKEN"
+        )
+        if self.item_state_db_path:
+            logger.info(f"ITEM_STATE_DB_PATH: {self.item_state_db_path}")
+
+        # 読み取りのリクエストをヘッジする応答時間のパーセンタイル（任意、未設定の場合はヘッジしない）
+        self.hedge_read_percentile = self._parse_percentile(
+            self._get_optional_source_value(source, "HEDGE_READ_PERCENTILE"),
+            "HEDGE_READ_PERCENTILE",
+        )
+
+        # Notion API の接続先（任意、検証用のサーバーなどに向ける場合）
+        self.notion_api_base_url = self._get_optional_source_value(source, "NOTION_API_BASE_URL")
+
+        # 変更検出で再利用するクエリ結果（任意）
+        self.query_cache_db_path = self._get_optional_source_value(source, "QUERY_CACHE_DB_PATH")
+        self.query_cache_max_age_days = self._parse_positive_int(
+            self._get_optional_source_value(source, "QUERY_CACHE_MAX_AGE_DAYS"),
+            "QUERY_CACHE_MAX_AGE_DAYS",
+            DEFAULT_QUERY_CACHE_MAX_AGE_DAYS,
+        )
+        if self.query_cache_db_path:
+            logger.info(f"QUERY_CACHE_DB_PATH: {self.query_cache_db_path}")
+
+        # 再試行されたイベントの重複通知を防ぐ記録（任意、未設定の場合はプロセス内に記録）
+        self.idempotency_db_path = self._get_optional_source_value(source, "IDEMPOTENCY_DB_PATH")
+
+        # 1日あたりのリクエスト数の上限（任意、超えた場合は上位N件のみ取得する）
+        self.daily_request_quota = self._parse_optional_positive_int(
+            self._get_optional_source_value(source, "DAILY_REQUEST_QUOTA"), "DAILY_REQUEST_QUOTA"
+        )
+
+        # HTTP（関数 URL の GET）で未チェック項目を返す際のトークンとキャッシュの秒数（任意）
+        self.items_access_token = self._get_optional_source_value(source, "ITEMS_ACCESS_TOKEN")
+        self.items_cache_ttl_seconds = self._parse_positive_int(
+            self._get_optional_source_value(source, "ITEMS_CACHE_TTL_SECONDS"),
+            "ITEMS_CACHE_TTL_SECONDS",
+            DEFAULT_ITEMS_CACHE_TTL_SECONDS,
+        )
+
+        self._freeze()
         logger.info("Configuration loaded successfully")
 
     @classmethod
-    def from_dict(cls, config_dict: Dict[str, Any]) -> "Config":
-        """辞書から設定を作成"""
+    def from_dict(
+        cls, config_dict: Dict[str, Any], source: Optional[ConfigSource] = None
+    ) -> "Config":
+        """辞書から設定を作成（辞書にないキーは source が指定されていればそこから補完）"""
         config = cls.__new__(cls)  # __init__を呼ばずにインスタンスを作成
 
-        config.notion_api_key = cls._get_required_dict_value(config_dict, "NOTION_API_KEY")
-        config.notion_database_id = cls._get_required_dict_value(config_dict, "NOTION_DATABASE_ID")
-        config.notion_page_id = cls._get_required_dict_value(config_dict, "NOTION_PAGE_ID")
+        config.notion_api_key = cls._get_required_dict_value(config_dict, "NOTION_API_KEY", source)
+        config.notion_database_id = cls._get_required_dict_value(
+            config_dict, "NOTION_DATABASE_ID", source
+        )
+        config.notion_page_id = cls._get_required_dict_value(config_dict, "NOTION_PAGE_ID", source)
+        config.notion_page_ids = cls._build_page_ids(
+            config.notion_page_id,
+            cls._get_optional_dict_value(config_dict, "NOTION_PAGE_IDS", source),
+        )
+        config.history_db_path = (
+            cls._get_optional_dict_value(config_dict, "HISTORY_DB_PATH", source) or None
+        )
+        config.stale_item_days = cls._parse_positive_int(
+            cls._get_optional_dict_value(config_dict, "STALE_ITEM_DAYS", source),
+            "STALE_ITEM_DAYS",
+            DEFAULT_STALE_ITEM_DAYS,
+        )
+        config.query_shards = cls._parse_positive_int(
+            cls._get_optional_dict_value(config_dict, "QUERY_SHARDS", source), "QUERY_SHARDS", 1
+        )
+        config.max_comment_items = cls._parse_optional_positive_int(
+            cls._get_optional_dict_value(config_dict, "MAX_COMMENT_ITEMS", source),
+            "MAX_COMMENT_ITEMS",
+        )
+        config.item_state_db_path = (
+            cls._get_optional_dict_value(config_dict, "ITEM_STATE_DB_PATH", source) or None
+        )
+        config.item_state_max_age_days = cls._parse_positive_int(
+            cls._get_optional_dict_value(config_dict, "ITEM_STATE_MAX_AGE_DAYS", source),
+            "ITEM_STATE_MAX_AGE_DAYS",
+            DEFAULT_ITEM_STATE_MAX_AGE_DAYS,
+        )
+        config.webhook_verification_token = (
+            cls._get_optional_dict_value(config_dict, "NOTION_WEBHOOK_VERIFICATION_TOKEN", source)
+            or None
+        )
+        config.hedge_read_percentile = cls._parse_percentile(
+            cls._get_optional_dict_value(config_dict, "HEDGE_READ_PERCENTILE", source),
+            "HEDGE_READ_PERCENTILE",
+        )
 
+        config.notion_api_base_url = (
+            cls._get_optional_dict_value(config_dict, "NOTION_API_BASE_URL", source) or None
+        )
+        config.query_cache_db_path = (
+            cls._get_optional_dict_value(config_dict, "QUERY_CACHE_DB_PATH", source) or None
+        )
+        config.query_cache_max_age_days = cls._parse_positive_int(
+            cls._get_optional_dict_value(config_dict, "QUERY_CACHE_MAX_AGE_DAYS", source),
+            "QUERY_CACHE_MAX_AGE_DAYS",
+            DEFAULT_QUERY_CACHE_MAX_AGE_DAYS,
+        )
+        config.idempotency_db_path = (
+            cls._get_optional_dict_value(config_dict, "IDEMPOTENCY_DB_PATH", source) or None
+        )
+        config.daily_request_quota = cls._parse_optional_positive_int(
+            cls._get_optional_dict_value(config_dict, "DAILY_REQUEST_QUOTA", source),
+            "DAILY_REQUEST_QUOTA",
+        )
+        config.items_access_token = (
+            cls._get_optional_dict_value(config_dict, "ITEMS_ACCESS_TOKEN", source) or None
+        )
+        config.items_cache_ttl_seconds = cls._parse_positive_int(
+            cls._get_optional_dict_value(config_dict, "ITEMS_CACHE_TTL_SECONDS", source),
+            "ITEMS_CACHE_TTL_SECONDS",
+            DEFAULT_ITEMS_CACHE_TTL_SECONDS,
+        )
+
+        config._freeze()
         return config
 
-    def _get_required_env_var(self, key: str) -> str:
-        """必須の環境変数を取得"""
-        logger.info(f"Retrieving environment variable: {key}")
-        value = os.environ.get(key)
+    def _freeze(self) -> None:
+        """読み込みの完了後は属性の変更を禁止する"""
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise FrozenInstanceError(f"cannot assign to field {name!r}")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if getattr(self, "_frozen", False):
+            raise FrozenInstanceError(f"cannot delete field {name!r}")
+        object.__delattr__(self, name)
+
+    @staticmethod
+    def _build_page_ids(primary_page_id: str, extra_page_ids: Any) -> List[str]:
+        """通知先ページIDの一覧を作成（NOTION_PAGE_ID を先頭に、重複は除外）"""
+        if isinstance(extra_page_ids, str):
+            extra_page_ids = extra_page_ids.split(",")
+        page_ids = [primary_page_id]
+        for page_id in extra_page_ids or []:
+            page_id = str(page_id).strip()
+            if page_id and page_id not in page_ids:
+                page_ids.append(page_id)
+        return page_ids
+
+    @staticmethod
+    def _parse_positive_int(value: Any, key: str, default: int) -> int:
+        """正の整数の設定値を解釈（未設定の場合は default）"""
+        if value is None or str(value).strip() == "":
+            return default
+        try:
+            number = int(str(value).strip())
+        except ValueError as e:
+            raise ConfigError(f"{key} must be an integer: {value!r}") from e
+        if number < 1:
+            raise ConfigError(f"{key} must be positive: {number}")
+        return number
+
+    @staticmethod
+    def _parse_optional_positive_int(value: Any, key: str) -> Optional[int]:
+        """任意の正の整数の設定値を解釈（未設定の場合は None）"""
+        if value is None or str(value).strip() == "":
+            return None
+        return Config._parse_positive_int(value, key, 0)
+
+    @staticmethod
+    def _parse_percentile(value: Any, key: str) -> Optional[int]:
+        """任意のパーセンタイル（1〜99）の設定値を解釈（未設定の場合は None）"""
+        percentile = Config._parse_optional_positive_int(value, key)
+        if percentile is not None and percentile > 99:
+            raise ConfigError(f"{key} must be between 1 and 99: {percentile}")
+        return percentile
+
+    @staticmethod
+    def _get_optional_source_value(source: ConfigSource, key: str) -> Optional[str]:
+        """任意の設定値を取得元から取得（未設定の場合は None）"""
+        try:
+            value = source.get(key)
+        except ConfigSourceError as e:
+            logger.error(f"Failed to retrieve {key}: {e}")
+            raise ConfigError(f"Configuration value {key} could not be retrieved: {e}") from e
+        if value is None or not value.strip():
+            return None
+        return value.strip()
+
+    @staticmethod
+    def _get_required_source_value(source: ConfigSource, key: str) -> str:
+        """必須の設定値を取得元から取得"""
+        logger.info(f"Retrieving configuration value: {key}")
+        try:
+            value = source.get(key)
+        except ConfigSourceError as e:
+            logger.error(f"Failed to retrieve {key}: {e}")
+            raise ConfigError(f"Configuration value {key} could not be retrieved: {e}") from e
         if not value or not value.strip():
-            logger.error(f"Environment variable {key} is missing or empty")
-            raise ConfigError(f"Environment variable {key} is required and cannot be empty")
-        logger.info(f"Environment variable {key} retrieved successfully")
+            logger.error(f"Configuration value {key} is missing or empty")
+            raise ConfigError(f"Configuration value {key} is required and cannot be empty")
+        logger.info(f"Configuration value {key} retrieved successfully")
         return value.strip()
 
     @staticmethod
-    def _get_required_dict_value(config_dict: Dict[str, Any], key: str) -> str:
+    def _get_required_dict_value(
+        config_dict: Dict[str, Any], key: str, source: Optional[ConfigSource] = None
+    ) -> str:
         """必須の辞書の値を取得"""
         if key not in config_dict:
+            if source is not None:
+                return Config._get_required_source_value(source, key)
             raise ConfigError(f"Configuration key {key} is required")
         value = config_dict[key]
         if not value or not str(value).strip():
             raise ConfigError(f"Configuration key {key} is required and cannot be empty")
         return str(value).strip()
 
+    @staticmethod
+    def _get_optional_dict_value(
+        config_dict: Dict[str, Any], key: str, source: Optional[ConfigSource] = None
+    ) -> Any:
+        """任意の辞書の値を取得（辞書にない場合は source が指定されていればそこから取得）"""
+        if key in config_dict:
+            return config_dict[key]
+        if source is not None:
+            return Config._get_optional_source_value(source, key)
+        return None
+
     def __str__(self) -> str:
         """設定の文字列表現（API keyは隠す）"""
         return (
@@ -0,0 +1,314 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConfigSourceError(Exception):
+    """設定値の取得元に関するエラー"""
+
+    pass
+
+
+class ConfigSource:
+    """設定値の取得元を表す基底クラス"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[str]:
+        """キーに対応する値を返す（存在しない場合はNone）"""
+        raise NotImplementedError
+
+
+class EnvConfigSource(ConfigSource):
+    """環境変数から設定値を取得する"""
+
+    name = "env"
+
+    def get(self, key: str) -> Optional[str]:
+        return os.environ.get(key)
+
+
+class FileConfigSource(ConfigSource):
+    """JSONファイルから設定値を取得する（更新時刻が変わった場合のみ再読み込み）"""
+
+    name = "file"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._values: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._reload_if_changed()
+            return self._values.get(key)
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            raise ConfigSourceError(f"Config file {self.path} is not readable: {e}") from e
+
+        if mtime == self._mtime:
+            return
+
+        logger.info(f"Loading configuration file: {self.path}")
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ConfigSourceError(f"Config file {self.path} could not be parsed: {e}") from e
+
+        if not isinstance(data, dict):
+            raise ConfigSourceError(f"Config file {self.path} must contain a JSON object")
+
+        self._values = {str(k): str(v) for k, v in data.items() if v is not None}
+        self._mtime = mtime
+
+
+class SecretsBackend:
+    """シークレットストアのバックエンドを表す基底クラス"""
+
+    def get_secret_value(self, secret_id: str) -> str:
+        raise NotImplementedError
+
+
+class LambdaExtensionSecretsBackend(SecretsBackend):
+    """AWS Parameters and Secrets Lambda Extension 経由で Secrets Manager から取得する"""
+
+    def __init__(self, port: int = 2773, timeout: float = 2.0) -> None:
+        self.endpoint = f"http://localhost:{port}/secretsmanager/get"
+        self.timeout = timeout
+
+    def get_secret_value(self, secret_id: str) -> str:
+        url = f"{self.endpoint}?{urllib.parse.urlencode({'secretId': secret_id})}"
+        request = urllib.request.Request(
+            url,
+            headers={"X-Aws-Parameters-Secrets-Token": os.environ.get("AWS_SESSION_TOKEN", "")},
+            method="GET",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except (urllib.error.URLError, json.JSONDecodeError) as e:
+            raise ConfigSourceError(f"Failed to fetch secret {secret_id}: {e}") from e
+
+        secret_string = payload.get("SecretString")
+        if secret_string is None:
+            raise ConfigSourceError(f"Secret {secret_id} has no SecretString")
+        return str(secret_string)
+
+
+class LocalSecretsBackend(SecretsBackend):
+    """ローカル開発・テスト用のインメモリなシークレットストア"""
+
+    def __init__(self, secrets: Optional[Dict[str, str]] = None) -> None:
+        self._lock = threading.Lock()
+        self._secrets: Dict[str, str] = dict(secrets or {})
+        self.fetch_count = 0
+
+    def put_secret(self, secret_id: str, value: str) -> None:
+        """シークレットを登録・更新（ローテーションの再現に使用）"""
+        with self._lock:
+            self._secrets[secret_id] = value
+
+    def get_secret_value(self, secret_id: str) -> str:
+        with self._lock:
+            self.fetch_count += 1
+            if secret_id not in self._secrets:
+                raise ConfigSourceError(f"Secret {secret_id} not found")
+            return self._secrets[secret_id]
+
+
+class SecretsManagerConfigSource(ConfigSource):
+    """設定キーをシークレットIDに対応付けてシークレットストアから取得する
+
+    シークレットの値がJSONオブジェクトで設定キーを含む場合はその値を、
+    それ以外の場合はシークレット文字列全体を設定値として扱う。
+    """
+
+    name = "secretsmanager"
+
+    def __init__(self, backend: SecretsBackend, secret_ids: Dict[str, str]) -> None:
+        self.backend = backend
+        self.secret_ids = dict(secret_ids)
+
+    def get(self, key: str) -> Optional[str]:
+        secret_id = self.secret_ids.get(key)
+        if not secret_id:
+            return None
+
+        secret_string = self.backend.get_secret_value(secret_id)
+        try:
+            secret_data = json.loads(secret_string)
+        except json.JSONDecodeError:
+            return secret_string
+
+        if isinstance(secret_data, dict):
+            value = secret_data.get(key)
+            return None if value is None else str(value)
+        return secret_string
+
+
+@dataclass
+class _CacheEntry:
+    value: Optional[str]
+    fetched_at: float
+
+
+class CachedConfigSource(ConfigSource):
+    """TTL付きインメモリキャッシュで取得元をラップする
+
+    - 取得から refresh_after 秒未満: キャッシュをそのまま返す
+    - refresh_after 秒以上 ttl 秒未満: キャッシュを返しつつバックグラウンドで再取得
+    - ttl 秒以上: 同期的に再取得（失敗時は古い値で継続）
+    """
+
+    def __init__(
+        self,
+        source: ConfigSource,
+        ttl_seconds: float = 300.0,
+        refresh_after_seconds: Optional[float] = None,
+    ) -> None:
+        self.source = source
+        self.name = f"cached({source.name})"
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_seconds = (
+            refresh_after_seconds if refresh_after_seconds is not None else ttl_seconds * 0.8
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._refreshing: Set[str] = set()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return self._fetch(key)
+
+        age = time.monotonic() - entry.fetched_at
+        if age < self.refresh_after_seconds:
+            return entry.value
+
+        if age < self.ttl_seconds:
+            self._start_background_refresh(key)
+            return entry.value
+
+        try:
+            return self._fetch(key)
+        except ConfigSourceError as e:
+            logger.warning(f"Failed to refresh {key} from {self.source.name}, using cached: {e}")
+            return entry.value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """キャッシュを破棄（keyを省略した場合は全て）"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _fetch(self, key: str) -> Optional[str]:
+        logger.info(f"Fetching {key} from {self.source.name}")
+        value = self.source.get(key)
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=value, fetched_at=time.monotonic())
+        return value
+
+    def _start_background_refresh(self, key: str) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        thread = threading.Thread(
+            target=self._background_refresh, args=(key,), name=f"config-refresh-{key}", daemon=True
+        )
+        thread.start()
+
+    def _background_refresh(self, key: str) -> None:
+        try:
+            self._fetch(key)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} from {self.source.name} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+class ChainConfigSource(ConfigSource):
+    """複数の取得元を順に参照し、最初に見つかった空でない値を返す"""
+
+    def __init__(self, sources: List[ConfigSource]) -> None:
+        self.sources = list(sources)
+        self.name = "chain(" + ",".join(source.name for source in self.sources) + ")"
+
+    def get(self, key: str) -> Optional[str]:
+        for source in self.sources:
+            value = source.get(key)
+            if value is not None and value.strip():
+                return value
+        return None
+
+
+_default_source_lock = threading.Lock()
+_default_source: Optional[Tuple[Tuple[str, ...], ConfigSource]] = None
+
+
+def build_default_source() -> ConfigSource:
+    """環境変数の指定に従って取得元を組み立てる
+
+    - NOTION_API_KEY_SECRET_ID: 指定時はSecrets Managerから NOTION_API_KEY を取得
+    - CONFIG_SECRET_CACHE_TTL_SECONDS: シークレットのキャッシュTTL（既定300秒）
+    - CONFIG_FILE: 指定時はJSONファイルを環境変数の後に参照
+    """
+    sources: List[ConfigSource] = []
+
+    secret_id = os.environ.get("NOTION_API_KEY_SECRET_ID", "").strip()
+    if secret_id:
+        ttl_value = os.environ.get("CONFIG_SECRET_CACHE_TTL_SECONDS", "300")
+        try:
+            ttl = float(ttl_value)
+        except ValueError as e:
+            raise ConfigSourceError(
+                f"CONFIG_SECRET_CACHE_TTL_SECONDS must be a number: {ttl_value!r}"
+            ) from e
+        secrets_source = SecretsManagerConfigSource(
+            LambdaExtensionSecretsBackend(), {"NOTION_API_KEY": secret_id}
+        )
+        sources.append(CachedConfigSource(secrets_source, ttl_seconds=ttl))
+
+    sources.append(EnvConfigSource())
+
+    config_file = os.environ.get("CONFIG_FILE", "").strip()
+    if config_file:
+        sources.append(FileConfigSource(config_file))
+
+    return ChainConfigSource(sources)
+
+
+def get_default_source() -> ConfigSource:
+    """既定の取得元を返す（ウォームスタート間でキャッシュを共有するためモジュールレベルで保持）"""
+    global _default_source
+
+    signature = tuple(
+        os.environ.get(key, "")
+        for key in ("NOTION_API_KEY_SECRET_ID", "CONFIG_SECRET_CACHE_TTL_SECONDS", "CONFIG_FILE")
+    )
+    with _default_source_lock:
+        if _default_source is None or _default_source[0] != signature:
+            _default_source = (signature, build_default_source())
+        return _default_source[1]
@@ -0,0 +1,241 @@
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Lambda環境での絶対インポート
+from config import Config
+import json_codec
+from logger import get_logger
+from notion_client import NotionClient
+from transport import ReplayTransport, Transport
+
+logger = get_logger(__name__)
+
+# Lambda 内でのサンプリングを有効にするイベントのフィールド（{"cpu_profiling": true}）
+CPU_PROFILING_EVENT_FIELD = "cpu_profiling"
+
+# スタックを記録する既定の間隔（秒）
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# レスポンスに含める、サンプル数の多いスタックの数
+DEFAULT_REPORT_LIMIT = 20
+
+# 1つのスタックに記録するフレームの上限（再帰などで長くなりすぎないようにする）
+_MAX_DEPTH = 128
+
+
+def is_cpu_profiling_requested(event: Optional[Dict[str, Any]] = None) -> bool:
+    """イベントで CPU のサンプリングが要求されているか"""
+    return bool(event and event.get(CPU_PROFILING_EVENT_FIELD))
+
+
+class StackSampler:
+    """別スレッドから一定間隔で対象スレッドのスタックを記録するサンプリングプロファイラ
+
+    cProfile と異なりすべての関数呼び出しを計測しないため、Lambda 内でも処理をほとんど
+    遅くせずに使える。記録したスタックは flamegraph.pl などが読み込める
+    「フレーム;フレーム;... 回数」の形式（collapsed stacks）で出力できる。
+    """
+
+    def __init__(
+        self, interval: float = DEFAULT_SAMPLE_INTERVAL, thread_id: Optional[int] = None
+    ) -> None:
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """サンプリングを開始（thread_id 省略時は呼び出したスレッドを対象にする）"""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StackSampler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def collapsed(self) -> str:
+        """collapsed stacks 形式（1行に1つのスタックとサンプル数）"""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def report(self, limit: int = DEFAULT_REPORT_LIMIT) -> Dict[str, Any]:
+        """サンプル数の多いスタックと関数（スタックの末尾）の集計"""
+        leaves: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.samples.values()),
+            "top_functions": [
+                {"function": name, "samples": count} for name, count in leaves.most_common(limit)
+            ],
+            "top_stacks": [
+                {"stack": stack, "samples": count}
+                for stack, count in self.samples.most_common(limit)
+            ],
+        }
+
+    def log_report(self, limit: int = DEFAULT_REPORT_LIMIT) -> None:
+        logger.info(f"CPU profile: {json_codec.dumps_str(self.report(limit))}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id or 0)
+            if frame is not None:
+                self.samples[_fold(frame)] += 1
+            # 記録中のフレームを保持し続けないようにする
+            del frame
+
+
+def _fold(frame: Optional[FrameType]) -> str:
+    labels: List[str] = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        labels.append(f"{code.co_qualname} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+@contextmanager
+def replay_cassette(path: str, replay_latency: bool = False) -> Iterator[None]:
+    """ブロック内で作成した NotionClient の送信をカセットの再生に置き換える
+
+    クライアントごとに新しく読み込むため、handler を繰り返し実行しても毎回同じやり取りを再生する。
+    """
+    original = NotionClient.__dict__["_default_transport"]
+
+    def replaying_transport(config: Config) -> Transport:
+        return ReplayTransport(path, replay_latency=replay_latency)
+
+    NotionClient._default_transport = staticmethod(replaying_transport)  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        NotionClient._default_transport = original  # type: ignore[method-assign]
+
+
+def profile_handler(
+    event: Dict[str, Any],
+    repeat: int = 1,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+) -> Tuple[cProfile.Profile, StackSampler, List[Dict[str, Any]]]:
+    """handler を cProfile で計測しつつ、同時にスタックをサンプリングする"""
+    # lambda_handler がこのモジュールの StackSampler を使うため、循環しないよう実行時に import する
+    from lambda_handler import handler
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval=interval)
+    responses = []
+    with sampler:
+        for _ in range(repeat):
+            profiler.enable()
+            try:
+                responses.append(handler(dict(event), None))
+            finally:
+                profiler.disable()
+    return profiler, sampler, responses
+
+
+def write_outputs(
+    profiler: cProfile.Profile,
+    sampler: StackSampler,
+    prefix: str,
+    sort: str = "cumulative",
+    limit: int = 50,
+) -> List[str]:
+    """計測結果を書き出し、書き出したファイルのパスを返す
+
+    - <prefix>.prof: cProfile の生データ（snakeviz などで表示できる）
+    - <prefix>.txt: sort の順に並べた上位 limit 件の統計
+    - <prefix>.folded: flamegraph.pl / speedscope などが読み込める collapsed stacks
+    """
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    prof_path = f"{prefix}.prof"
+    profiler.dump_stats(prof_path)
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    stats_path = f"{prefix}.txt"
+    with open(stats_path, "w", encoding="utf-8") as f:
+        f.write(stream.getvalue())
+
+    folded_path = f"{prefix}.folded"
+    with open(folded_path, "w", encoding="utf-8") as f:
+        f.write(sampler.collapsed())
+    return [prof_path, stats_path, folded_path]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CPU プロファイリングのエントリーポイント（python cpu_profile.py --cassette run.json）"""
+    parser = argparse.ArgumentParser(description="Profile the Lambda handler with cProfile")
+    parser.add_argument("--event", help="JSON file with the event to pass (default: {})")
+    parser.add_argument(
+        "--cassette", help="replay Notion API responses from this cassette instead of the network"
+    )
+    parser.add_argument(
+        "--replay-latency", action="store_true", help="wait for the recorded latency on replay"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="number of handler runs (default: 1)")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_SAMPLE_INTERVAL,
+        help=f"stack sampling interval in seconds (default: {DEFAULT_SAMPLE_INTERVAL})",
+    )
+    parser.add_argument(
+        "--sort", default="cumulative", help="pstats sort key (default: cumulative)"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=50, help="rows in the stats report (default: 50)"
+    )
+    parser.add_argument("--output", default="profile", help="output path prefix (default: profile)")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be positive")
+
+    event: Dict[str, Any] = {}
+    if args.event:
+        with open(args.event, encoding="utf-8") as f:
+            event = json_codec.loads(f.read())
+
+    if args.cassette:
+        with replay_cassette(args.cassette, replay_latency=args.replay_latency):
+            profiler, sampler, responses = profile_handler(event, args.repeat, args.interval)
+    else:
+        profiler, sampler, responses = profile_handler(event, args.repeat, args.interval)
+
+    paths = write_outputs(profiler, sampler, args.output, sort=args.sort, limit=args.limit)
+    statuses = [response.get("statusCode") for response in responses]
+    print(f"Handler status codes: {statuses}")
+    for path in paths:
+        print(f"Wrote {path}")
+    return 0 if all(status == 200 for status in statuses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import FrozenSet, List, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# 各フィールドの取りうる範囲（曜日は 0=日曜、7 も日曜として扱う）
+_FIELD_RANGES: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# 次回の実行日時を探す範囲（2月29日のみの指定などでも見つかるよう、うるう年の周期を含める）
+_MAX_SEARCH_YEARS = 5
+
+
+class CronError(Exception):
+    """cron 式に関するエラー"""
+
+    pass
+
+
+def _parse_field(expression: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    """1つのフィールド（*、a-b、*/n、a-b/n、カンマ区切り）を値の集合に変換"""
+    values: Set[int] = set()
+    for part in expression.split(","):
+        base, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start_text, end_text = base.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = end = int(base)
+                if step_text:
+                    end = high
+        except ValueError as e:
+            raise CronError(f"Invalid {name} field: {expression!r}") from e
+        if step < 1 or start < low or end > high or start > end:
+            raise CronError(f"Invalid {name} field: {expression!r} (allowed {low}-{high})")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """5フィールドの cron 式（分 時 日 月 曜日）とタイムゾーン
+
+    日と曜日の両方が指定されている場合は、一般的な cron と同じくどちらかに
+    一致する日に実行する。夏時間の切り替えで存在しない時刻は、その時刻を
+    タイムゾーンの規則で解釈した日時（通常は1時間後）に実行する。
+    """
+
+    expression: str
+    tz: ZoneInfo
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str, timezone_name: str = "UTC") -> "CronSchedule":
+        fields = expression.split()
+        if len(fields) != len(_FIELD_RANGES):
+            raise CronError(f"Cron expression must have 5 fields: {expression!r}")
+        try:
+            tz = ZoneInfo(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise CronError(f"Unknown timezone: {timezone_name!r}") from e
+
+        parsed: List[FrozenSet[int]] = [
+            _parse_field(field, name, low, high)
+            for field, (name, low, high) in zip(fields, _FIELD_RANGES)
+        ]
+        # 7 は日曜（0）と同じ
+        weekdays = frozenset(day % 7 for day in parsed[4])
+        return cls(
+            expression=expression,
+            tz=tz,
+            minutes=parsed[0],
+            hours=parsed[1],
+            days=parsed[2],
+            months=parsed[3],
+            weekdays=weekdays,
+            day_restricted=not fields[2].startswith("*"),
+            weekday_restricted=not fields[4].startswith("*"),
+        )
+
+    def _day_matches(self, local: datetime) -> bool:
+        day_match = local.day in self.days
+        # Python の weekday() は月曜が0のため、cron の表記（日曜が0）に合わせる
+        weekday_match = (local.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """moment より後で最初に一致する日時（UTC の aware datetime）"""
+        if moment.tzinfo is None:
+            raise ValueError("moment must be timezone-aware")
+        local = moment.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0)
+        local += timedelta(minutes=1)
+        limit = local + timedelta(days=366 * _MAX_SEARCH_YEARS)
+
+        while local < limit:
+            if local.month not in self.months:
+                year, month = divmod(local.month, 12)
+                local = datetime(local.year + year, month + 1, 1)
+            elif not self._day_matches(local):
+                local = datetime(local.year, local.month, local.day) + timedelta(days=1)
+            elif local.hour not in self.hours:
+                local = local.replace(minute=0) + timedelta(hours=1)
+            elif local.minute not in self.minutes:
+                local += timedelta(minutes=1)
+            else:
+                result = local.replace(tzinfo=self.tz).astimezone(timezone.utc)
+                if result > moment:
+                    return result
+                # 夏時間の終了で同じ時刻が2回ある場合、2回目には実行しない
+                local += timedelta(minutes=1)
+        raise CronError(f"Cron expression never matches: {self.expression!r}")
@@ -0,0 +1,255 @@
+import argparse
+import heapq
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Lambda環境での絶対インポート
+from config import Config, ConfigError
+from config_source import ConfigSourceError, get_default_source
+from cron import CronError, CronSchedule
+from lambda_handler import ShoppingReminderProcessor
+from logger import get_logger
+from models import NotificationResult
+from target_scheduler import (
+    TARGET_COST_DB_PATH_ENV,
+    TargetCostHistory,
+    get_target_cost_history,
+    order_longest_first,
+    record_run,
+    target_key,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_TIMEZONE = "Asia/Tokyo"
+DEFAULT_SCHEDULE = "0 17 * * *"
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class ScheduledTarget:
+    """スケジュールに従ってリマインダーを実行する1つの対象（買い物リスト）
+
+    処理クラスは初回の実行時に作成し、以降の実行で接続や履歴などを再利用する。
+    """
+
+    name: str
+    config: Config
+    schedule: CronSchedule
+    processor: Optional[ShoppingReminderProcessor] = field(default=None, repr=False)
+
+    def run(self, factory: Callable[[Config], ShoppingReminderProcessor]) -> NotificationResult:
+        if self.processor is None:
+            self.processor = factory(self.config)
+        return self.processor.process()
+
+
+def load_targets(path: str) -> List[ScheduledTarget]:
+    """対象の一覧を JSON ファイルから読み込む
+
+    {"defaults": {...}, "targets": [{"name", "schedule", "timezone", "config": {...}}]}
+    の形式で、config に無いキーは defaults、さらに環境変数などの既定の取得元から補完する。
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ConfigError(f"Targets file {path} could not be loaded: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("targets"), list):
+        raise ConfigError(f"Targets file {path} must contain a 'targets' list")
+
+    try:
+        source = get_default_source()
+    except ConfigSourceError as e:
+        raise ConfigError(str(e)) from e
+    defaults = data.get("defaults") or {}
+
+    targets = []
+    names: Set[str] = set()
+    for index, entry in enumerate(data["targets"]):
+        if not isinstance(entry, dict):
+            raise ConfigError(f"Target #{index + 1} in {path} must be a JSON object")
+        name = str(entry.get("name") or f"target-{index + 1}")
+        if name in names:
+            raise ConfigError(f"Duplicate target name: {name}")
+        names.add(name)
+        try:
+            schedule = CronSchedule.parse(
+                entry.get("schedule", DEFAULT_SCHEDULE), entry.get("timezone", DEFAULT_TIMEZONE)
+            )
+        except CronError as e:
+            raise ConfigError(f"Invalid schedule for target {name}: {e}") from e
+        config = Config.from_dict({**defaults, **(entry.get("config") or {})}, source)
+        targets.append(ScheduledTarget(name=name, config=config, schedule=schedule))
+    logger.info(f"Loaded {len(targets)} targets from {path}")
+    return targets
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Daemon:
+    """複数の対象をそれぞれの cron スケジュールで実行する常駐プロセス
+
+    次回の実行日時の早い順に最小ヒープで管理し、期限が来た対象を上限付きの
+    ワーカースレッドで実行する。前回の実行が終わっていない対象は、その回を飛ばす。
+    同時に期限の来た対象は、過去の所要時間の長い順にワーカーに渡す。
+    """
+
+    def __init__(
+        self,
+        targets: List[ScheduledTarget],
+        max_workers: int = DEFAULT_WORKERS,
+        clock: Callable[[], datetime] = _utc_now,
+        processor_factory: Callable[[Config], ShoppingReminderProcessor] = (
+            ShoppingReminderProcessor
+        ),
+        cost_history: Optional[TargetCostHistory] = None,
+    ) -> None:
+        self.targets = targets
+        self.clock = clock
+        self.processor_factory = processor_factory
+        self.cost_history = cost_history or get_target_cost_history()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reminder")
+        self.stop_event = threading.Event()
+        self.last_results: Dict[str, NotificationResult] = {}
+        self._lock = threading.Lock()
+        self._running: Set[str] = set()
+        self._heap: List[Tuple[datetime, int, ScheduledTarget]] = []
+        self._sequence = 0
+        now = clock()
+        for target in targets:
+            self._push(target, target.schedule.next_after(now))
+
+    def _push(self, target: ScheduledTarget, due: datetime) -> None:
+        # 同じ日時の対象はヒープに追加した順に実行する（ScheduledTarget 同士は比較しない）
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, target))
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def running(self) -> Set[str]:
+        """実行中の対象の名前"""
+        with self._lock:
+            return set(self._running)
+
+    def run_due(self) -> int:
+        """期限の来た対象を実行し、実行を開始した件数を返す"""
+        now = self.clock()
+        due_targets: List[ScheduledTarget] = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, target = heapq.heappop(self._heap)
+            self._push(target, target.schedule.next_after(now))
+            with self._lock:
+                if target.name in self._running:
+                    logger.warning(f"Skipping {target.name} scheduled at {due}: still running")
+                    continue
+                self._running.add(target.name)
+            due_targets.append(target)
+        for target in order_longest_first(
+            due_targets, lambda scheduled: target_key(scheduled.config), self.cost_history
+        ):
+            self.executor.submit(self._run_target, target)
+        return len(due_targets)
+
+    def _run_target(self, target: ScheduledTarget) -> None:
+        started = time.perf_counter()
+        logger.info(f"Running target {target.name}")
+        try:
+            result = record_run(
+                self.cost_history, target.config, lambda: target.run(self.processor_factory)
+            )
+        except Exception as e:
+            logger.exception(f"Target {target.name} failed: {e}")
+            result = NotificationResult(
+                success=False, message="処理中にエラーが発生しました。", error=str(e)
+            )
+        finally:
+            with self._lock:
+                self._running.discard(target.name)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        status = "succeeded" if result.success else "failed"
+        logger.info(f"Target {target.name} {status} in {elapsed_ms:.0f} ms: {result.message}")
+        with self._lock:
+            self.last_results[target.name] = result
+
+    def run_forever(self) -> None:
+        """stop() が呼ばれるまで、期限の来た対象を実行し続ける"""
+        logger.info(f"Daemon started with {len(self.targets)} targets")
+        while not self.stop_event.is_set():
+            self.run_due()
+            due = self.next_due()
+            if due is None:
+                self.stop_event.wait()
+                break
+            timeout = max(0.0, (due - self.clock()).total_seconds())
+            self.stop_event.wait(timeout)
+        logger.info("Daemon stopping")
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """新たな実行を止め、wait=True の場合は実行中の対象の終了を待つ"""
+        self.stop()
+        self.executor.shutdown(wait=wait)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """常駐プロセスのエントリーポイント（python daemon.py --targets targets.json）"""
+    parser = argparse.ArgumentParser(description="Run shopping reminders on cron schedules")
+    parser.add_argument(
+        "--targets",
+        default=os.environ.get("DAEMON_TARGETS_FILE"),
+        help="JSON file listing the targets (default: $DAEMON_TARGETS_FILE)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("DAEMON_WORKERS", DEFAULT_WORKERS)),
+        help=f"maximum concurrent runs (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--cost-db",
+        default=os.environ.get(TARGET_COST_DB_PATH_ENV),
+        help=f"SQLite file keeping per-target run costs (default: ${TARGET_COST_DB_PATH_ENV})",
+    )
+    args = parser.parse_args(argv)
+    if not args.targets:
+        parser.error("--targets or DAEMON_TARGETS_FILE is required")
+
+    try:
+        targets = load_targets(args.targets)
+    except ConfigError as e:
+        logger.error(f"Configuration error: {e}")
+        return 2
+
+    daemon = Daemon(
+        targets,
+        max_workers=args.workers,
+        cost_history=get_target_cost_history(args.cost_db),
+    )
+
+    def handle_signal(signum: int, frame: Any) -> None:
+        logger.info(f"Received signal {signum}")
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    daemon.run_forever()
+    daemon.shutdown(wait=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
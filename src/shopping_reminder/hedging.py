@@ -0,0 +1,188 @@
+import collections
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional, Set
+
+# Lambda環境での絶対インポート
+from circuit_breaker import endpoint_key
+from logger import get_logger
+from transport import Transport, TransportRequest, TransportResponse
+from usage import UsageTracker, get_usage_tracker
+
+logger = get_logger(__name__)
+
+# 重複して送信しても結果が変わらない読み取りのリクエスト（データベースのクエリは POST だが読み取り）
+_DATABASE_QUERY_PATH = re.compile(r"/databases/[^/]+/query$")
+
+
+def is_idempotent_read(request: TransportRequest) -> bool:
+    """ヘッジしてよいリクエストか（コメント作成などの書き込みは対象外）"""
+    if request.method == "GET":
+        return True
+    path = request.url.split("?", 1)[0]
+    return request.method == "POST" and bool(_DATABASE_QUERY_PATH.search(path))
+
+
+class LatencyTracker:
+    """エンドポイントごとの直近の応答時間から、ヘッジを送るまでの待ち時間を求める"""
+
+    def __init__(self, window: int = 100) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, percentile: float, min_samples: int) -> Optional[float]:
+        """指定したパーセンタイルの応答時間（サンプルが min_samples 件未満の場合は None）"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+class HedgeBudget:
+    """ヘッジによる追加のリクエストを、通常のリクエスト数の一定割合までに抑える
+
+    リクエストごとに ratio 個のトークンが貯まり（上限 burst）、ヘッジ1件で1個使う。
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = burst
+
+    def on_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class HedgingTransport(Transport):
+    """読み取りのリクエストが一定時間応答しない場合に同じリクエストをもう1件送信し、
+    先に成功した応答を使う
+
+    待ち時間は直近の応答時間の percentile パーセンタイル（サンプルが揃うまでは
+    initial_delay）。書き込みのリクエストはそのまま1回だけ送信する。
+    遅れた側の応答は破棄する（urllib の送信は途中で取り消せないため、完了まで待たない）。
+    ヘッジで追加したリクエストは、利用量の上限の判定に含めるよう target の再試行として
+    UsageTracker に記録する（呼び出し元が記録するのは応答を使った1件のみのため）。
+    """
+
+    def __init__(
+        self,
+        inner: Transport,
+        percentile: float = 95.0,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        tracker: Optional[LatencyTracker] = None,
+        budget: Optional[HedgeBudget] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        clock: Callable[[], float] = time.perf_counter,
+        usage: Optional[UsageTracker] = None,
+        target: str = "",
+    ) -> None:
+        self.inner = inner
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.tracker = tracker or get_default_tracker()
+        self.budget = budget or HedgeBudget()
+        self.executor = executor or _get_default_executor()
+        self.clock = clock
+        self.usage = usage or get_usage_tracker()
+        self.target = target
+
+    def hedge_delay(self, key: str) -> float:
+        learned = self.tracker.percentile(key, self.percentile, self.min_samples)
+        if learned is None:
+            return self.initial_delay
+        return max(self.min_delay, learned)
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        if not is_idempotent_read(request):
+            return self.inner.send(request)
+
+        key = endpoint_key(request.method, request.url)
+        self.budget.on_request()
+        delay = self.hedge_delay(key)
+
+        primary = self._submit(request, key)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.budget.try_acquire():
+            return primary.result()
+
+        logger.info(f"Hedging {key} after {delay * 1000:.0f} ms without response")
+        self.usage.record_retry(self.target, key)
+        hedge = self._submit(request, key, hedge=True)
+        pending: Set[Future] = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        logger.info(f"Hedged request won for {key}")
+                    return future.result()
+                error = error or future.exception()
+        # 両方とも失敗した場合は先に失敗した方の例外を送出する
+        assert error is not None
+        raise error
+
+    def _submit(
+        self, request: TransportRequest, key: str, hedge: bool = False
+    ) -> "Future[TransportResponse]":
+        def attempt() -> TransportResponse:
+            started = self.clock()
+            received = 0
+            failed = True
+            try:
+                response = self.inner.send(request)
+                received = len(response.body)
+                failed = False
+            finally:
+                elapsed = self.clock() - started
+                if hedge:
+                    self.usage.record(
+                        self.target, key, len(request.body), received, elapsed, error=failed
+                    )
+            self.tracker.record(key, elapsed)
+            return response
+
+        return self.executor.submit(attempt)
+
+
+# ウォームスタートした実行環境では学習した応答時間を共有する
+_default_tracker = LatencyTracker()
+_default_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_default_tracker() -> LatencyTracker:
+    return _default_tracker
+
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    global _default_executor
+    with _executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        return _default_executor
@@ -0,0 +1,258 @@
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+from models import ShoppingItem
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    database_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (database_id, run_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    database_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (database_id, item_id, run_date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_snapshots_run_date ON snapshots (database_id, run_date, item_id);
+"""
+
+# 項目 :item_id について「未チェックが途切れた直近の実行日」より後の最初の出現日を求める
+# （一部の項目だけを記録した実行は、含まれない項目が途切れたとはみなさない）
+_STREAK_START_SQL = """
+SELECT MIN(s.run_date)
+FROM snapshots s
+WHERE s.database_id = :database_id
+  AND s.item_id = :item_id
+  AND s.run_date <= :as_of
+  AND s.run_date > COALESCE(
+      (
+          SELECT MAX(r.run_date)
+          FROM runs r
+          WHERE r.database_id = :database_id
+            AND r.run_date <= :as_of
+            AND r.complete = 1
+            AND NOT EXISTS (
+                SELECT 1 FROM snapshots x
+                WHERE x.database_id = :database_id
+                  AND x.item_id = :item_id
+                  AND x.run_date = r.run_date
+            )
+      ),
+      ''
+  )
+"""
+
+# 実行日 :as_of の全項目について、_STREAK_START_SQL と同じ開始日からの経過日数を求める
+_ITEM_AGES_SQL = """
+SELECT cur.item_id,
+       CAST(julianday(:as_of) - julianday((
+           SELECT MIN(s.run_date)
+           FROM snapshots s
+           WHERE s.database_id = :database_id
+             AND s.item_id = cur.item_id
+             AND s.run_date <= :as_of
+             AND s.run_date > COALESCE(
+                 (
+                     SELECT MAX(r.run_date)
+                     FROM runs r
+                     WHERE r.database_id = :database_id
+                       AND r.run_date <= :as_of
+                       AND r.complete = 1
+                       AND NOT EXISTS (
+                           SELECT 1 FROM snapshots x
+                           WHERE x.database_id = :database_id
+                             AND x.item_id = cur.item_id
+                             AND x.run_date = r.run_date
+                       )
+                 ),
+                 ''
+             )
+       )) AS INTEGER)
+FROM snapshots cur
+WHERE cur.database_id = :database_id
+  AND cur.run_date = :as_of
+"""
+
+
+class HistoryStore:
+    """実行ごとの未チェック項目のスナップショットを SQLite に保存する
+
+    (database_id, item_id, run_date) の主キーと run_date のインデックスにより、
+    項目ごとの経過日数・連続日数・出現頻度を Notion API を呼ばずに求められる。
+    同じファイルを複数のデータベース（常駐プロセスや SQS の複数の対象）で共有できるよう、
+    実行とスナップショットはデータベースごとに記録する。
+    """
+
+    def __init__(self, path: str = ":memory:", retention_days: int = 90) -> None:
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"HistoryStore opened: {path}")
+
+    def record_snapshot(
+        self,
+        items: List[ShoppingItem],
+        run_date: Optional[date] = None,
+        complete: bool = True,
+        database_id: str = "",
+    ) -> None:
+        """今回の実行の未チェック項目を記録（同じ日の再実行は上書き）
+
+        complete=False は未チェック項目の一部だけを記録したことを表す。
+        """
+        run_date_str = (run_date or date.today()).isoformat()
+        cutoff = (
+            date.fromisoformat(run_date_str) - timedelta(days=self.retention_days)
+        ).isoformat()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (database_id, run_date, complete) VALUES (?, ?, ?)",
+                (database_id, run_date_str, int(complete)),
+            )
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE database_id = ? AND run_date = ?",
+                (database_id, run_date_str),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (database_id, item_id, run_date, name) "
+                "VALUES (?, ?, ?, ?)",
+                [(database_id, item.id, run_date_str, item.name) for item in items],
+            )
+            # 保持期間を過ぎた履歴を削除
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE database_id = ? AND run_date < ?",
+                (database_id, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM runs WHERE database_id = ? AND run_date < ?", (database_id, cutoff)
+            )
+
+        logger.info(f"Recorded {len(items)} unchecked items for {run_date_str}")
+
+    def item_age_days(
+        self, item_id: str, as_of: Optional[date] = None, database_id: str = ""
+    ) -> int:
+        """項目が連続して未チェックになっている日数（最新の実行に含まれない場合は0）"""
+        as_of_str = self._resolve_as_of(as_of, database_id)
+        if as_of_str is None or not self._is_present(item_id, as_of_str, database_id):
+            return 0
+
+        with self._lock:
+            row = self._conn.execute(
+                _STREAK_START_SQL,
+                {"database_id": database_id, "item_id": item_id, "as_of": as_of_str},
+            ).fetchone()
+        start = date.fromisoformat(row[0])
+        return (date.fromisoformat(as_of_str) - start).days
+
+    def streak(self, item_id: str, as_of: Optional[date] = None, database_id: str = "") -> int:
+        """項目が連続して未チェックだった実行回数"""
+        as_of_str = self._resolve_as_of(as_of, database_id)
+        if as_of_str is None or not self._is_present(item_id, as_of_str, database_id):
+            return 0
+
+        with self._lock:
+            row = self._conn.execute(
+                f"""
+                SELECT COUNT(*) FROM snapshots
+                WHERE database_id = :database_id
+                  AND item_id = :item_id
+                  AND run_date <= :as_of
+                  AND run_date >= ({_STREAK_START_SQL})
+                """,
+                {"database_id": database_id, "item_id": item_id, "as_of": as_of_str},
+            ).fetchone()
+        return int(row[0])
+
+    def frequency(
+        self,
+        item_id: str,
+        window_days: int = 30,
+        as_of: Optional[date] = None,
+        database_id: str = "",
+    ) -> int:
+        """直近 window_days 日間に未チェックとして記録された回数"""
+        as_of_str = self._resolve_as_of(as_of, database_id)
+        if as_of_str is None:
+            return 0
+        since = (date.fromisoformat(as_of_str) - timedelta(days=window_days - 1)).isoformat()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM snapshots "
+                "WHERE database_id = ? AND item_id = ? AND run_date BETWEEN ? AND ?",
+                (database_id, item_id, since, as_of_str),
+            ).fetchone()
+        return int(row[0])
+
+    def item_ages(self, as_of: Optional[date] = None, database_id: str = "") -> Dict[str, int]:
+        """最新の実行に含まれる全項目の経過日数"""
+        as_of_str = self._resolve_as_of(as_of, database_id)
+        if as_of_str is None:
+            return {}
+
+        with self._lock:
+            rows = self._conn.execute(
+                _ITEM_AGES_SQL, {"database_id": database_id, "as_of": as_of_str}
+            ).fetchall()
+        return {item_id: int(age) for item_id, age in rows}
+
+    def stale_items(
+        self, min_days: int, as_of: Optional[date] = None, database_id: str = ""
+    ) -> Dict[str, int]:
+        """min_days 日以上連続して未チェックの項目と経過日数"""
+        return {
+            item_id: age
+            for item_id, age in self.item_ages(as_of, database_id).items()
+            if age >= min_days
+        }
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+    def _resolve_as_of(self, as_of: Optional[date], database_id: str) -> Optional[str]:
+        if as_of is not None:
+            return as_of.isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(run_date) FROM runs WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        return row[0]
+
+    def _is_present(self, item_id: str, run_date: str, database_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM snapshots WHERE database_id = ? AND item_id = ? AND run_date = ?",
+                (database_id, item_id, run_date),
+            ).fetchone()
+        return row is not None
+
+
+_stores_lock = threading.Lock()
+_stores: Dict[str, HistoryStore] = {}
+
+
+def get_history_store(path: str) -> HistoryStore:
+    """パスごとの HistoryStore を返す（ウォームスタート間で接続を再利用）"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = HistoryStore(path)
+        return store
@@ -0,0 +1,287 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Lambda環境での絶対インポート
+from config import Config
+import json_codec
+from logger import get_logger
+from models import OmittedItems, ShoppingItem
+from notion_client import NotionAPIError
+from transport import REDACTED_HEADERS, REDACTED_VALUE
+
+logger = get_logger(__name__)
+
+# 未チェック項目を返すパス
+ITEMS_PATHS = ("/", "/items")
+
+# 未チェック項目の取得（項目と、一覧に含めなかった項目の件数）
+ItemsQuery = Callable[[], Tuple[List[ShoppingItem], Optional[OmittedItems]]]
+
+# Lambda のハンドラーと同じ形式の関数（ローカルの WSGI サーバーから呼び出す）
+LambdaHandler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def to_lambda(self) -> Dict[str, Any]:
+        """関数 URL（API Gateway）の応答の形式"""
+        return {
+            "statusCode": self.status,
+            "headers": self.headers,
+            "body": self.body.decode("utf-8"),
+            "isBase64Encoded": False,
+        }
+
+
+@dataclass
+class CachedItems:
+    """データベースごとの直近の応答"""
+
+    etag: str
+    body: bytes
+    fetched_at: float
+
+
+class ItemsCache:
+    """未チェック項目の応答をデータベースごとに保持する
+
+    ウォームスタート間で共有し、TTL 以内の要求には Notion に問い合わせずに応答する。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedItems] = {}
+
+    def get(self, key: str) -> Optional[CachedItems]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, body: bytes) -> CachedItems:
+        entry = CachedItems(etag=compute_etag(body), body=body, fetched_at=self.clock())
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def is_fresh(self, entry: CachedItems, ttl_seconds: float) -> bool:
+        return self.clock() - entry.fetched_at < ttl_seconds
+
+    def reset(self) -> None:
+        """保持している応答を破棄（主にテスト用）"""
+        with self._lock:
+            self._entries.clear()
+
+
+_default_cache = ItemsCache()
+
+
+def get_items_cache() -> ItemsCache:
+    """プロセス全体で共有する ItemsCache"""
+    return _default_cache
+
+
+def compute_etag(body: bytes) -> str:
+    """応答ボディから強い ETag を作成（項目の集合と順序が同じであれば同じ値になる）"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match のいずれかの ETag と一致するか（RFC 9110 に従い弱い比較を行う）"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def http_method(event: Any) -> Optional[str]:
+    """関数 URL（ペイロード 2.0）または API Gateway（1.0）のイベントのメソッド"""
+    if not isinstance(event, dict):
+        return None
+    http = (event.get("requestContext") or {}).get("http") or {}
+    method = http.get("method") or event.get("httpMethod")
+    return str(method).upper() if method else None
+
+
+def is_items_request(event: Any) -> bool:
+    """未チェック項目を取得する HTTP リクエスト（GET / HEAD）のイベントか"""
+    return http_method(event) in ("GET", "HEAD")
+
+
+def loggable_event(event: Any) -> Any:
+    """ログに出力するイベント（Authorization ヘッダーを伏せる）"""
+    if not isinstance(event, dict) or not isinstance(event.get("headers"), dict):
+        return event
+    headers = {
+        key: REDACTED_VALUE if key.lower() in REDACTED_HEADERS else value
+        for key, value in event["headers"].items()
+    }
+    return {**event, "headers": headers}
+
+
+def _header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """ヘッダーの値を取得（関数 URL は小文字に揃えるが、大文字小文字を区別しない）"""
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return str(value)
+    return None
+
+
+def _json_response(status: int, body: Dict[str, Any]) -> HttpResponse:
+    return HttpResponse(
+        status, {"Content-Type": "application/json; charset=utf-8"}, json_codec.dumps(body)
+    )
+
+
+class ItemsEndpoint:
+    """現在の未チェック項目を JSON で返す HTTP エンドポイント
+
+    ITEMS_CACHE_TTL_SECONDS 以内の要求には直近の応答を返し、If-None-Match が ETag と
+    一致すれば本文の無い 304 を返すため、頻繁に確認するクライアントでも Notion への
+    リクエストはほとんど増えない。Notion への問い合わせに失敗した場合は古い応答を返す。
+    """
+
+    def __init__(
+        self, config: Config, query: ItemsQuery, cache: Optional[ItemsCache] = None
+    ) -> None:
+        self.config = config
+        self.query = query
+        self.cache = cache or get_items_cache()
+
+    def handle(self, event: Dict[str, Any]) -> HttpResponse:
+        path = event.get("rawPath") or event.get("path") or "/"
+        if path.rstrip("/") not in (p.rstrip("/") for p in ITEMS_PATHS):
+            return _json_response(404, {"success": False, "message": "Not found"})
+
+        token = self.config.items_access_token
+        if not token:
+            logger.error("ITEMS_ACCESS_TOKEN is not configured")
+            return _json_response(
+                403, {"success": False, "message": "Items access token is not configured"}
+            )
+        if not hmac.compare_digest(_header(event, "authorization") or "", f"Bearer {token}"):
+            logger.warning("Rejected items request with invalid token")
+            response = _json_response(401, {"success": False, "message": "Invalid token"})
+            response.headers["WWW-Authenticate"] = "Bearer"
+            return response
+
+        entry = self._current_items()
+        if entry is None:
+            return _json_response(
+                502, {"success": False, "message": "未チェック項目の取得に失敗しました。"}
+            )
+
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(_header(event, "if-none-match"), entry.etag):
+            return HttpResponse(304, headers)
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        body = b"" if http_method(event) == "HEAD" else entry.body
+        return HttpResponse(200, headers, body)
+
+    def _current_items(self) -> Optional[CachedItems]:
+        key = self.config.notion_database_id
+        cached = self.cache.get(key)
+        if cached is not None and self.cache.is_fresh(cached, self.config.items_cache_ttl_seconds):
+            return cached
+        try:
+            items, omitted = self.query()
+        except NotionAPIError as e:
+            if cached is None:
+                logger.exception(f"Failed to query items: {e}")
+                return None
+            logger.warning(f"Failed to query items, serving cached response: {e}")
+            return cached
+        return self.cache.put(key, self._render(items, omitted))
+
+    @staticmethod
+    def _render(items: List[ShoppingItem], omitted: Optional[OmittedItems]) -> bytes:
+        """ETag が取得時刻などで変わらないよう、項目のみから応答ボディを作成"""
+        body: Dict[str, Any] = {
+            "count": len(items) + (omitted.count if omitted else 0),
+            "items": [{"id": item.id, "name": item.name} for item in items],
+        }
+        if omitted is not None and omitted.count:
+            body["omitted"] = {"count": omitted.count, "lower_bound": omitted.lower_bound}
+        return json_codec.dumps(body)
+
+
+def wsgi_event(environ: Dict[str, Any]) -> Dict[str, Any]:
+    """WSGI のリクエストを関数 URL（ペイロード 2.0）と同じ形式のイベントに変換"""
+    headers = {
+        key[5:].replace("_", "-").lower(): value
+        for key, value in environ.items()
+        if key.startswith("HTTP_")
+    }
+    for key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+        if environ.get(key):
+            headers[key.replace("_", "-").lower()] = environ[key]
+    method = environ.get("REQUEST_METHOD", "GET").upper()
+    path = environ.get("PATH_INFO") or "/"
+    event: Dict[str, Any] = {
+        "version": "2.0",
+        "rawPath": path,
+        "rawQueryString": environ.get("QUERY_STRING", ""),
+        "headers": headers,
+        "requestContext": {"http": {"method": method, "path": path}},
+        "isBase64Encoded": False,
+    }
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    if length:
+        body = environ["wsgi.input"].read(length)
+        try:
+            event["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            event["body"] = base64.b64encode(body).decode("ascii")
+            event["isBase64Encoded"] = True
+    return event
+
+
+def make_wsgi_app(handler: LambdaHandler) -> Callable[..., Iterable[bytes]]:
+    """Lambda のハンドラーをローカルで動かす WSGI アプリケーション"""
+
+    def app(environ: Dict[str, Any], start_response: Callable[..., Any]) -> Iterable[bytes]:
+        response = handler(wsgi_event(environ), None)
+        status = int(response.get("statusCode", 500))
+        body = response.get("body") or ""
+        data = base64.b64decode(body) if response.get("isBase64Encoded") else body.encode("utf-8")
+        headers = [(key, str(value)) for key, value in (response.get("headers") or {}).items()]
+        start_response(f"{status} {HTTPStatus(status).phrase}", headers)
+        return [data]
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """ローカルの HTTP サーバーのエントリーポイント（python http_handler.py --port 8080）"""
+    from wsgiref.simple_server import make_server
+
+    # lambda_handler がこのモジュールを使うため、循環しないよう実行時に import する
+    from lambda_handler import handler
+
+    parser = argparse.ArgumentParser(description="Serve the Lambda handler over local HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    args = parser.parse_args(argv)
+
+    with make_server(args.host, args.port, make_wsgi_app(handler)) as server:
+        logger.info(f"Serving on http://{args.host}:{args.port}/items")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
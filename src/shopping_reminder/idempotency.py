@@ -0,0 +1,208 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+# Lambda環境での絶対インポート
+from config import Config
+import json_codec
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+# 完了した記録を保持する秒数（EventBridge・Lambda の非同期呼び出しの再試行期間は最大24時間）
+DEFAULT_RETENTION_SECONDS = 48 * 60 * 60
+
+# 処理中の記録の既定の有効期限（Lambda の最大実行時間）。期限を過ぎた記録は再試行で上書きできる
+DEFAULT_LEASE_SECONDS = 15 * 60
+
+
+@dataclass
+class IdempotencyRecord:
+    """イベントの処理状況（処理中、または完了してレスポンスを記録済み）"""
+
+    key: str
+    status: str
+    expires_at: float
+    response: Optional[Dict[str, Any]] = None
+
+
+def idempotency_key(event: Dict[str, Any], config: Config) -> Optional[str]:
+    """イベントID（無い場合は予定時刻）と通知対象から重複判定のキーを作成
+
+    EventBridge や Lambda の非同期呼び出しの再試行では同じイベントが再び渡される。
+    ID も時刻も無いイベント（手動実行など）は毎回処理するため None を返す。
+    """
+    event_id = event.get("id") or event.get("time")
+    if not event_id:
+        return None
+    target = ",".join([config.notion_database_id, *config.notion_page_ids])
+    target_hash = hashlib.sha256(target.encode("utf-8")).hexdigest()[:16]
+    return f"{event_id}:{target_hash}"
+
+
+def destination_key(key: str, page_id: str) -> str:
+    """通知先ページごとの完了を記録するキー（一部のページへの投稿のみ失敗した場合の再試行用）"""
+    return f"{key}:{page_id}"
+
+
+def lease_seconds(context: Any) -> float:
+    """処理中の記録の有効期限（Lambda の残りの実行時間に余裕を加えたもの）"""
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if callable(get_remaining):
+        try:
+            return float(get_remaining()) / 1000 + 60
+        except (TypeError, ValueError):
+            pass
+    return DEFAULT_LEASE_SECONDS
+
+
+class IdempotencyStore:
+    """イベントの処理状況を記録する保存先の基底クラス"""
+
+    def begin(self, key: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        """処理の開始を記録（開始できた場合は None、有効な記録が既にあればその記録）"""
+        raise NotImplementedError
+
+    def complete(
+        self,
+        key: str,
+        response: Dict[str, Any],
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        """処理の完了とレスポンスを記録"""
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        """失敗した処理の記録を削除し、再試行で処理し直せるようにする"""
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """プロセス内で記録する（ウォームスタートした実行環境での再試行のみ検出できる）"""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._records: Dict[str, IdempotencyRecord] = {}
+
+    def begin(self, key: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            now = self.clock()
+            self._records = {k: r for k, r in self._records.items() if r.expires_at > now}
+            record = self._records.get(key)
+            if record is not None:
+                return record
+            self._records[key] = IdempotencyRecord(key, IN_PROGRESS, now + lease_seconds)
+            return None
+
+    def complete(
+        self,
+        key: str,
+        response: Dict[str, Any],
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        with self._lock:
+            self._records[key] = IdempotencyRecord(
+                key, COMPLETED, self.clock() + retention_seconds, response
+            )
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and record.status == IN_PROGRESS:
+                del self._records[key]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invocations (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    response TEXT
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """SQLite ファイルに記録する（EFS などに置けば実行環境をまたいで検出できる）
+
+    開始の記録は BEGIN IMMEDIATE のトランザクションで行い、同じファイルを使う
+    複数のプロセスが同時に同じイベントを開始しないようにする。
+    """
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"SQLiteIdempotencyStore opened: {path}")
+
+    def begin(self, key: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            now = self.clock()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM invocations WHERE expires_at <= ?", (now,))
+                row = self._conn.execute(
+                    "SELECT status, expires_at, response FROM invocations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO invocations (key, status, expires_at) VALUES (?, ?, ?)",
+                        (key, IN_PROGRESS, now + lease_seconds),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        status, expires_at, response = row
+        return IdempotencyRecord(
+            key, status, expires_at, json_codec.loads(response) if response else None
+        )
+
+    def complete(
+        self,
+        key: str,
+        response: Dict[str, Any],
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO invocations (key, status, expires_at, response) "
+                "VALUES (?, ?, ?, ?)",
+                (key, COMPLETED, self.clock() + retention_seconds, json_codec.dumps_str(response)),
+            )
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM invocations WHERE key = ? AND status = ?", (key, IN_PROGRESS)
+            )
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+_stores_lock = threading.Lock()
+_stores: Dict[str, IdempotencyStore] = {}
+
+
+def get_idempotency_store(path: Optional[str] = None) -> IdempotencyStore:
+    """パスごとの保存先を返す（省略時はプロセス内の保存先、ウォームスタート間で共有）"""
+    with _stores_lock:
+        store = _stores.get(path or "")
+        if store is None:
+            store = SQLiteIdempotencyStore(path) if path else InMemoryIdempotencyStore()
+            _stores[path or ""] = store
+        return store
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+from models import ShoppingItem
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    database_id TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    checked INTEGER NOT NULL,
+    last_edited_time TEXT NOT NULL DEFAULT '',
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (database_id, page_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_items_unchecked ON items (database_id, checked, seq);
+
+CREATE TABLE IF NOT EXISTS meta (
+    database_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (database_id, key)
+) WITHOUT ROWID;
+"""
+
+
+class ItemState:
+    """Webhook のイベントから組み立てたデータベースの項目の状態
+
+    全件取得（sync）で初期化し、その後はページ単位の変更を反映する。
+    項目の並び順は全件取得時の順序を保ち、新しい項目は末尾に追加する。
+    同じファイルを複数のデータベースで共有できるよう、状態はデータベースごとに保持する。
+    """
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"ItemState opened: {path}")
+
+    def replace_all(self, items: List[ShoppingItem], database_id: str = "") -> None:
+        """全件取得の結果で状態を置き換える"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE database_id = ?", (database_id,))
+            self._conn.executemany(
+                "INSERT INTO items (database_id, page_id, name, checked, seq) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (database_id, item.id, item.name, int(item.checked), seq)
+                    for seq, item in enumerate(items)
+                ],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (database_id, key, value) VALUES (?, 'synced_at', ?)",
+                (database_id, str(self.clock())),
+            )
+        logger.info(f"Item state synced with {len(items)} items")
+
+    def apply_page(self, item: ShoppingItem, last_edited_time: str, database_id: str = "") -> bool:
+        """ページの最新の内容を反映（記録済みより古い内容は無視し、反映したかを返す）"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT last_edited_time FROM items WHERE database_id = ? AND page_id = ?",
+                (database_id, item.id),
+            ).fetchone()
+            if row is not None and row[0] and row[0] > last_edited_time:
+                logger.info(f"Ignoring outdated update for page {item.id}")
+                return False
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO items "
+                    "(database_id, page_id, name, checked, last_edited_time, seq) "
+                    "VALUES (?, ?, ?, ?, ?, "
+                    "(SELECT COALESCE(MAX(seq), -1) + 1 FROM items WHERE database_id = ?))",
+                    (
+                        database_id,
+                        item.id,
+                        item.name,
+                        int(item.checked),
+                        last_edited_time,
+                        database_id,
+                    ),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE items SET name = ?, checked = ?, last_edited_time = ? "
+                    "WHERE database_id = ? AND page_id = ?",
+                    (item.name, int(item.checked), last_edited_time, database_id, item.id),
+                )
+        return True
+
+    def remove_page(self, page_id: str, database_id: str = "") -> bool:
+        """削除されたページを状態から除く（存在したかを返す）"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM items WHERE database_id = ? AND page_id = ?", (database_id, page_id)
+            )
+        return cursor.rowcount > 0
+
+    def unchecked_items(self, database_id: str = "") -> List[ShoppingItem]:
+        """未チェック項目を全件取得時の順序で返す"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, name FROM items "
+                "WHERE database_id = ? AND checked = 0 ORDER BY seq",
+                (database_id,),
+            ).fetchall()
+        return [ShoppingItem(id=page_id, name=name, checked=False) for page_id, name in rows]
+
+    def synced_at(self, database_id: str = "") -> Optional[float]:
+        """最後に全件取得した時刻（未取得の場合は None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE database_id = ? AND key = 'synced_at'",
+                (database_id,),
+            ).fetchone()
+        return float(row[0]) if row else None
+
+    def is_fresh(self, max_age_seconds: float, database_id: str = "") -> bool:
+        """全件取得から max_age_seconds 以内か（取りこぼしたイベントを補うための再取得判定）"""
+        synced_at = self.synced_at(database_id)
+        return synced_at is not None and self.clock() - synced_at < max_age_seconds
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+_states_lock = threading.Lock()
+_states: Dict[str, ItemState] = {}
+
+
+def get_item_state(path: str) -> ItemState:
+    """パスごとの ItemState を返す（ウォームスタート間で接続を再利用）"""
+    with _states_lock:
+        state = _states.get(path)
+        if state is None:
+            state = _states[path] = ItemState(path)
+        return state
@@ -0,0 +1,62 @@
+import json
+from typing import Any, Callable, Tuple, Union
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# デコードエラーは標準ライブラリの例外で捕捉できる（orjson.JSONDecodeError もそのサブクラス）
+JSONDecodeError = json.JSONDecodeError
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _load_backend() -> Tuple[str, Callable[[Any], bytes], Callable[[Union[bytes, str]], Any]]:
+    """利用できる中で最も速いバックエンドを選択（orjson が無ければ標準ライブラリ）"""
+    try:
+        import orjson
+    except ImportError:
+        return "json", _stdlib_dumps, _stdlib_loads
+    return "orjson", orjson.dumps, orjson.loads
+
+
+BACKEND, _dumps, _loads = _load_backend()
+logger.info(f"JSON codec backend: {BACKEND}")
+
+
+def dumps(obj: Any) -> bytes:
+    """UTF-8 の bytes に直接エンコード（非ASCII文字はエスケープしない）"""
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """文字列にエンコード（レスポンスボディやログ用）"""
+    return _dumps(obj).decode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """bytes または文字列をデコード"""
+    return _loads(data)
+
+
+class LazyJSON:
+    """ログに実際に出力されるときだけエンコードする
+
+    logger.debug("body: %s", LazyJSON(body)) のように渡すと、ログレベルで
+    出力されない場合はエンコードしない。
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any) -> None:
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return dumps_str(self.obj)
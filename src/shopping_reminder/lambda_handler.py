@@ -1,46 +1,154 @@
-import json
-from typing import Dict, Any
+import asyncio
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, TypeVar
 
+from async_notion_client import AsyncNotionClient
 from config import Config, ConfigError
-from notion_client import NotionClient
-from models import NotificationResult
+from cpu_profile import StackSampler, is_cpu_profiling_requested
+from history_store import HistoryStore, get_history_store
+from http_handler import ItemsEndpoint, is_items_request, loggable_event
+from idempotency import (
+    COMPLETED,
+    IdempotencyRecord,
+    IdempotencyStore,
+    destination_key,
+    get_idempotency_store,
+    idempotency_key,
+    lease_seconds,
+)
+from item_state import ItemState, get_item_state
+import json_codec
+from maintenance import ARCHIVE_COMPLETED, DEFAULT_ARCHIVE_AFTER_DAYS
+from memory_profiling import (
+    MemoryProfiler,
+    activate_profiler,
+    is_profiling_requested,
+    profile_phase,
+)
+from notion_client import NotionAPIError, NotionClient, NotionClientBase
+from models import NotificationResult, OmittedItems, ShoppingItem
+from notification_dispatcher import NotificationDispatcher
+from priming import is_priming_enabled, prime
 from logger import get_logger
+from query_cache import QueryCache, get_query_cache
+from usage import DEGRADED_MAX_COMMENT_ITEMS, UsageTracker, get_usage_tracker
+from webhook import WebhookProcessor, is_webhook_event
 
 logger = get_logger(__name__)
 
 
+T = TypeVar("T")
+
+
+def _run_coroutine(coroutine: Coroutine[Any, Any, T]) -> T:
+    """コルーチンを同期的に実行
+
+    実行中のイベントループの中から呼ばれた場合（asyncio 上のテストや常駐プロセスなど）は
+    asyncio.run を使えないため、別スレッドの新しいイベントループで実行して完了を待つ。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="dispatch") as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 class ShoppingReminderProcessor:
     """買い物リマインダーの処理を行うクラス"""
 
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        history_store: Optional[HistoryStore] = None,
+        item_state: Optional[ItemState] = None,
+        query_cache: Optional[QueryCache] = None,
+        usage: Optional[UsageTracker] = None,
+    ) -> None:
         self.config = config
         self.notion_client = NotionClient(config)
+        if history_store is None and config.history_db_path:
+            history_store = get_history_store(config.history_db_path)
+        self.history_store = history_store
+        if item_state is None and config.item_state_db_path:
+            item_state = get_item_state(config.item_state_db_path)
+        self.item_state = item_state
+        if query_cache is None and config.query_cache_db_path:
+            query_cache = get_query_cache(config.query_cache_db_path)
+        self.query_cache = query_cache
+        self.usage = usage or get_usage_tracker()
         logger.info("ShoppingReminderProcessor initialized successfully")
 
-    def process(self) -> NotificationResult:
-        """メイン処理を実行"""
+    def process(self, page_ids: Optional[List[str]] = None) -> NotificationResult:
+        """メイン処理を実行（page_ids 指定時はそのページのみに通知する）"""
+        if page_ids is None:
+            page_ids = self.config.notion_page_ids
         try:
             logger.info("Starting shopping reminder process")
 
             # 1. 未チェック項目を取得
             logger.info("Querying unchecked items from Notion database")
-            unchecked_items = self.notion_client.query_unchecked_items()
+            with profile_phase("query"):
+                unchecked_items, omitted = self.query_items()
             logger.info(f"Found {len(unchecked_items)} unchecked items")
 
             for item in unchecked_items:
                 logger.info(f"Unchecked item: {item.name} (ID: {item.id})")
 
-            # 2. コメントを作成（未チェック項目がない場合も含む）
-            logger.info("Creating comment notification")
-            result = self.notion_client.create_comment(unchecked_items)
+            # 2. 履歴に記録し、長期間未チェックの項目を求める
+            stale_items = self._record_history(unchecked_items, complete=omitted is None)
+            options = self._comment_options(stale_items, omitted)
 
-            if result.success:
-                logger.info(f"Process completed successfully: {result.message}")
+            # 3. コメントを作成（未チェック項目がない場合も含む）
+            logger.info("Creating comment notification")
+            if page_ids != [self.config.notion_page_id]:
+                with profile_phase("post"):
+                    result = _run_coroutine(
+                        self._dispatch_async(unchecked_items, page_ids=page_ids, **options)
+                    )
             else:
-                logger.warning(f"Process completed with issues: {result.message}")
-                if result.error:
-                    logger.error(f"Error details: {result.error}")
+                result = self.notion_client.create_comment(unchecked_items, **options)
+
+            self._log_result(result)
+            return result
+
+        except Exception as e:
+            logger.exception(f"Unexpected error during processing: {str(e)}")
+            return NotificationResult(
+                success=False, message="処理中にエラーが発生しました。", error=str(e)
+            )
+
+    async def process_async(self) -> NotificationResult:
+        """メイン処理を asyncio 上で実行（複数リストを1つのイベントループで並行処理する用途）"""
+        try:
+            logger.info("Starting shopping reminder process (async)")
+
+            # 非同期クライアントは接続をイベントループに紐付けるため、実行ごとに作成して閉じる
+            async with AsyncNotionClient(self.config) as async_notion_client:
+                # 1. 未チェック項目を取得
+                with profile_phase("query"):
+                    unchecked_items, omitted = await self._query_items_async(async_notion_client)
+                logger.info(f"Found {len(unchecked_items)} unchecked items")
+
+                # 2. 履歴に記録し、長期間未チェックの項目を求める
+                stale_items = self._record_history(unchecked_items, complete=omitted is None)
+                options = self._comment_options(stale_items, omitted)
 
+                # 3. コメントを作成（未チェック項目がない場合も含む）
+                if len(self.config.notion_page_ids) > 1:
+                    dispatcher = NotificationDispatcher(async_notion_client)
+                    result = await dispatcher.dispatch(
+                        unchecked_items, self.config.notion_page_ids, **options
+                    )
+                else:
+                    result = await async_notion_client.create_comment(unchecked_items, **options)
+
+            self._log_result(result)
             return result
 
         except Exception as e:
@@ -49,11 +157,414 @@ class ShoppingReminderProcessor:
                 success=False, message="処理中にエラーが発生しました。", error=str(e)
             )
 
+    def query_items(self) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """未チェック項目を取得（MAX_COMMENT_ITEMS 指定時は古い順に上位のみ）
+
+        Webhook で更新している項目の状態が新しければ、データベースへのクエリは行わない。
+        QUERY_CACHE_DB_PATH 指定時は、1件だけのクエリで変更が無いことを確認できれば
+        前回の結果を再利用する。DAILY_REQUEST_QUOTA を超えた場合は上位N件のみ取得する。
+        """
+        cached = self._cached_items()
+        if cached is not None:
+            return cached
+        if self._over_quota():
+            return self.notion_client.query_top_unchecked_items(self._degraded_limit())
+        if self.query_cache is None:
+            return self._fetch_items()
+
+        started_at = self.query_cache.clock()
+        try:
+            watermark = self.notion_client.probe_watermark()
+        except NotionAPIError as e:
+            logger.warning(f"Change probe failed - running full query: {e}")
+            return self._fetch_items()
+        reused = self._reusable_result(watermark)
+        if reused is not None:
+            return reused
+        result = self._fetch_items()
+        self._store_result(watermark, started_at, result)
+        return result
+
+    def _fetch_items(self) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        if self.item_state is not None:
+            return self._sync_item_state(self.notion_client.query_unchecked_items())
+        if self.config.max_comment_items:
+            return self.notion_client.query_top_unchecked_items(self.config.max_comment_items)
+        return self.notion_client.query_unchecked_items(), None
+
+    async def _query_items_async(
+        self, async_notion_client: AsyncNotionClient
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """query_items と同じ手順で、非同期クライアントを使って取得"""
+        cached = self._cached_items()
+        if cached is not None:
+            return cached
+        if self._over_quota():
+            return await async_notion_client.query_top_unchecked_items(self._degraded_limit())
+        if self.query_cache is None:
+            return await self._fetch_items_async(async_notion_client)
+
+        started_at = self.query_cache.clock()
+        try:
+            watermark = await async_notion_client.probe_watermark()
+        except NotionAPIError as e:
+            logger.warning(f"Change probe failed - running full query: {e}")
+            return await self._fetch_items_async(async_notion_client)
+        reused = self._reusable_result(watermark)
+        if reused is not None:
+            return reused
+        result = await self._fetch_items_async(async_notion_client)
+        self._store_result(watermark, started_at, result)
+        return result
+
+    async def _fetch_items_async(
+        self, async_notion_client: AsyncNotionClient
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        if self.item_state is not None:
+            return self._sync_item_state(await async_notion_client.query_unchecked_items())
+        if self.config.max_comment_items:
+            return await async_notion_client.query_top_unchecked_items(
+                self.config.max_comment_items
+            )
+        return await async_notion_client.query_unchecked_items(), None
+
+    def _over_quota(self) -> bool:
+        """今日のリクエスト数が DAILY_REQUEST_QUOTA に達しているか"""
+        quota = self.config.daily_request_quota
+        if not quota:
+            return False
+        used = self.usage.requests(self.config.notion_database_id)
+        if used < quota:
+            return False
+        logger.warning(
+            f"Daily request quota exceeded ({used}/{quota}) - "
+            f"querying only the top {self._degraded_limit()} items"
+        )
+        return True
+
+    def _degraded_limit(self) -> int:
+        return self.config.max_comment_items or DEGRADED_MAX_COMMENT_ITEMS
+
+    def _query_cache_key(self) -> str:
+        """同じデータベース・APIキー・取得件数のクエリ結果を同一とみなす"""
+        key_hash = hashlib.sha256(self.config.notion_api_key.encode("utf-8")).hexdigest()
+        return (
+            f"{self.config.notion_database_id}:{self.config.max_comment_items or 0}:{key_hash[:16]}"
+        )
+
+    def _reusable_result(
+        self, watermark: str
+    ) -> Optional[Tuple[List[ShoppingItem], Optional[OmittedItems]]]:
+        """変更が無ければ前回のクエリ結果を返す（再利用できない場合は None）"""
+        if self.query_cache is None:
+            return None
+        max_age_seconds = self.config.query_cache_max_age_days * 24 * 60 * 60
+        try:
+            cached = self.query_cache.get(self._query_cache_key())
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read query cache: {e}")
+            return None
+        if cached is None or not cached.is_reusable(
+            watermark, max_age_seconds, self.query_cache.clock()
+        ):
+            logger.info("Database changed or cached result outdated - running full query")
+            return None
+        logger.info(f"Database unchanged - reusing {len(cached.items)} cached unchecked items")
+        return cached.items, cached.omitted
+
+    def _store_result(
+        self,
+        watermark: str,
+        started_at: float,
+        result: Tuple[List[ShoppingItem], Optional[OmittedItems]],
+    ) -> None:
+        if self.query_cache is None:
+            return
+        items, omitted = result
+        try:
+            self.query_cache.put(self._query_cache_key(), watermark, started_at, items, omitted)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update query cache: {e}")
+
+    def _cached_items(self) -> Optional[Tuple[List[ShoppingItem], Optional[OmittedItems]]]:
+        """項目の状態から未チェック項目を返す（状態が無い・古い場合は None）"""
+        if self.item_state is None:
+            return None
+        max_age_seconds = self.config.item_state_max_age_days * 24 * 60 * 60
+        try:
+            if not self.item_state.is_fresh(max_age_seconds, self.config.notion_database_id):
+                logger.info("Item state is missing or outdated - running full query")
+                return None
+            items = self.item_state.unchecked_items(self.config.notion_database_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read item state: {e}")
+            return None
+        logger.info(f"Serving {len(items)} unchecked items from item state")
+        return self._limit_items(items)
+
+    def _sync_item_state(
+        self, items: List[ShoppingItem]
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """全件取得の結果で項目の状態を初期化・再同期する
+
+        状態には全件が必要なため、MAX_COMMENT_ITEMS 指定時も全件を取得してから切り詰める。
+        """
+        if self.item_state is not None:
+            try:
+                self.item_state.replace_all(items, self.config.notion_database_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to sync item state: {e}")
+        return self._limit_items(items)
+
+    def _limit_items(
+        self, items: List[ShoppingItem]
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        if self.config.max_comment_items:
+            return NotionClientBase._truncate_top_items(items, self.config.max_comment_items, False)
+        return items, None
+
+    async def _dispatch_async(
+        self,
+        items: List[ShoppingItem],
+        page_ids: List[str],
+        stale_items: Optional[Dict[str, int]] = None,
+        omitted: Optional[OmittedItems] = None,
+    ) -> NotificationResult:
+        """複数の通知先ページへ並行してコメントを投稿"""
+        async with AsyncNotionClient(self.config) as async_notion_client:
+            dispatcher = NotificationDispatcher(async_notion_client)
+            return await dispatcher.dispatch(items, page_ids, stale_items, omitted)
+
+    def _record_history(self, items: List[ShoppingItem], complete: bool = True) -> Dict[str, int]:
+        """今回の未チェック項目を履歴に記録し、長期間未チェックの項目を返す
+
+        履歴は通知の補助情報のため、記録や集計に失敗しても通知は継続する。
+        上位N件のみ取得した場合は complete=False とし、取得していない項目の連続日数を保つ。
+        """
+        if self.history_store is None:
+            return {}
+        try:
+            database_id = self.config.notion_database_id
+            self.history_store.record_snapshot(items, complete=complete, database_id=database_id)
+            stale_items = self.history_store.stale_items(
+                self.config.stale_item_days, database_id=database_id
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update item history: {e}")
+            return {}
+        logger.info(f"Found {len(stale_items)} stale items")
+        return stale_items
+
+    @staticmethod
+    def _comment_options(
+        stale_items: Dict[str, int], omitted: Optional[OmittedItems]
+    ) -> Dict[str, Any]:
+        """コメント作成に渡す任意の引数（指定があるものだけ）"""
+        options: Dict[str, Any] = {}
+        if stale_items:
+            options["stale_items"] = stale_items
+        if omitted is not None:
+            options["omitted"] = omitted
+        return options
+
+    @staticmethod
+    def _log_result(result: NotificationResult) -> None:
+        """処理結果をログに出力"""
+        if result.success:
+            logger.info(f"Process completed successfully: {result.message}")
+        else:
+            logger.warning(f"Process completed with issues: {result.message}")
+            if result.error:
+                logger.error(f"Error details: {result.error}")
+
+
+def _build_result_body(result: NotificationResult) -> Dict[str, Any]:
+    """処理結果からレスポンスボディを作成"""
+    body: Dict[str, Any] = {"success": result.success, "message": result.message}
+    if not result.success:
+        body["error"] = result.error
+    if result.destinations:
+        body["destinations"] = [asdict(destination) for destination in result.destinations]
+    return body
+
+
+def _run_processor(event: Dict[str, Any], config: Config) -> Dict[str, Any]:
+    """リマインダーの処理を実行してレスポンスを作成"""
+    return _execute(event, config)[1]
+
+
+def _execute(
+    event: Dict[str, Any], config: Config, page_ids: Optional[List[str]] = None
+) -> Tuple[NotificationResult, Dict[str, Any]]:
+    """リマインダーの処理を実行し、処理結果とレスポンスを返す"""
+    # 要求された場合はフェーズごとのメモリ使用量や CPU 時間の内訳（スタックのサンプリング）を計測
+    logger.info("Initializing processor")
+    processor = ShoppingReminderProcessor(config)
+    profiler = MemoryProfiler() if is_profiling_requested(event) else None
+    sampler = StackSampler() if is_cpu_profiling_requested(event) else None
+    with ExitStack() as stack:
+        if profiler is not None:
+            stack.enter_context(activate_profiler(profiler))
+        if sampler is not None:
+            stack.enter_context(sampler)
+        result = processor.process(page_ids)
+
+    # レスポンスの作成
+    body = _build_result_body(result)
+    if profiler is not None:
+        profiler.log_report()
+        body["memory_profile"] = profiler.report()
+    if sampler is not None:
+        sampler.log_report()
+        body["cpu_profile"] = sampler.report()
+    body["usage"] = get_usage_tracker().report(config.notion_database_id)
+
+    if result.success:
+        logger.info("Lambda execution completed successfully")
+        return result, {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": json_codec.dumps_str(body),
+        }
+    else:
+        logger.error("Lambda execution completed with errors")
+        return result, {
+            "statusCode": 500,
+            "headers": {"Content-Type": "application/json"},
+            "body": json_codec.dumps_str(body),
+        }
+
+
+def _run_idempotent(
+    key: str, event: Dict[str, Any], config: Config, context: Any
+) -> Dict[str, Any]:
+    """同じイベントを1回だけ処理する（成功した場合のみ完了を記録し、失敗した場合は再試行できる）
+
+    通知先ページごとにも完了を記録し、一部のページへの投稿に失敗したイベントが再試行された
+    場合は、投稿済みのページを除いて残りのページにのみ投稿する。
+    記録の読み書きに失敗した場合も通知は止めない。
+    """
+    store = get_idempotency_store(config.idempotency_db_path)
+    lease = lease_seconds(context)
+    try:
+        record = store.begin(key, lease)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to check idempotency record, processing anyway: {e}")
+        return _run_processor(event, config)
+    if record is not None:
+        return _duplicate_response(record)
+
+    page_ids = _pending_page_ids(store, key, config.notion_page_ids, lease)
+    result: Optional[NotificationResult] = None
+    response: Optional[Dict[str, Any]] = None
+    try:
+        result, response = _execute(event, config, page_ids)
+        return response
+    finally:
+        try:
+            _record_destinations(store, key, page_ids, result)
+            if response is not None and response["statusCode"] == 200:
+                store.complete(key, response)
+            else:
+                store.release(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update idempotency record: {e}")
+
+
+def _pending_page_ids(
+    store: IdempotencyStore, key: str, page_ids: List[str], lease: float
+) -> List[str]:
+    """前回までの試行で投稿が完了していない通知先ページ（処理の開始を記録する）"""
+    pending = []
+    for page_id in page_ids:
+        try:
+            record = store.begin(destination_key(key, page_id), lease)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to check idempotency record for page {page_id}: {e}")
+            record = None
+        if record is None:
+            pending.append(page_id)
+        else:
+            logger.info(f"Event {key} already notified page {page_id} - skipping")
+    return pending
+
+
+def _record_destinations(
+    store: IdempotencyStore,
+    key: str,
+    page_ids: List[str],
+    result: Optional[NotificationResult],
+) -> None:
+    """通知先ページごとに、投稿できたページは完了を記録し、それ以外は再試行できるようにする"""
+    succeeded = {
+        destination.page_id: destination.success
+        for destination in (result.destinations if result is not None else [])
+    }
+    for page_id in page_ids:
+        page_key = destination_key(key, page_id)
+        if result is not None and succeeded.get(page_id, result.success):
+            store.complete(page_key, {"page_id": page_id})
+        else:
+            store.release(page_key)
+
+
+def _duplicate_response(record: IdempotencyRecord) -> Dict[str, Any]:
+    """処理済み・処理中のイベントに対するレスポンス"""
+    if record.status == COMPLETED and record.response is not None:
+        logger.info(f"Event {record.key} already processed - returning recorded response")
+        return record.response
+    logger.warning(f"Event {record.key} is already being processed - skipping")
+    return {
+        "statusCode": 409,
+        "headers": {"Content-Type": "application/json"},
+        "body": json_codec.dumps_str(
+            {
+                "success": False,
+                "message": "同じイベントを処理中です。",
+                "error": f"Event {record.key} is already in progress",
+            }
+        ),
+    }
+
+
+def _run_archive(event: Dict[str, Any], config: Config, context: Any) -> Dict[str, Any]:
+    """完了した項目をアーカイブ（{"maintenance": "archive_completed", "older_than_days": 30,
+    "dry_run": true}）
+
+    Lambda の残りの実行時間が少なくなった場合はページの区切りで打ち切り、
+    complete=false を返す（再実行すると残りから続ける）。
+    """
+    older_than_days = int(event.get("older_than_days", DEFAULT_ARCHIVE_AFTER_DAYS))
+    if older_than_days < 1:
+        raise ConfigError(f"older_than_days must be positive: {older_than_days}")
+    dry_run = bool(event.get("dry_run", False))
+
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if callable(get_remaining):
+        # 次のページ（最大100件）を処理できるだけの時間が残っていなければ打ち切る
+        deadline = time.monotonic() + float(get_remaining()) / 1000 - 60
+    else:
+        deadline = None
+
+    result = NotionClient(config).archive_completed_items(
+        older_than_days,
+        dry_run=dry_run,
+        should_stop=lambda: deadline is not None and time.monotonic() >= deadline,
+    )
+    body = {"success": result.failed == 0, **asdict(result)}
+    return {
+        "statusCode": 200 if result.failed == 0 else 500,
+        "headers": {"Content-Type": "application/json"},
+        "body": json_codec.dumps_str(body),
+    }
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """AWS Lambda のエントリーポイント"""
     logger.info("Lambda handler started")
-    logger.info(f"Event: {json.dumps(event) if event else 'No event data'}")
+    logger.info(
+        f"Event: {json_codec.dumps_str(loggable_event(event)) if event else 'No event data'}"
+    )
     logger.info(
         f"Request ID: {getattr(context, 'aws_request_id', 'No request ID available') if context else 'No context'}"
     )
@@ -64,40 +575,39 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         config = Config()
         logger.info("Configuration loaded successfully")
 
-        # 2. 処理の実行
-        logger.info("Initializing processor")
-        processor = ShoppingReminderProcessor(config)
-        result = processor.process()
+        # 関数 URL への GET は現在の未チェック項目を返すのみ（通知はしない）
+        if is_items_request(event):
+            endpoint = ItemsEndpoint(
+                config, lambda: ShoppingReminderProcessor(config).query_items()
+            )
+            return endpoint.handle(event).to_lambda()
 
-        # 3. レスポンスの作成
-        if result.success:
-            logger.info("Lambda execution completed successfully")
-            return {
-                "statusCode": 200,
-                "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(
-                    {"success": True, "message": result.message}, ensure_ascii=False
-                ),
-            }
-        else:
-            logger.error("Lambda execution completed with errors")
+        # Notion の Webhook（関数 URL 経由）の場合は項目の状態を更新するのみ
+        if is_webhook_event(event):
+            webhook_response = WebhookProcessor(config).handle(event)
             return {
-                "statusCode": 500,
+                "statusCode": webhook_response.status,
                 "headers": {"Content-Type": "application/json"},
-                "body": json.dumps(
-                    {"success": False, "message": result.message, "error": result.error},
-                    ensure_ascii=False,
-                ),
+                "body": json_codec.dumps_str(webhook_response.body),
             }
 
+        # 完了した項目のアーカイブなどのメンテナンス
+        if event.get("maintenance") == ARCHIVE_COMPLETED:
+            return _run_archive(event, config, context)
+
+        # 2. 再試行されたイベントは処理済みであれば前回のレスポンスを返す
+        key = idempotency_key(event, config)
+        if key is None:
+            return _run_processor(event, config)
+        return _run_idempotent(key, event, config, context)
+
     except ConfigError as e:
         logger.exception(f"Configuration error: {str(e)}")
         return {
             "statusCode": 400,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(
-                {"success": False, "message": "設定エラーが発生しました。", "error": str(e)},
-                ensure_ascii=False,
+            "body": json_codec.dumps_str(
+                {"success": False, "message": "設定エラーが発生しました。", "error": str(e)}
             ),
         }
     except Exception as e:
@@ -105,8 +615,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(
-                {"success": False, "message": "予期しないエラーが発生しました。", "error": str(e)},
-                ensure_ascii=False,
+            "body": json_codec.dumps_str(
+                {"success": False, "message": "予期しないエラーが発生しました。", "error": str(e)}
             ),
         }
+
+
+# 初期化フェーズ（最初の呼び出しの前）に設定や接続を準備する（PRIME_ON_INIT）
+if is_priming_enabled():
+    prime(ShoppingReminderProcessor)
@@ -1,6 +1,10 @@
 import logging
+import threading
 from typing import Optional
 
+# 複数のスレッドから同時に呼ばれてもハンドラーを1つだけ追加する
+_setup_lock = threading.Lock()
+
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
@@ -18,6 +22,15 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     if logger.handlers:
         return logger
 
+    with _setup_lock:
+        # ロックを待つ間に別のスレッドが設定した場合
+        if not logger.handlers:
+            _configure(logger)
+    return logger
+
+
+def _configure(logger: logging.Logger) -> None:
+    """ロガーにハンドラーとフォーマッターを設定（ハンドラーの追加を最後に行う）"""
     # CloudWatchでの可視性を高めるためのログ設定
     logger.setLevel(logging.INFO)
 
@@ -29,9 +42,8 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     handler.setFormatter(formatter)
 
-    logger.addHandler(handler)
-
     # 重複ログを防ぐ
     logger.propagate = False
 
-    return logger
+    # ロックの外では handlers の有無で設定済みかを判定するため、設定が揃ってから追加する
+    logger.addHandler(handler)
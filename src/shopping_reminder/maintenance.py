@@ -0,0 +1,95 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# 完了した項目をアーカイブするまでの既定の日数（最終編集からの経過日数）
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+
+# アーカイブのリクエストを同時に送信する既定の数
+DEFAULT_ARCHIVE_WORKERS = 3
+
+# メンテナンスのイベント（{"maintenance": "archive_completed", ...}）の種類
+ARCHIVE_COMPLETED = "archive_completed"
+
+
+class RateLimiter:
+    """スレッド間で共有できるトークンバケット方式のレートリミッター
+
+    AsyncRateLimiter と同じく、Notion API の平均リクエストレート（1インテグレーション
+    あたり毎秒3リクエスト）に合わせる。
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = 3.0,
+        burst: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """トークンを1つ取得するまで待機"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                elapsed = now - self._updated_at
+                self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_second
+            self.sleep(wait)
+
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(api_key: str) -> RateLimiter:
+    """APIキーごとに共有されるレートリミッターを返す"""
+    with _limiters_lock:
+        limiter = _limiters.get(api_key)
+        if limiter is None:
+            limiter = _limiters[api_key] = RateLimiter()
+        return limiter
+
+
+@dataclass
+class ArchiveResult:
+    """完了した項目のアーカイブの進捗・結果
+
+    complete=False は打ち切り（実行時間の上限など）により、対象が残っている可能性を表す。
+    アーカイブした項目はクエリに含まれなくなるため、再実行すれば残りから続けられる。
+    """
+
+    dry_run: bool = False
+    matched: int = 0
+    archived: int = 0
+    failed: int = 0
+    complete: bool = True
+    failed_ids: List[str] = field(default_factory=list)
+
+    def snapshot(self) -> "ArchiveResult":
+        """チェックポイントとして通知する、その時点の写し"""
+        return ArchiveResult(
+            dry_run=self.dry_run,
+            matched=self.matched,
+            archived=self.archived,
+            failed=self.failed,
+            complete=self.complete,
+            failed_ids=list(self.failed_ids),
+        )
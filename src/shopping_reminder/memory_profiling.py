@@ -0,0 +1,181 @@
+import contextvars
+import os
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# 環境変数またはイベントのフィールドでプロファイリングを有効にする
+MEMORY_PROFILING_ENV = "MEMORY_PROFILING"
+MEMORY_PROFILING_EVENT_FIELD = "memory_profiling"
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+@dataclass
+class AllocationSite:
+    site: str
+    size_bytes: int
+    count: int
+
+
+@dataclass
+class PhaseProfile:
+    name: str
+    calls: int = 0
+    peak_bytes: int = 0
+    allocated_bytes: int = 0
+    top_allocations: List[AllocationSite] = field(default_factory=list)
+
+
+@dataclass
+class _ActivePhase:
+    name: str
+    start_bytes: int
+    start_snapshot: tracemalloc.Snapshot
+    peak_bytes: int = 0
+
+
+class MemoryProfiler:
+    """tracemalloc で処理フェーズごとのメモリ使用量を計測する
+
+    フェーズは入れ子にでき、内側のフェーズのピークは外側のフェーズにも反映される。
+    同じ名前のフェーズが複数回実行された場合は、ピークが最大だった回の
+    割り当て箇所を報告する。
+    """
+
+    def __init__(self, top_n: int = 5, frames: int = 1) -> None:
+        self.top_n = top_n
+        self.frames = frames
+        self.phases: Dict[str, PhaseProfile] = {}
+        self.peak_bytes = 0
+        self._stack: List[_ActivePhase] = []
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """計測を開始（既に tracemalloc が有効な場合はそれを利用）"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        logger.info("Memory profiling started")
+
+    def stop(self) -> None:
+        """計測を終了"""
+        self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        logger.info("Memory profiling stopped")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """フェーズの実行中のピークと割り当て箇所を記録"""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # 外側のフェーズのここまでのピークを退避してから計測し直す
+            self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, peak)
+        tracemalloc.reset_peak()
+        active = _ActivePhase(name, current, tracemalloc.take_snapshot())
+        self._stack.append(active)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            end_snapshot = tracemalloc.take_snapshot()
+            end_bytes, peak = tracemalloc.get_traced_memory()
+            active.peak_bytes = max(active.peak_bytes, peak)
+            if self._stack:
+                self._stack[-1].peak_bytes = max(self._stack[-1].peak_bytes, active.peak_bytes)
+            self.peak_bytes = max(self.peak_bytes, active.peak_bytes)
+            tracemalloc.reset_peak()
+            self._record(active, end_bytes, end_snapshot)
+
+    def report(self) -> Dict[str, Any]:
+        """計測結果をレスポンスに含められる形式で返す"""
+        return {
+            "peak_bytes": self.peak_bytes,
+            "phases": [asdict(phase) for phase in self.phases.values()],
+        }
+
+    def log_report(self) -> None:
+        """計測結果をログに出力"""
+        logger.info(f"Memory profile: overall peak {self.peak_bytes} bytes")
+        for phase in self.phases.values():
+            logger.info(
+                f"Memory profile [{phase.name}]: peak {phase.peak_bytes} bytes, "
+                f"allocated {phase.allocated_bytes} bytes over {phase.calls} calls"
+            )
+            for allocation in phase.top_allocations:
+                logger.info(
+                    f"  {allocation.site}: {allocation.size_bytes} bytes "
+                    f"({allocation.count} blocks)"
+                )
+
+    def _record(
+        self, active: _ActivePhase, end_bytes: int, end_snapshot: tracemalloc.Snapshot
+    ) -> None:
+        profile = self.phases.setdefault(active.name, PhaseProfile(name=active.name))
+        profile.calls += 1
+        profile.allocated_bytes += max(end_bytes - active.start_bytes, 0)
+        if active.peak_bytes < profile.peak_bytes and profile.top_allocations:
+            return
+
+        profile.peak_bytes = max(profile.peak_bytes, active.peak_bytes)
+        snapshot = end_snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        )
+        stats = snapshot.compare_to(active.start_snapshot, "lineno")
+        profile.top_allocations = [
+            AllocationSite(
+                site=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                size_bytes=stat.size_diff,
+                count=stat.count_diff,
+            )
+            for stat in stats
+            if stat.size_diff > 0
+        ][: self.top_n]
+
+
+_active_profiler: contextvars.ContextVar[Optional[MemoryProfiler]] = contextvars.ContextVar(
+    "memory_profiler", default=None
+)
+
+
+def is_profiling_requested(event: Optional[Dict[str, Any]] = None) -> bool:
+    """環境変数またはイベントでプロファイリングが要求されているか"""
+    if event and event.get(MEMORY_PROFILING_EVENT_FIELD):
+        return True
+    return os.environ.get(MEMORY_PROFILING_ENV, "").strip().lower() in _TRUE_VALUES
+
+
+@contextmanager
+def activate_profiler(profiler: MemoryProfiler) -> Iterator[MemoryProfiler]:
+    """ブロック内の profile_phase を指定したプロファイラで計測する"""
+    token = _active_profiler.set(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active_profiler.reset(token)
+
+
+@contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """有効なプロファイラがあればフェーズとして計測（無効時は何もしない）"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
 
 
 @dataclass
@@ -29,8 +29,22 @@ class NotionDatabaseItem:
         return ShoppingItem(id=self.id, name=name, checked=checked)
 
 
+@dataclass
+class OmittedItems:
+    count: int
+    lower_bound: bool = False
+
+
+@dataclass
+class DestinationResult:
+    page_id: str
+    success: bool
+    error: Optional[str] = None
+
+
 @dataclass
 class NotificationResult:
     success: bool
     message: str
     error: Optional[str] = None
+    destinations: List[DestinationResult] = field(default_factory=list)
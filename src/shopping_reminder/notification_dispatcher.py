@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+# Lambda環境での絶対インポート
+from adaptive_concurrency import AsyncAdaptiveLimiter
+from async_notion_client import AsyncNotionClient
+import json_codec
+from logger import get_logger
+from models import DestinationResult, NotificationResult, OmittedItems, ShoppingItem
+from notion_client import NotionAPIError
+
+logger = get_logger(__name__)
+
+# ページIDを差し込む位置の目印（JSONエンコード後も一意に特定できる文字）
+_PAGE_ID_PLACEHOLDER = "\x00"
+
+
+class NotificationDispatcher:
+    """同じリマインダーを複数のNotionページへ並行して投稿する
+
+    メッセージの作成とJSONエンコードは1回だけ行い、宛先ごとにページIDの
+    部分だけを差し替えたリクエストボディを送信する。同時に送信する数は
+    max_concurrency を上限に、Notion の応答（429・5xx・応答時間）に応じて調整する。
+    """
+
+    def __init__(self, client: AsyncNotionClient, max_concurrency: int = 5) -> None:
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+    async def dispatch(
+        self,
+        items: List[ShoppingItem],
+        page_ids: List[str],
+        stale_items: Optional[Dict[str, int]] = None,
+        omitted: Optional[OmittedItems] = None,
+    ) -> NotificationResult:
+        """未チェック項目の通知を全ての宛先ページに投稿"""
+        if not items:
+            logger.info("No unchecked items found - skipping comment creation")
+            return NotificationResult(
+                success=True, message="未チェック項目はありません。通知は送信されませんでした。"
+            )
+
+        message = self.client.format_comment_message(items, stale_items, omitted)
+        logger.info(f"Comment message: {message}")
+        prefix, suffix = self._encode_template(message)
+
+        limiter = AsyncAdaptiveLimiter(self.client.concurrency, self.max_concurrency)
+
+        async def post(page_id: str) -> DestinationResult:
+            payload = prefix + json_codec.dumps(page_id)[1:-1] + suffix
+            async with limiter.slot():
+                try:
+                    await self.client.post_comment_payload(payload)
+                except NotionAPIError as e:
+                    logger.error(f"Failed to create comment on page {page_id}: {e}")
+                    return DestinationResult(page_id=page_id, success=False, error=str(e))
+            logger.info(f"Comment created on page {page_id}")
+            return DestinationResult(page_id=page_id, success=True)
+
+        logger.info(f"Dispatching comment to {len(page_ids)} pages")
+        destinations = list(await asyncio.gather(*(post(page_id) for page_id in page_ids)))
+        return self._summarize(items, destinations)
+
+    def _encode_template(self, message: str) -> Tuple[bytes, bytes]:
+        """ページIDの前後で分割したエンコード済みリクエストボディを作成"""
+        body = self.client.build_comment_body(message, _PAGE_ID_PLACEHOLDER)
+        encoded = json_codec.dumps(body)
+        prefix, suffix = encoded.split(json_codec.dumps(_PAGE_ID_PLACEHOLDER)[1:-1], 1)
+        return prefix, suffix
+
+    @staticmethod
+    def _summarize(
+        items: List[ShoppingItem], destinations: List[DestinationResult]
+    ) -> NotificationResult:
+        """宛先ごとの結果を1つのNotificationResultにまとめる"""
+        succeeded = sum(1 for destination in destinations if destination.success)
+        failed = [destination for destination in destinations if not destination.success]
+
+        if not failed:
+            return NotificationResult(
+                success=True,
+                message=(
+                    f"{len(items)}件の未チェック項目について{succeeded}ページに通知を送信しました。"
+                ),
+                destinations=destinations,
+            )
+
+        return NotificationResult(
+            success=False,
+            message=(
+                f"{len(destinations)}ページ中{len(failed)}ページへのコメントの作成に失敗しました。"
+            ),
+            error="; ".join(f"{d.page_id}: {d.error}" for d in failed),
+            destinations=destinations,
+        )
@@ -1,12 +1,33 @@
-import json
-import urllib.request
-import urllib.parse
-from typing import List, Dict, Any
+import hashlib
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple, TypeVar
 
 # Lambda環境での絶対インポート
-from models import ShoppingItem, NotionDatabaseItem, NotificationResult
+from models import ShoppingItem, NotionDatabaseItem, NotificationResult, OmittedItems
 from config import Config
 from logger import get_logger
+from adaptive_concurrency import (
+    AdaptiveConcurrencyLimit,
+    AdaptiveLimiter,
+    get_concurrency_limit,
+)
+from circuit_breaker import CircuitBreakerTransport, CircuitOpenError, endpoint_key
+from hedging import HedgingTransport, is_idempotent_read
+import json_codec
+from json_codec import LazyJSON
+from maintenance import (
+    DEFAULT_ARCHIVE_WORKERS,
+    ArchiveResult,
+    RateLimiter,
+    get_rate_limiter,
+)
+from memory_profiling import profile_phase
+from single_flight import SingleFlight, get_default_group
+from transport import Transport, TransportRequest, UrllibTransport
+from usage import UsageTracker, get_usage_tracker
 
 logger = get_logger(__name__)
 
@@ -17,63 +38,374 @@ class NotionAPIError(Exception):
     pass
 
 
-class NotionClient:
-    """Notion API を操作するクライアント"""
+NOTION_API_BASE_URL = "https://api.notion.com/v1"
+NOTION_API_VERSION = "2022-06-28"
 
-    def __init__(self, config: Config) -> None:
+# 上位N件モードの並び順（古い項目から）
+OLDEST_FIRST = [{"timestamp": "created_time", "direction": "ascending"}]
+
+# 変更検出の並び順（最後に編集された項目から）
+NEWEST_EDIT_FIRST = [{"timestamp": "last_edited_time", "direction": "descending"}]
+
+# データベースのクエリを1ページ送信する関数（URL と本文を受け取り、デコードした応答を返す）
+QueryPost = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+T = TypeVar("T")
+
+
+class NotionClientBase:
+    """同期・非同期クライアントで共通のリクエスト組み立て処理"""
+
+    def __init__(self, config: Config, base_url: Optional[str] = None) -> None:
+        """base_url を省略した場合は設定の NOTION_API_BASE_URL（未設定の場合は Notion API）"""
         self.config = config
-        self.base_url = "https://api.notion.com/v1"
-        logger.info("NotionClient initialized")
+        self.base_url = base_url or config.notion_api_base_url or NOTION_API_BASE_URL
+        logger.info(f"{type(self).__name__} initialized")
         logger.info(f"Database ID: {config.notion_database_id}")
         logger.info(f"Page ID: {config.notion_page_id}")
 
+    def _build_headers(self) -> Dict[str, str]:
+        """Notion API 共通のリクエストヘッダーを構築"""
+        return {
+            "Authorization": f"Bearer {self.config.notion_api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_API_VERSION,
+        }
+
+    def _build_query_body(
+        self,
+        filter_obj: Dict[str, Any],
+        start_cursor: Optional[str],
+        page_size: int = 100,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """データベースクエリのリクエストボディを構築"""
+        body: Dict[str, Any] = {"filter": filter_obj, "page_size": page_size}
+        if sorts:
+            body["sorts"] = sorts
+        if start_cursor:
+            body["start_cursor"] = start_cursor
+        return body
+
+    @staticmethod
+    def _build_probe_body() -> Dict[str, Any]:
+        """変更検出のリクエストボディ（チェック済みを含む全項目から最後に編集された1件）"""
+        return {"page_size": 1, "sorts": NEWEST_EDIT_FIRST}
+
+    @staticmethod
+    def _parse_watermark(response_data: Dict[str, Any]) -> str:
+        """変更検出の結果から「最終編集日時 ページID」のウォーターマークを作成（空の場合は空文字）"""
+        results = response_data.get("results") or []
+        if not results:
+            return ""
+        return f"{results[0]['last_edited_time']} {results[0]['id']}"
+
+    def build_comment_body(self, message: str, page_id: str) -> Dict[str, Any]:
+        """コメント作成のリクエストボディを構築"""
+        return {
+            "parent": {"page_id": page_id},
+            "rich_text": [{"type": "text", "text": {"content": message}}],
+        }
+
+    def _parse_query_results(self, response_data: Dict[str, Any]) -> List[ShoppingItem]:
+        """クエリ結果のページをShoppingItemのリストに変換"""
+        items = []
+        for item_data in response_data["results"]:
+            notion_item = NotionDatabaseItem(id=item_data["id"], properties=item_data["properties"])
+            shopping_item = notion_item.to_shopping_item()
+            items.append(shopping_item)
+            logger.info(
+                f"Processed item: {shopping_item.name} (ID: {shopping_item.id}, Checked: {shopping_item.checked})"
+            )
+        return items
+
+    @staticmethod
+    def _truncate_top_items(
+        results: List[ShoppingItem], limit: int, has_more: bool
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """取得した項目を limit 件に切り詰め、省略した件数を求める"""
+        if len(results) <= limit and not has_more:
+            return results, None
+        omitted = OmittedItems(count=max(len(results) - limit, 0), lower_bound=has_more)
+        logger.info(
+            f"Stopped paginating after {limit} items "
+            f"({omitted.count}{'+' if has_more else ''} more unchecked items)"
+        )
+        return results[:limit], omitted
+
+    def _build_filter_for_unchecked_items(self) -> Dict[str, Any]:
+        """未チェック項目を取得するためのフィルターを構築"""
+        return {"property": "完了", "checkbox": {"equals": False}}
+
+    def format_comment_message(
+        self,
+        items: List[ShoppingItem],
+        stale_items: Optional[Dict[str, int]] = None,
+        omitted: Optional[OmittedItems] = None,
+    ) -> str:
+        """コメント用のメッセージを作成
+
+        stale_items は項目IDと未チェックの継続日数、omitted は一覧に含めなかった項目の件数。
+        """
+        count = len(items)
+        if omitted is not None and omitted.count:
+            at_least = "以上" if omitted.lower_bound else ""
+            message = f"🛒 {count + omitted.count}件{at_least}の未チェック項目があります:\n\n"
+        else:
+            message = f"🛒 {count}件の未チェック項目があります:\n\n"
+
+        stale_items = stale_items or {}
+        for item in items:
+            if item.id in stale_items:
+                message += f"• ⚠️ {item.name}（{stale_items[item.id]}日間未チェック）\n"
+            else:
+                message += f"• {item.name}\n"
+        if omitted is not None and omitted.count:
+            at_least = "以上" if omitted.lower_bound else ""
+            message += f"…ほか{omitted.count}件{at_least}\n"
+
+        message += "\n買い忘れがないよう確認をお願いします！"
+        return message
+
+
+class NotionClient(NotionClientBase):
+    """Notion API を操作するクライアント
+
+    HTTP の送受信は transport に委譲する（省略時は urllib で実際に送信し、
+    ウォームスタート間で共有するサーキットブレーカーを通す。HEDGE_READ_PERCENTILE
+    指定時は読み取りのリクエストをヘッジする）。同時に実行中の同じ読み取りのリクエストは
+    1件にまとめる（同じデータベースを対象とする複数のクライアント間でも共有する）。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        base_url: Optional[str] = None,
+        transport: Optional[Transport] = None,
+        single_flight: Optional[SingleFlight] = None,
+        usage: Optional[UsageTracker] = None,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+    ) -> None:
+        super().__init__(config, base_url)
+        self.transport = transport or self._default_transport(config)
+        self.single_flight = single_flight or get_default_group()
+        self.usage = usage or get_usage_tracker()
+        self.concurrency = concurrency or get_concurrency_limit(config.notion_api_key)
+
+    @staticmethod
+    def _default_transport(config: Config) -> Transport:
+        transport: Transport = CircuitBreakerTransport(UrllibTransport())
+        if config.hedge_read_percentile:
+            transport = HedgingTransport(
+                transport,
+                percentile=config.hedge_read_percentile,
+                target=config.notion_database_id,
+            )
+        return transport
+
     def query_unchecked_items(self) -> List[ShoppingItem]:
         """未チェック項目をデータベースから取得"""
         url = f"{self.base_url}/databases/{self.config.notion_database_id}/query"
         logger.info(f"Querying Notion database: {url}")
 
         filter_obj = self._build_filter_for_unchecked_items()
-        logger.info(f"Filter object: {json.dumps(filter_obj)}")
+        logger.debug("Filter object: %s", LazyJSON(filter_obj))
+
+        if self.config.query_shards > 1:
+            results = self._query_sharded(url, filter_obj, self.config.query_shards)
+        else:
+            results = self._paginate(url, filter_obj)
+
+        logger.info(f"Query completed. Total items found: {len(results)}")
+        return results
+
+    def probe_watermark(self) -> str:
+        """1件だけのクエリでデータベースの最終編集のウォーターマークを取得
+
+        項目の追加・編集・チェックのいずれでも変わるため、前回と同じであれば
+        前回のクエリ結果を再利用できる。
+        """
+        url = f"{self.base_url}/databases/{self.config.notion_database_id}/query"
+        logger.info(f"Probing database for changes: {url}")
+        watermark = self._parse_watermark(self._make_post_request(url, self._build_probe_body()))
+        logger.info(f"Database watermark: {watermark or 'empty'}")
+        return watermark
+
+    def query_top_unchecked_items(
+        self, limit: int
+    ) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        """古い順に未チェック項目を limit 件まで取得
+
+        limit 件が集まった時点でページングを打ち切る。取得済みのページに含まれていた
+        残りの件数を omitted として返し、未取得のページが残っている場合は下限値とする。
+        """
+        url = f"{self.base_url}/databases/{self.config.notion_database_id}/query"
+        logger.info(f"Querying top {limit} unchecked items: {url}")
+
+        filter_obj = self._build_filter_for_unchecked_items()
+        results: List[ShoppingItem] = []
+        has_more = False
+        for page_items, has_more in self._iter_pages(url, filter_obj, sorts=OLDEST_FIRST):
+            results.extend(page_items)
+            if len(results) >= limit:
+                break
+
+        return self._truncate_top_items(results, limit, has_more)
 
+    def _paginate(
+        self,
+        url: str,
+        filter_obj: Dict[str, Any],
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        post: Optional[QueryPost] = None,
+    ) -> List[ShoppingItem]:
+        """カーソルをたどって全ページの結果を取得"""
         results = []
+        for page_items, _ in self._iter_pages(url, filter_obj, sorts, post=post):
+            results.extend(page_items)
+        return results
+
+    def _iter_pages(
+        self,
+        url: str,
+        filter_obj: Dict[str, Any],
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 100,
+        post: Optional[QueryPost] = None,
+    ) -> Iterator[Tuple[List[ShoppingItem], bool]]:
+        """ページごとの項目と続きのページがあるかを返す（呼び出し側が止めると以降は取得しない）
+
+        post を指定すると、各ページのクエリをその関数で送信する。
+        """
+        send = post or self._make_post_request
         start_cursor = None
         page_count = 0
 
         while True:
             page_count += 1
-            body = {"filter": filter_obj, "page_size": 100}
-            if start_cursor:
-                body["start_cursor"] = start_cursor
+            body = self._build_query_body(filter_obj, start_cursor, page_size, sorts)
 
             logger.info(f"Sending request for page {page_count}")
-            logger.info(f"Request body: {json.dumps(body)}")
+            logger.debug("Request body: %s", LazyJSON(body))
 
-            response_data = self._make_post_request(url, body)
+            response_data = send(url, body)
 
             logger.info(f"Response received for page {page_count}")
             logger.info(f"Response contains {len(response_data.get('results', []))} items")
 
             # NotionDatabaseItemからShoppingItemに変換
-            for item_data in response_data["results"]:
-                notion_item = NotionDatabaseItem(
-                    id=item_data["id"], properties=item_data["properties"]
-                )
-                shopping_item = notion_item.to_shopping_item()
-                results.append(shopping_item)
-                logger.info(
-                    f"Processed item: {shopping_item.name} (ID: {shopping_item.id}, Checked: {shopping_item.checked})"
-                )
+            with profile_phase("decode"):
+                page_items = self._parse_query_results(response_data)
 
-            if not response_data["has_more"]:
-                break
+            has_more = bool(response_data["has_more"])
+            yield page_items, has_more
+            if not has_more:
+                return
 
             start_cursor = response_data.get("next_cursor")
             logger.info(f"Moving to next page with cursor: {start_cursor}")
 
-        logger.info(f"Query completed. Total items found: {len(results)}")
+    def _query_sharded(
+        self, url: str, filter_obj: Dict[str, Any], shards: int, max_retries: int = 3
+    ) -> List[ShoppingItem]:
+        """作成日時の範囲でデータベースを分割し、範囲ごとに並行して取得"""
+        time_range = self._probe_created_time_range(url, filter_obj)
+        if time_range is None:
+            logger.info("No items found by probe query")
+            return []
+
+        windows = self._split_created_time(*time_range, shards)
+        if len(windows) == 1:
+            return self._paginate(url, filter_obj)
+        logger.info(f"Querying {len(windows)} created_time shards in parallel")
+
+        # 区間ごとのクエリも同じAPIキーのレートリミッターと同時実行数の上限を共有し、
+        # 429 は Retry-After だけ待ってそのページから再試行する
+        limiter = get_rate_limiter(self.config.notion_api_key)
+        gate = AdaptiveLimiter(self.concurrency, len(windows))
+
+        def post(page_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+            return self._call_with_retry(
+                lambda: self._make_post_request(page_url, body),
+                "POST",
+                page_url,
+                limiter,
+                gate,
+                max_retries,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(windows), thread_name_prefix="shard") as executor:
+            shard_results = list(
+                executor.map(
+                    lambda window: self._paginate(
+                        url, self._build_created_time_filter(filter_obj, *window), post=post
+                    ),
+                    windows,
+                )
+            )
+
+        # 区間は重ならないが、境界の比較精度の違いで同じ項目が複数の区間に含まれた場合に備える
+        results: List[ShoppingItem] = []
+        seen = set()
+        for shard in shard_results:
+            for item in shard:
+                if item.id not in seen:
+                    seen.add(item.id)
+                    results.append(item)
         return results
 
-    def create_comment(self, items: List[ShoppingItem]) -> NotificationResult:
+    def _probe_created_time_range(
+        self, url: str, filter_obj: Dict[str, Any]
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """1件ずつのクエリで対象項目の最も古い作成日時と新しい作成日時を取得"""
+        bounds = []
+        for direction in ("ascending", "descending"):
+            body = self._build_query_body(
+                filter_obj,
+                None,
+                page_size=1,
+                sorts=[{"timestamp": "created_time", "direction": direction}],
+            )
+            response_data = self._make_post_request(url, body)
+            if not response_data["results"]:
+                return None
+            created_time = response_data["results"][0]["created_time"]
+            bounds.append(datetime.fromisoformat(created_time))
+        return bounds[0], bounds[1]
+
+    @staticmethod
+    def _split_created_time(
+        oldest: datetime, newest: datetime, shards: int
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """作成日時の範囲を重ならない区間に分割（両端は上限・下限なし）"""
+        if newest <= oldest:
+            return [(None, None)]
+        step = (newest - oldest) / shards
+        boundaries = [(oldest + step * i).isoformat() for i in range(1, shards)]
+        starts: List[Optional[str]] = [None, *boundaries]
+        ends: List[Optional[str]] = [*boundaries, None]
+        return list(zip(starts, ends))
+
+    @staticmethod
+    def _build_created_time_filter(
+        filter_obj: Dict[str, Any], on_or_after: Optional[str], before: Optional[str]
+    ) -> Dict[str, Any]:
+        """作成日時の区間で絞り込むフィルターを構築"""
+        conditions = [filter_obj]
+        if on_or_after is not None:
+            conditions.append(
+                {"timestamp": "created_time", "created_time": {"on_or_after": on_or_after}}
+            )
+        if before is not None:
+            conditions.append({"timestamp": "created_time", "created_time": {"before": before}})
+        return {"and": conditions}
+
+    def create_comment(
+        self,
+        items: List[ShoppingItem],
+        stale_items: Optional[Dict[str, int]] = None,
+        omitted: Optional[OmittedItems] = None,
+    ) -> NotificationResult:
         """未チェック項目のリストからコメントを作成"""
         if not items:
             logger.info("No unchecked items found - skipping comment creation")
@@ -85,17 +417,15 @@ class NotionClient:
             url = f"{self.base_url}/comments"
             logger.info(f"Creating comment at: {url}")
 
-            message = self._format_comment_message(items)
+            with profile_phase("render"):
+                message = self.format_comment_message(items, stale_items, omitted)
+                body = self.build_comment_body(message, self.config.notion_page_id)
             logger.info(f"Comment message: {message}")
 
-            body = {
-                "parent": {"page_id": self.config.notion_page_id},
-                "rich_text": [{"type": "text", "text": {"content": message}}],
-            }
-
-            logger.info(f"Comment request body: {json.dumps(body)}")
-            response_data = self._make_post_request(url, body)
-            logger.info(f"Comment creation response: {json.dumps(response_data)}")
+            logger.debug("Comment request body: %s", LazyJSON(body))
+            with profile_phase("post"):
+                response_data = self._make_post_request(url, body)
+            logger.debug("Comment creation response: %s", LazyJSON(response_data))
 
             logger.info(f"Comment created successfully for {len(items)} items")
             return NotificationResult(
@@ -108,37 +438,160 @@ class NotionClient:
                 success=False, message="コメントの作成に失敗しました。", error=str(e)
             )
 
-    def _build_filter_for_unchecked_items(self) -> Dict[str, Any]:
-        """未チェック項目を取得するためのフィルターを構築"""
-        return {"property": "完了", "checkbox": {"equals": False}}
-
-    def _format_comment_message(self, items: List[ShoppingItem]) -> str:
-        """コメント用のメッセージを作成"""
-        count = len(items)
-        message = f"🛒 {count}件の未チェック項目があります:\n\n"
+    def iter_completed_page_ids(self, edited_before: datetime) -> Iterator[List[str]]:
+        """最終編集が edited_before より前の完了した項目のページIDを、クエリのページごとに返す"""
+        url = f"{self.base_url}/databases/{self.config.notion_database_id}/query"
+        filter_obj = {
+            "and": [
+                {"property": "完了", "checkbox": {"equals": True}},
+                {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"before": edited_before.isoformat()},
+                },
+            ]
+        }
+        start_cursor = None
+        while True:
+            body = self._build_query_body(filter_obj, start_cursor, sorts=OLDEST_FIRST)
+            response_data = self._make_post_request(url, body)
+            yield [page["id"] for page in response_data["results"]]
+            if not response_data["has_more"]:
+                return
+            start_cursor = response_data.get("next_cursor")
 
-        for item in items:
-            message += f"• {item.name}\n"
+    def archive_page(self, page_id: str) -> Dict[str, Any]:
+        """ページをアーカイブ（同じ内容の再送は結果が変わらないため、429 の場合は再試行できる）"""
+        return self._make_request("PATCH", f"{self.base_url}/pages/{page_id}", {"archived": True})
+
+    def archive_completed_items(
+        self,
+        older_than_days: int,
+        dry_run: bool = False,
+        max_workers: int = DEFAULT_ARCHIVE_WORKERS,
+        rate_limiter: Optional[RateLimiter] = None,
+        on_checkpoint: Optional[Callable[[ArchiveResult], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        max_retries: int = 3,
+    ) -> ArchiveResult:
+        """最終編集から older_than_days 日以上経った完了した項目をアーカイブ
+
+        クエリの1ページ（最大100件）ごとに、レートリミッター（省略時は同じAPIキーで共有）と
+        応答に応じて調整する同時実行数（max_workers まで）の範囲で並行してアーカイブし、
+        ページごとの進捗を on_checkpoint に渡す。
+        Notion のカーソルは次のページの先頭の項目を指すため、取得済みの項目を
+        アーカイブしても続きのページの取得には影響しない。dry_run=True の場合は
+        対象の件数を数えるのみ。should_stop が True を返した時点で打ち切る。
+        """
+        edited_before = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        limiter = rate_limiter or get_rate_limiter(self.config.notion_api_key)
+        result = ArchiveResult(dry_run=dry_run)
+        mode = "Counting" if dry_run else "Archiving"
+        logger.info(f"{mode} completed items last edited before {edited_before.isoformat()}")
+
+        gate = AdaptiveLimiter(self.concurrency, max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="archive") as executor:
+            for page_ids in self.iter_completed_page_ids(edited_before):
+                result.matched += len(page_ids)
+                if not dry_run:
+                    outcomes = executor.map(
+                        lambda page_id: self._archive_with_retry(
+                            page_id, limiter, gate, max_retries
+                        ),
+                        page_ids,
+                    )
+                    for page_id, archived in zip(page_ids, outcomes):
+                        if archived:
+                            result.archived += 1
+                        else:
+                            result.failed += 1
+                            result.failed_ids.append(page_id)
+                logger.info(
+                    f"Archive checkpoint: matched={result.matched} "
+                    f"archived={result.archived} failed={result.failed}"
+                )
+                if on_checkpoint is not None:
+                    on_checkpoint(result.snapshot())
+                if should_stop is not None and should_stop():
+                    logger.warning("Stopping archive before all completed items were processed")
+                    result.complete = False
+                    break
+        return result
+
+    def _archive_with_retry(
+        self, page_id: str, limiter: RateLimiter, gate: AdaptiveLimiter, max_retries: int
+    ) -> bool:
+        """1件をアーカイブ（429 の場合は Retry-After だけ待って再試行し、成否を返す）"""
+        try:
+            self._call_with_retry(
+                lambda: self.archive_page(page_id),
+                "PATCH",
+                f"{self.base_url}/pages/{page_id}",
+                limiter,
+                gate,
+                max_retries,
+            )
+        except NotionAPIError as e:
+            logger.error(f"Failed to archive page {page_id}: {e}")
+            return False
+        return True
+
+    def _call_with_retry(
+        self,
+        call: Callable[[], T],
+        method: str,
+        url: str,
+        limiter: RateLimiter,
+        gate: AdaptiveLimiter,
+        max_retries: int,
+    ) -> T:
+        """レートリミッターと同時実行数の範囲で call を実行
+
+        429 の場合は Retry-After だけ待って max_retries 回まで再試行する。
+        """
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                with gate.slot():
+                    return call()
+            except NotionAPIError as e:
+                cause = e.__cause__
+                if (
+                    isinstance(cause, urllib.error.HTTPError)
+                    and cause.code == 429
+                    and attempt < max_retries
+                ):
+                    retry_after = _retry_after_seconds(cause)
+                    logger.warning(f"Rate limited on {method} {url}, retrying after {retry_after}s")
+                    self.usage.record_retry(
+                        self.config.notion_database_id, endpoint_key(method, url)
+                    )
+                    time.sleep(retry_after)
+                    attempt += 1
+                    continue
+                raise
 
-        message += "\n買い忘れがないよう確認をお願いします！"
-        return message
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        """ページを1件取得（Webhook のイベントで変更されたページの内容を確認する）"""
+        url = f"{self.base_url}/pages/{page_id}"
+        logger.info(f"Retrieving page: {url}")
+        return self._make_request("GET", url)
 
     def _make_post_request(self, url: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Notion APIにPOSTリクエストを送信"""
-        logger.info(f"Making POST request to: {url}")
+        return self._make_request("POST", url, data)
 
-        json_data = json.dumps(data).encode("utf-8")
+    def _make_request(
+        self, method: str, url: str, data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Notion APIにリクエストを送信（data が無い場合は本文なし）"""
+        logger.info(f"Making {method} request to: {url}")
+
+        json_data = json_codec.dumps(data) if data is not None else b""
         logger.info(f"Request data size: {len(json_data)} bytes")
 
-        request = urllib.request.Request(
-            url,
-            data=json_data,
-            headers={
-                "Authorization": f"Bearer {self.config.notion_api_key}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28",
-            },
-            method="POST",
+        request = TransportRequest(
+            method=method, url=url, headers=self._build_headers(), body=json_data
         )
 
         # ログ出力時のみAPIキーをマスク
@@ -146,26 +599,79 @@ class NotionClient:
         headers_for_log["Authorization"] = f"Bearer {self.config.notion_api_key[:10]}..."
         logger.info(f"Request headers: {headers_for_log}")
 
+        # 読み取りは同じリクエストが実行中であれば、その応答（デコード済み）を共有する
+        if is_idempotent_read(request):
+            return self.single_flight.do(
+                self._single_flight_key(request), lambda: self._send(request)
+            )
+        return self._send(request)
+
+    def _single_flight_key(self, request: TransportRequest) -> Tuple[str, str, str, bytes]:
+        """APIキー（のハッシュ）・メソッド・URL・本文が同じリクエストを同一とみなす"""
+        key_hash = hashlib.sha256(self.config.notion_api_key.encode("utf-8")).hexdigest()
+        return key_hash, request.method, request.url, request.body
+
+    def _send(self, request: TransportRequest) -> Dict[str, Any]:
+        """リクエストを送信して応答をデコード
+
+        送受信量と所要時間を利用量に記録し、応答ステータスと所要時間を同時実行数の調整に使う。
+        """
+        started = time.perf_counter()
+        received = 0
+        failed = True
+        status: Optional[int] = None
+        observed = True
+        try:
+            response_data, received = self._send_and_decode(request)
+            failed = False
+            status = 200
+            return response_data
+        except NotionAPIError as e:
+            cause = e.__cause__
+            if isinstance(cause, urllib.error.HTTPError):
+                status = cause.code
+            elif isinstance(cause, CircuitOpenError) or not isinstance(
+                cause, (urllib.error.URLError, TimeoutError)
+            ):
+                # 送信していない、または応答の内容の誤りは Notion の混雑を表さない
+                observed = False
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.usage.record(
+                self.config.notion_database_id,
+                endpoint_key(request.method, request.url),
+                len(request.body),
+                received,
+                elapsed,
+                error=failed,
+            )
+            if observed:
+                self.concurrency.record(status, elapsed)
+
+    def _send_and_decode(self, request: TransportRequest) -> Tuple[Dict[str, Any], int]:
+        """リクエストを送信し、デコードした応答と応答のサイズを返す"""
         try:
             logger.info("Sending request to Notion API...")
-            with urllib.request.urlopen(request) as response:
-                response_data = response.read()
-                status_code = response.getcode()
-
-                logger.info(f"Response status code: {status_code}")
-                logger.info(f"Response data size: {len(response_data)} bytes")
-
-                if status_code == 200:
-                    decoded_response = json.loads(response_data.decode("utf-8"))
-                    logger.info("Request completed successfully")
-                    return decoded_response
-                else:
-                    error_message = response_data.decode("utf-8")
-                    logger.error(f"API request failed with status {status_code}")
-                    logger.error(f"Error response: {error_message}")
-                    raise NotionAPIError(
-                        f"API request failed with status {status_code}: {error_message}"
-                    )
+            response = self.transport.send(request)
+            response_data = response.body
+            status_code = response.status
+
+            logger.info(f"Response status code: {status_code}")
+            logger.info(f"Response data size: {len(response_data)} bytes")
+
+            if status_code == 200:
+                with profile_phase("decode"):
+                    decoded_response = json_codec.loads(response_data)
+                logger.info("Request completed successfully")
+                return decoded_response, len(response_data)
+            else:
+                error_message = response_data.decode("utf-8")
+                logger.error(f"API request failed with status {status_code}")
+                logger.error(f"Error response: {error_message}")
+                raise NotionAPIError(
+                    f"API request failed with status {status_code}: {error_message}"
+                )
 
         except urllib.error.HTTPError as e:
             error_message = e.read().decode("utf-8") if e.fp else "Unknown error"
@@ -174,6 +680,18 @@ class NotionClient:
         except urllib.error.URLError as e:
             logger.exception(f"URL error occurred: {e.reason}")
             raise NotionAPIError(f"URL error: {e.reason}") from e
-        except json.JSONDecodeError as e:
+        except TimeoutError as e:
+            logger.exception(f"Request timed out: {e}")
+            raise NotionAPIError(f"Request timed out: {e}") from e
+        except json_codec.JSONDecodeError as e:
             logger.exception(f"JSON decode error occurred: {e}")
             raise NotionAPIError(f"JSON decode error: {e}") from e
+
+
+def _retry_after_seconds(error: urllib.error.HTTPError, default: float = 1.0) -> float:
+    """429 応答の Retry-After ヘッダー（秒数）を待機秒数に変換"""
+    value = error.headers.get("Retry-After") if error.headers is not None else None
+    try:
+        return max(0.0, float(value)) if value else default
+    except ValueError:
+        return default
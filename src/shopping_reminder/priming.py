@@ -0,0 +1,129 @@
+import gc
+import os
+import socket
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+# Lambda環境での絶対インポート
+from config import Config
+import json_codec
+from logger import get_logger
+from notion_client import NOTION_API_BASE_URL, NotionClientBase
+from transport import get_ssl_context
+
+logger = get_logger(__name__)
+
+# 初期化フェーズでの準備を有効にする環境変数
+PRIME_ON_INIT_ENV = "PRIME_ON_INIT"
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+# 接続の準備を待つ秒数（初期化フェーズは10秒で打ち切られるため短くする）
+DEFAULT_CONNECT_TIMEOUT = 2.0
+
+# 抽出処理の準備に使う、データベースのクエリ結果と同じ形式の応答
+_SAMPLE_QUERY_RESPONSE: Dict[str, Any] = {
+    "object": "list",
+    "results": [
+        {
+            "id": "00000000-0000-0000-0000-000000000000",
+            "created_time": "2025-01-01T00:00:00.000Z",
+            "last_edited_time": "2025-01-01T00:00:00.000Z",
+            "properties": {
+                "名前": {"title": [{"text": {"content": "牛乳"}}]},
+                "完了": {"checkbox": False},
+            },
+        }
+    ],
+    "has_more": False,
+    "next_cursor": None,
+}
+
+T = TypeVar("T")
+
+
+@dataclass
+class PrimingReport:
+    """初期化フェーズでの準備の結果（手順ごとの所要秒数と、失敗した手順のエラー）"""
+
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    frozen: int = 0
+
+
+def is_priming_enabled() -> bool:
+    """環境変数 PRIME_ON_INIT で初期化フェーズでの準備が有効にされているか"""
+    return os.environ.get(PRIME_ON_INIT_ENV, "").strip().lower() in _TRUE_VALUES
+
+
+def prime(
+    build_processor: Optional[Callable[[Config], Any]] = None,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+) -> PrimingReport:
+    """最初の呼び出しの前に、設定・接続・JSON の処理などを準備する
+
+    Lambda の初期化フェーズ（モジュールの import 時）に呼び出すと、最初の呼び出しの
+    前に CPU が割り当てられている間に済ませられる。各手順の失敗はログに残して続行し、
+    最後に gc.freeze() で準備したオブジェクトをガベージコレクションの対象から外す。
+    """
+    report = PrimingReport()
+    started = time.perf_counter()
+
+    # 設定の取得元（Secrets Manager など）のキャッシュを温める
+    config = _step(report, "config", Config)
+    base_url = (config.notion_api_base_url if config else None) or NOTION_API_BASE_URL
+    _step(report, "connect", lambda: _open_connection(base_url, connect_timeout))
+    _step(report, "codec", lambda: _warm_codec(config))
+    if config is not None and build_processor is not None:
+        # 共有される履歴などのデータベースやサーキットブレーカーを作成しておく
+        _step(report, "clients", lambda: build_processor(config))
+
+    gc.collect()
+    gc.freeze()
+    report.frozen = gc.get_freeze_count()
+    logger.info(
+        f"Primed in {time.perf_counter() - started:.3f}s "
+        f"({report.frozen} objects frozen, failed steps: {sorted(report.errors) or 'none'})"
+    )
+    return report
+
+
+def _step(report: PrimingReport, name: str, func: Callable[[], T]) -> Optional[T]:
+    started = time.perf_counter()
+    try:
+        return func()
+    except Exception as e:
+        report.errors[name] = str(e)
+        logger.warning(f"Priming step {name} failed: {e}")
+        return None
+    finally:
+        report.timings[name] = round(time.perf_counter() - started, 6)
+
+
+def _open_connection(base_url: str, timeout: float) -> None:
+    """名前解決と TLS ハンドシェイクを1回通しておく
+
+    urllib は送信ごとに新しい接続を開くため、この接続は閉じて再利用しない。後の送信で
+    省けるのは、共有の SSLContext の作成（証明書の読み込み）と、OS やリゾルバに
+    キャッシュがある場合の名前解決のみ。
+    """
+    parsed = urllib.parse.urlsplit(base_url)
+    host = parsed.hostname or ""
+    https = parsed.scheme == "https"
+    port = parsed.port or (443 if https else 80)
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        if https:
+            with get_ssl_context().wrap_socket(sock, server_hostname=host):
+                pass
+
+
+def _warm_codec(config: Optional[Config]) -> None:
+    """JSON のエンコード・デコードと、クエリ結果の抽出・メッセージの作成を1回通しておく"""
+    data = json_codec.loads(json_codec.dumps(_SAMPLE_QUERY_RESPONSE))
+    if config is None:
+        return
+    client = NotionClientBase(config)
+    items = client._parse_query_results(data)
+    json_codec.dumps(client.build_comment_body(client.format_comment_message(items), "priming"))
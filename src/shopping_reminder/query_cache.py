@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Lambda環境での絶対インポート
+import json_codec
+from logger import get_logger
+from models import OmittedItems, ShoppingItem
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    cache_key TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    items TEXT NOT NULL,
+    omitted TEXT
+) WITHOUT ROWID;
+"""
+
+# last_edited_time は分単位に丸められるため、同じ分の中で取得より後に編集された場合を
+# 見逃さないよう、最終編集から（時計のずれも含めて）この秒数が経ってから取得した結果のみ再利用する
+_SETTLE_SECONDS = 120
+
+
+def watermark_edited_at(watermark: str) -> Optional[datetime]:
+    """ウォーターマークに含まれる最終編集日時（データベースが空の場合は None）"""
+    edited, _, _ = watermark.partition(" ")
+    if not edited:
+        return None
+    return datetime.fromisoformat(edited.replace("Z", "+00:00"))
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """前回の全件取得（または上位N件の取得）の結果"""
+
+    watermark: str
+    fetched_at: float
+    items: List[ShoppingItem]
+    omitted: Optional[OmittedItems]
+
+    def is_reusable(self, watermark: str, max_age_seconds: float, now: float) -> bool:
+        """変更が無く、取得から max_age_seconds 以内であれば再利用できる
+
+        変更の検出は最も新しく編集された項目で行うため、項目の削除は検出できない。
+        max_age_seconds ごとに全件取得して補う。
+        """
+        if watermark != self.watermark or now - self.fetched_at >= max_age_seconds:
+            return False
+        edited_at = watermark_edited_at(watermark)
+        return edited_at is None or edited_at.timestamp() + _SETTLE_SECONDS <= self.fetched_at
+
+
+class QueryCache:
+    """データベースのクエリ結果を変更検出用のウォーターマークとともに SQLite に保存する"""
+
+    def __init__(self, path: str = ":memory:", clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"QueryCache opened: {path}")
+
+    def get(self, cache_key: str) -> Optional[CachedResult]:
+        """保存済みの結果（無い場合は None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, fetched_at, items, omitted FROM results WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+        if row is None:
+            return None
+        watermark, fetched_at, items, omitted = row
+        omitted_data = json_codec.loads(omitted) if omitted else None
+        return CachedResult(
+            watermark=watermark,
+            fetched_at=fetched_at,
+            items=[
+                ShoppingItem(id=item_id, name=name, checked=False)
+                for item_id, name in json_codec.loads(items)
+            ],
+            omitted=OmittedItems(**omitted_data) if omitted_data else None,
+        )
+
+    def put(
+        self,
+        cache_key: str,
+        watermark: str,
+        fetched_at: float,
+        items: List[ShoppingItem],
+        omitted: Optional[OmittedItems] = None,
+    ) -> None:
+        """結果を保存（fetched_at は変更を確認してから取得を始めた時刻）"""
+        omitted_json = (
+            json_codec.dumps_str({"count": omitted.count, "lower_bound": omitted.lower_bound})
+            if omitted is not None
+            else None
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (cache_key, watermark, fetched_at, items, omitted) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    cache_key,
+                    watermark,
+                    fetched_at,
+                    json_codec.dumps_str([[item.id, item.name] for item in items]),
+                    omitted_json,
+                ),
+            )
+        logger.info(f"Cached {len(items)} unchecked items (watermark: {watermark or 'empty'})")
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
+_caches_lock = threading.Lock()
+_caches: Dict[str, QueryCache] = {}
+
+
+def get_query_cache(path: str) -> QueryCache:
+    """パスごとの QueryCache を返す（ウォームスタート間で接続を再利用）"""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = QueryCache(path)
+        return cache
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """同じキーの処理が実行中であれば、新たに実行せずその結果を共有する
+
+    完了した結果は保持しない（キャッシュではないため、完了後の呼び出しは改めて実行する）。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[T]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            logger.info("Joining in-flight request")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        if call.waiters:
+            logger.info(f"Shared response with {call.waiters} concurrent callers")
+        return call.result
+
+    def in_flight(self) -> int:
+        """実行中の処理の数"""
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self) -> int:
+        """実行中の処理に合流して結果を待っている呼び出しの数"""
+        with self._lock:
+            return sum(call.waiters for call in self._calls.values())
+
+
+# ウォームスタートした実行環境や、同じプロセス内の複数のクライアントで共有する
+_default_group: SingleFlight[Any] = SingleFlight()
+
+
+def get_default_group() -> SingleFlight[Any]:
+    return _default_group
@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Lambda環境での絶対インポート
+from adaptive_concurrency import AdaptiveLimiter, get_concurrency_limit
+from config import Config, ConfigError
+from config_source import ConfigSource, ConfigSourceError, get_default_source
+from idempotency import COMPLETED, get_idempotency_store, idempotency_key, lease_seconds
+import json_codec
+from lambda_handler import ShoppingReminderProcessor
+from logger import get_logger
+from models import NotificationResult
+from target_scheduler import (
+    TARGET_COST_DB_PATH_ENV,
+    TargetCostHistory,
+    fits_in_remaining_time,
+    get_target_cost_history,
+    order_longest_first,
+    record_run,
+    target_key,
+)
+
+logger = get_logger(__name__)
+
+# 1回の呼び出しで同時に処理するメッセージ数の既定値（SQS_MAX_CONCURRENCY で変更）
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+@dataclass
+class ReminderJob:
+    """キューのメッセージ1件が表す、1つの買い物リストのリマインダー"""
+
+    message_id: str
+    name: str
+    config: Config
+
+
+def parse_job(record: Dict[str, Any], source: Optional[ConfigSource] = None) -> ReminderJob:
+    """SQS のレコードからジョブを作成
+
+    本文は {"name": ..., "config": {...}} の形式で、config に無いキーは source
+    （環境変数など）から補完する。
+    """
+    message_id = str(record.get("messageId", ""))
+    try:
+        body = json_codec.loads(record.get("body") or "")
+    except json_codec.JSONDecodeError as e:
+        raise ConfigError(f"Message {message_id} body is not valid JSON: {e}") from e
+    if not isinstance(body, dict):
+        raise ConfigError(f"Message {message_id} body must be a JSON object")
+    config = Config.from_dict(body.get("config") or {}, source)
+    return ReminderJob(
+        message_id=message_id, name=str(body.get("name") or message_id), config=config
+    )
+
+
+class BatchProcessor:
+    """SQS のメッセージをまとめて並行処理し、失敗したメッセージのIDを返す
+
+    同じメッセージの再配信（可視性タイムアウト切れなど）では、成功済みのリストに
+    再び通知しないよう、メッセージIDと通知先で処理済みかを記録する。
+    同時に処理する数は max_workers を上限に、APIキーごとに Notion の応答（429・5xx・
+    応答時間）に応じて調整する。
+
+    ワーカーの空きを減らして全体の処理時間を短くするよう、過去の所要時間の長いリストから
+    処理する。Lambda の残り時間内に終わる見込みの無いリストは始めずに再配信させる。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_CONCURRENCY,
+        processor_factory: Callable[[Config], ShoppingReminderProcessor] = (
+            ShoppingReminderProcessor
+        ),
+        source: Optional[ConfigSource] = None,
+        cost_history: Optional[TargetCostHistory] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.processor_factory = processor_factory
+        self.source = source
+        self.cost_history = cost_history or get_target_cost_history()
+        self._gates_lock = threading.Lock()
+        self._gates: Dict[str, AdaptiveLimiter] = {}
+
+    def process(self, records: List[Dict[str, Any]], context: Any = None) -> List[str]:
+        """全レコードを処理し、失敗したメッセージのIDを返す"""
+        if not records:
+            return []
+        succeeded: Dict[int, bool] = {}
+        jobs: List[Tuple[int, ReminderJob]] = []
+        for index, record in enumerate(records):
+            try:
+                jobs.append((index, parse_job(record, self.source)))
+            except ConfigError as e:
+                logger.error(f"Invalid message {record.get('messageId', '')}: {e}")
+                succeeded[index] = False
+
+        ordered = order_longest_first(
+            jobs, lambda entry: target_key(entry[1].config), self.cost_history
+        )
+        if ordered:
+            workers = min(self.max_workers, len(ordered))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqs") as executor:
+                results = executor.map(lambda entry: self._process_job(entry[1], context), ordered)
+                for (index, _), ok in zip(ordered, results):
+                    succeeded[index] = ok
+        failures = [
+            str(record.get("messageId", ""))
+            for index, record in enumerate(records)
+            if not succeeded[index]
+        ]
+        logger.info(f"Processed {len(records)} messages ({len(failures)} failed)")
+        return failures
+
+    def _process_job(self, job: ReminderJob, context: Any) -> bool:
+        if not fits_in_remaining_time(self.cost_history, job.config, _remaining_seconds(context)):
+            # 途中で打ち切られるより、処理せずに次の呼び出しへ再配信させる
+            logger.warning(
+                f"Message {job.message_id} ({job.name}) deferred: not enough time remaining"
+            )
+            return False
+
+        key = idempotency_key({"id": job.message_id}, job.config)
+        store = get_idempotency_store(job.config.idempotency_db_path)
+        try:
+            existing = store.begin(key, lease_seconds(context)) if key else None
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to check idempotency record, processing anyway: {e}")
+            key = None
+            existing = None
+        if existing is not None:
+            if existing.status == COMPLETED:
+                logger.info(f"Message {job.message_id} ({job.name}) already processed")
+                return True
+            logger.warning(f"Message {job.message_id} ({job.name}) is already being processed")
+            return False
+
+        with self._gate(job.config.notion_api_key).slot():
+            result = record_run(self.cost_history, job.config, lambda: self._run(job))
+        if key:
+            try:
+                if result.success:
+                    store.complete(key, {"success": True, "message": result.message})
+                else:
+                    store.release(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to update idempotency record: {e}")
+        return result.success
+
+    def _gate(self, api_key: str) -> AdaptiveLimiter:
+        """APIキーごとの同時に処理する数の制御（上限は同じAPIキーのクライアントと共有する）"""
+        with self._gates_lock:
+            gate = self._gates.get(api_key)
+            if gate is None:
+                gate = AdaptiveLimiter(get_concurrency_limit(api_key), self.max_workers)
+                self._gates[api_key] = gate
+            return gate
+
+    def _run(self, job: ReminderJob) -> NotificationResult:
+        logger.info(f"Processing message {job.message_id} for {job.name}")
+        try:
+            result = self.processor_factory(job.config).process()
+        except Exception as e:
+            logger.exception(f"Message {job.message_id} ({job.name}) failed: {e}")
+            return NotificationResult(
+                success=False, message="処理中にエラーが発生しました。", error=str(e)
+            )
+        if not result.success:
+            logger.error(f"Message {job.message_id} ({job.name}) failed: {result.error}")
+        return result
+
+
+def _remaining_seconds(context: Any) -> Optional[float]:
+    """Lambda の残りの実行時間（秒、Lambda 外では None）"""
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if not callable(get_remaining):
+        return None
+    try:
+        return float(get_remaining()) / 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def _max_concurrency() -> int:
+    """同時に処理するメッセージ数（環境変数 SQS_MAX_CONCURRENCY、省略時は既定値）"""
+    value = os.environ.get("SQS_MAX_CONCURRENCY", "").strip()
+    if not value:
+        return DEFAULT_MAX_CONCURRENCY
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise ConfigError(f"SQS_MAX_CONCURRENCY must be an integer: {value!r}") from e
+    if number < 1:
+        raise ConfigError(f"SQS_MAX_CONCURRENCY must be positive: {number}")
+    return number
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """SQS イベントソースのエントリーポイント
+
+    イベントソースマッピングで ReportBatchItemFailures を有効にすると、
+    batchItemFailures に含めたメッセージのみが再配信される。
+    """
+    records = event.get("Records") or []
+    logger.info(f"SQS handler started with {len(records)} messages")
+    try:
+        source = get_default_source()
+        max_workers = _max_concurrency()
+    except (ConfigSourceError, ConfigError) as e:
+        # 設定の取得元が使えない場合は全件を再配信させる
+        logger.exception(f"Configuration error: {e}")
+        failures = [str(record.get("messageId", "")) for record in records]
+    else:
+        batch = BatchProcessor(
+            max_workers=max_workers,
+            processor_factory=ShoppingReminderProcessor,
+            source=source,
+            cost_history=get_target_cost_history(os.environ.get(TARGET_COST_DB_PATH_ENV)),
+        )
+        failures = batch.process(records, context)
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+# Lambda環境での絶対インポート
+from config import Config
+from logger import get_logger
+from models import NotificationResult
+from usage import get_usage_tracker
+
+logger = get_logger(__name__)
+
+# 実行コストの履歴を SQLite に保存する場合のパスを指定する環境変数（省略時はプロセス内のみ）
+TARGET_COST_DB_PATH_ENV = "TARGET_COST_DB_PATH"
+
+# 所要秒数の指数移動平均で、最新の実行に与える重み
+DEFAULT_SMOOTHING = 0.5
+
+# 残り時間で実行を始めるかを判定する際に、見込みの所要秒数に加える余裕
+DEFAULT_DEADLINE_MARGIN_SECONDS = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS costs (
+    target TEXT PRIMARY KEY,
+    seconds REAL NOT NULL,
+    requests INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class TargetCost:
+    """対象（買い物リスト）の実行コストの履歴
+
+    seconds は所要秒数の見込み（指数移動平均）、requests は直近の実行での Notion API への
+    リクエスト数（クエリのページ数とコメント数）。failed は直近の実行が失敗したか。
+    """
+
+    seconds: float
+    requests: int
+    runs: int
+    failed: bool
+    updated_at: float
+
+
+def target_key(config: Config) -> str:
+    """実行コストを記録する単位（データベースと通知先ページの組）"""
+    return f"{config.notion_database_id}:{','.join(config.notion_page_ids)}"
+
+
+class TargetCostHistory:
+    """対象ごとの実行コストを SQLite に保存する
+
+    複数の対象を並行して処理する際に、所要時間の長い対象から始められるよう、
+    実行ごとの所要秒数とリクエスト数を記録する。
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        smoothing: float = DEFAULT_SMOOTHING,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.smoothing = smoothing
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        logger.info(f"TargetCostHistory opened: {path}")
+
+    def get(self, target: str) -> Optional[TargetCost]:
+        """記録済みのコスト（未実行の対象は None）"""
+        with self._lock:
+            return self._get(target)
+
+    def record(self, target: str, seconds: float, requests: int, success: bool) -> TargetCost:
+        """実行1回の結果を反映
+
+        失敗した実行は途中で打ち切られている可能性があるため、見込みを短くはしない。
+        """
+        with self._lock, self._conn:
+            previous = self._get(target)
+            if previous is None:
+                estimate = seconds
+            elif success:
+                estimate = previous.seconds + self.smoothing * (seconds - previous.seconds)
+            else:
+                estimate = max(previous.seconds, seconds)
+            cost = TargetCost(
+                seconds=estimate,
+                requests=requests,
+                runs=(previous.runs if previous else 0) + 1,
+                failed=not success,
+                updated_at=self.clock(),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO costs "
+                "(target, seconds, requests, runs, failed, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    target,
+                    cost.seconds,
+                    cost.requests,
+                    cost.runs,
+                    int(cost.failed),
+                    cost.updated_at,
+                ),
+            )
+        return cost
+
+    def reset(self) -> None:
+        """記録を破棄（主にテスト用）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM costs")
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, target: str) -> Optional[TargetCost]:
+        row = self._conn.execute(
+            "SELECT seconds, requests, runs, failed, updated_at FROM costs WHERE target = ?",
+            (target,),
+        ).fetchone()
+        if row is None:
+            return None
+        seconds, requests, runs, failed, updated_at = row
+        return TargetCost(seconds, requests, runs, bool(failed), updated_at)
+
+
+def order_longest_first(
+    items: Sequence[T], key: Callable[[T], str], history: TargetCostHistory
+) -> List[T]:
+    """ワーカーに先に渡す順（所要時間の見込みの長い順）に並べる
+
+    短い対象を先に済ませると、最後に長い対象だけが残って他のワーカーが空いたまま
+    全体の終了が遅れるため、長い順に割り当てる（LPT）。前回失敗した対象は再試行の
+    時間を確保するため最初に、未実行の対象は見込みが分からないため記録済みの最長と
+    同じ長さとして扱う。見込みが同じ対象は元の順序を保つ。
+    """
+    costs = {key(item): history.get(key(item)) for item in items}
+    unknown = max((cost.seconds for cost in costs.values() if cost is not None), default=0.0)
+
+    def rank(entry: Tuple[int, T]) -> Tuple[bool, float, int]:
+        index, item = entry
+        cost = costs[key(item)]
+        if cost is None:
+            return (True, -unknown, index)
+        return (not cost.failed, -cost.seconds, index)
+
+    ordered = [item for _, item in sorted(enumerate(items), key=rank)]
+    if len(ordered) > 1:
+        logger.info(f"Scheduling order: {[key(item) for item in ordered]}")
+    return ordered
+
+
+def record_run(
+    history: TargetCostHistory,
+    config: Config,
+    run: Callable[[], NotificationResult],
+) -> NotificationResult:
+    """run を実行し、所要秒数とリクエスト数を記録する
+
+    リクエスト数はデータベースごとの利用量の差分のため、同じデータベースの対象を
+    並行して処理した場合は合算された近似値になる。
+    """
+    usage = get_usage_tracker()
+    database_id = config.notion_database_id
+    before = usage.requests(database_id)
+    started = time.perf_counter()
+    success = False
+    try:
+        result = run()
+        success = result.success
+        return result
+    finally:
+        requests = max(0, usage.requests(database_id) - before)
+        history.record(target_key(config), time.perf_counter() - started, requests, success)
+
+
+def fits_in_remaining_time(
+    history: TargetCostHistory,
+    config: Config,
+    remaining_seconds: Optional[float],
+    margin: float = DEFAULT_DEADLINE_MARGIN_SECONDS,
+) -> bool:
+    """残り時間内に終わる見込みか（残り時間が分からない場合や未実行の対象は True）"""
+    if remaining_seconds is None:
+        return True
+    cost = history.get(target_key(config))
+    return cost is None or cost.seconds + margin <= remaining_seconds
+
+
+_histories_lock = threading.Lock()
+_histories: Dict[str, TargetCostHistory] = {}
+
+
+def get_target_cost_history(path: Optional[str] = None) -> TargetCostHistory:
+    """パスごとの TargetCostHistory を返す（省略時はプロセス内で共有するメモリ上の記録）"""
+    path = path or ":memory:"
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            history = _histories[path] = TargetCostHistory(path)
+        return history
@@ -0,0 +1,283 @@
+import base64
+import email.message
+import io
+import json
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_VERSION = 1
+
+# カセットに保存しないヘッダー（値は伏せ字に置き換える）
+REDACTED_HEADERS = ("authorization",)
+REDACTED_VALUE = "***REDACTED***"
+
+# 応答の無い接続を失敗として扱うまでの秒数（接続と各読み取りに適用される）
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+
+@dataclass
+class TransportRequest:
+    method: str
+    url: str
+    headers: Dict[str, str]
+    body: bytes = b""
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class CassetteError(Exception):
+    """カセットの読み込みや再生に関するエラー"""
+
+    pass
+
+
+class Transport:
+    """NotionClient が HTTP リクエストを送信する経路
+
+    HTTP のエラー応答は urllib と同じく urllib.error.HTTPError、接続エラーは
+    urllib.error.URLError として送出する。
+    """
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        raise NotImplementedError
+
+
+_ssl_context_lock = threading.Lock()
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def get_ssl_context() -> ssl.SSLContext:
+    """HTTPS の接続で共有する SSLContext
+
+    urlopen は既定では接続ごとに SSLContext を作成し、CA 証明書を読み込み直すため、
+    プロセス内で1つを共有する（初期化フェーズで作成しておけば最初の呼び出しも速くなる）。
+    """
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            _ssl_context = ssl.create_default_context()
+        return _ssl_context
+
+
+class UrllibTransport(Transport):
+    """urllib.request.urlopen で実際に送信する
+
+    timeout を過ぎても応答が無い場合は TimeoutError（接続時は URLError）を送出する。
+    None を指定するとタイムアウトしない。
+    """
+
+    def __init__(self, timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> None:
+        self.timeout = timeout
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        # 本文の無い GET リクエストでは data を渡さない
+        urllib_request = urllib.request.Request(
+            request.url, data=request.body or None, headers=request.headers, method=request.method
+        )
+        # テストなどで差し替えられるよう、urlopen は呼び出し時に参照する
+        kwargs: Dict[str, Any] = {} if self.timeout is None else {"timeout": self.timeout}
+        if request.url.startswith("https:"):
+            kwargs["context"] = get_ssl_context()
+        with urllib.request.urlopen(urllib_request, **kwargs) as response:
+            body = response.read()
+            status = response.getcode()
+            headers = _string_headers(getattr(response, "headers", None))
+        return TransportResponse(status=status, body=body, headers=headers)
+
+
+def _string_headers(headers: Any) -> Dict[str, str]:
+    """ヘッダーを文字列の辞書に変換（変換できないものは空とみなす）"""
+    try:
+        return {str(key): str(value) for key, value in headers.items()}
+    except (AttributeError, TypeError, ValueError):
+        return {}
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(data: Dict[str, Any]) -> bytes:
+    if "body_base64" in data:
+        return base64.b64decode(data["body_base64"])
+    return str(data.get("body", "")).encode("utf-8")
+
+
+def _bodies_match(recorded: bytes, actual: bytes) -> bool:
+    """本文が一致するか（JSON の場合は区切り文字などの表記の違いを無視する）"""
+    if recorded == actual:
+        return True
+    try:
+        return bool(json.loads(recorded) == json.loads(actual))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False
+
+
+def _redact(headers: Dict[str, str]) -> Dict[str, str]:
+    return {
+        key: REDACTED_VALUE if key.lower() in REDACTED_HEADERS else value
+        for key, value in headers.items()
+    }
+
+
+class RecordingTransport(Transport):
+    """別のトランスポートで送信しつつ、リクエストと応答の組をカセットに記録する
+
+    APIキーを含む Authorization ヘッダーは伏せ字にして保存する。
+    """
+
+    def __init__(
+        self, inner: Transport, path: str, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.inner = inner
+        self.path = path
+        self.clock = clock
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        started = self.clock()
+        try:
+            response = self.inner.send(request)
+        except urllib.error.HTTPError as e:
+            body = e.read() if e.fp else b""
+            self._record(
+                request,
+                TransportResponse(status=e.code, body=body, headers=_string_headers(e.headers)),
+                self.clock() - started,
+            )
+            # 読み込んだ本文を呼び出し元でも読めるように作り直して送出する
+            raise urllib.error.HTTPError(e.url, e.code, e.msg, e.headers, io.BytesIO(body)) from e
+        self._record(request, response, self.clock() - started)
+        return response
+
+    def save(self) -> None:
+        """記録したやり取りをカセットファイルに書き出す"""
+        with self._lock:
+            interactions = list(self.interactions)
+        cassette: Dict[str, Any] = {"version": CASSETTE_VERSION, "interactions": interactions}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, ensure_ascii=False, indent=2)
+        logger.info(f"Saved {len(interactions)} interactions to {self.path}")
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.save()
+
+    def _record(
+        self, request: TransportRequest, response: TransportResponse, elapsed: float
+    ) -> None:
+        interaction = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "headers": _redact(request.headers),
+                **_encode_body(request.body),
+            },
+            "response": {
+                "status": response.status,
+                "headers": _redact(response.headers),
+                **_encode_body(response.body),
+            },
+            "latency_ms": round(elapsed * 1000, 3),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+
+class ReplayTransport(Transport):
+    """カセットに記録された応答を返す（ネットワークには接続しない）
+
+    リクエストはメソッド・URL・本文（JSON は内容で比較）が一致する未使用のやり取りに
+    記録順に対応付ける。
+    replay_latency を指定すると記録時の所要時間に latency_scale を掛けた時間だけ待機する。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        replay_latency: bool = False,
+        latency_scale: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.path = path
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._interactions = self._load(path)
+        self._used = [False] * len(self._interactions)
+
+    @property
+    def remaining(self) -> int:
+        """まだ再生されていないやり取りの数"""
+        with self._lock:
+            return self._used.count(False)
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        interaction = self._claim(request)
+        if self.replay_latency:
+            self.sleep(interaction.get("latency_ms", 0) / 1000 * self.latency_scale)
+
+        recorded = interaction["response"]
+        response = TransportResponse(
+            status=int(recorded["status"]),
+            body=_decode_body(recorded),
+            headers=dict(recorded.get("headers", {})),
+        )
+        if response.status >= 400:
+            headers = email.message.Message()
+            for key, value in response.headers.items():
+                headers[key] = value
+            raise urllib.error.HTTPError(
+                request.url, response.status, "Replayed error", headers, io.BytesIO(response.body)
+            )
+        return response
+
+    def _claim(self, request: TransportRequest) -> Dict[str, Any]:
+        with self._lock:
+            for index, interaction in enumerate(self._interactions):
+                if self._used[index]:
+                    continue
+                recorded = interaction["request"]
+                if (
+                    recorded["method"] == request.method
+                    and recorded["url"] == request.url
+                    and _bodies_match(_decode_body(recorded), request.body)
+                ):
+                    self._used[index] = True
+                    return interaction
+        raise CassetteError(
+            f"No recorded interaction for {request.method} {request.url} in {self.path}"
+        )
+
+    @staticmethod
+    def _load(path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                cassette = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CassetteError(f"Failed to load cassette {path}: {e}") from e
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise CassetteError(f"Unsupported cassette version: {cassette.get('version')}")
+        return list(cassette.get("interactions", []))
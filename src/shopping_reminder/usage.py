@@ -0,0 +1,117 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Tuple
+
+# Lambda環境での絶対インポート
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# リクエスト数の上限を超えた対象で、コメントに載せる項目数（MAX_COMMENT_ITEMS 未指定の場合）
+DEGRADED_MAX_COMMENT_ITEMS = 20
+
+
+@dataclass
+class EndpointUsage:
+    """1つの対象・エンドポイントへのリクエストの集計"""
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    seconds: float = 0.0
+
+
+class UsageTracker:
+    """Notion API の利用量を対象（データベース）とエンドポイントごとに集計する
+
+    集計は UTC の1日ごとに区切り、日付が変わると初期化する。ウォームスタート間で
+    共有し、対象ごとのリクエスト数の上限（DAILY_REQUEST_QUOTA）の判定に使う。
+
+    集計はプロセス内の辞書に保持するため実行環境ごとで、コールドスタートで失われる。
+    そのため上限は、並行する実行環境をまたいだ厳密な上限ではなく目安として働く。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._day = self._today()
+        self._usage: Dict[Tuple[str, str], EndpointUsage] = {}
+
+    def record(
+        self,
+        target: str,
+        endpoint: str,
+        bytes_sent: int,
+        bytes_received: int,
+        seconds: float,
+        error: bool = False,
+    ) -> None:
+        """リクエスト1件を記録"""
+        with self._lock:
+            usage = self._entry(target, endpoint)
+            usage.requests += 1
+            usage.errors += int(error)
+            usage.bytes_sent += bytes_sent
+            usage.bytes_received += bytes_received
+            usage.seconds += seconds
+
+    def record_retry(self, target: str, endpoint: str) -> None:
+        """再試行を記録（再試行のリクエスト自体は record で別途数える）"""
+        with self._lock:
+            self._entry(target, endpoint).retries += 1
+
+    def requests(self, target: str) -> int:
+        """今日の対象へのリクエスト数"""
+        with self._lock:
+            self._roll_over()
+            return sum(usage.requests for (t, _), usage in self._usage.items() if t == target)
+
+    def report(self, target: str) -> Dict[str, Any]:
+        """対象の今日の利用量（合計とエンドポイントごとの内訳）"""
+        with self._lock:
+            self._roll_over()
+            endpoints = {
+                endpoint: asdict(usage)
+                for (t, endpoint), usage in sorted(self._usage.items())
+                if t == target
+            }
+            day = self._day
+        total = EndpointUsage()
+        for usage in endpoints.values():
+            for name, value in usage.items():
+                setattr(total, name, getattr(total, name) + value)
+        return {"day": day, **asdict(total), "endpoints": endpoints}
+
+    def reset(self) -> None:
+        """集計を初期化（主にテスト用）"""
+        with self._lock:
+            self._day = self._today()
+            self._usage.clear()
+
+    def _entry(self, target: str, endpoint: str) -> EndpointUsage:
+        self._roll_over()
+        usage = self._usage.get((target, endpoint))
+        if usage is None:
+            usage = self._usage[(target, endpoint)] = EndpointUsage()
+        return usage
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._usage.clear()
+
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self.clock(), timezone.utc).date().isoformat()
+
+
+_default_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """プロセス全体で共有する UsageTracker"""
+    return _default_tracker
@@ -0,0 +1,172 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import urllib.error
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Lambda環境での絶対インポート
+from config import Config, ConfigError
+from item_state import ItemState, get_item_state
+import json_codec
+from logger import get_logger
+from models import NotionDatabaseItem
+from notion_client import NotionAPIError, NotionClient
+
+logger = get_logger(__name__)
+
+SIGNATURE_HEADER = "x-notion-signature"
+
+# ページの最新の内容を取得して状態に反映するイベント
+PAGE_UPSERT_EVENTS = (
+    "page.created",
+    "page.properties_updated",
+    "page.content_updated",
+    "page.undeleted",
+    "page.moved",
+)
+PAGE_DELETE_EVENTS = ("page.deleted",)
+
+
+@dataclass
+class WebhookResponse:
+    status: int
+    body: Dict[str, Any]
+
+
+def is_webhook_event(event: Any) -> bool:
+    """Lambda 関数 URL（または API Gateway）経由の HTTP リクエストのイベントか"""
+    return isinstance(event, dict) and "body" in event and isinstance(event.get("headers"), dict)
+
+
+def _raw_body(event: Dict[str, Any]) -> bytes:
+    """署名の検証に使う、受信したままのリクエストボディ"""
+    body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body)
+    return body.encode("utf-8") if isinstance(body, str) else bytes(body)
+
+
+def _header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """ヘッダーの値を取得（関数 URL は小文字に揃えるが、大文字小文字を区別しない）"""
+    for key, value in event["headers"].items():
+        if key.lower() == name:
+            return str(value)
+    return None
+
+
+def compute_signature(body: bytes, verification_token: str) -> str:
+    """X-Notion-Signature ヘッダーの値（検証トークンをキーとした HMAC-SHA256）"""
+    digest = hmac.new(verification_token.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(body: bytes, signature: Optional[str], verification_token: str) -> bool:
+    if not signature:
+        return False
+    return hmac.compare_digest(compute_signature(body, verification_token), signature)
+
+
+def _normalize_id(notion_id: str) -> str:
+    """ハイフンの有無に関わらず比較できるようにする"""
+    return notion_id.replace("-", "").lower()
+
+
+class WebhookProcessor:
+    """Notion の Webhook イベントを項目の状態に反映する
+
+    Notion の Webhook は変更の通知のみで変更後の内容を含まないため、
+    対象ページを1件取得して最新の内容を反映する。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        item_state: Optional[ItemState] = None,
+        notion_client: Optional[NotionClient] = None,
+    ) -> None:
+        if item_state is None:
+            if not config.item_state_db_path:
+                raise ConfigError("ITEM_STATE_DB_PATH is required to handle webhook events")
+            item_state = get_item_state(config.item_state_db_path)
+        self.config = config
+        self.item_state = item_state
+        self.notion_client = notion_client or NotionClient(config)
+
+    def handle(self, event: Dict[str, Any]) -> WebhookResponse:
+        """HTTP リクエストのイベントを処理して応答を返す"""
+        try:
+            body = _raw_body(event)
+            payload = json_codec.loads(body)
+        except (binascii.Error, ValueError) as e:
+            logger.warning(f"Invalid webhook body: {e}")
+            return WebhookResponse(400, {"success": False, "message": "Invalid request body"})
+        if not isinstance(payload, dict):
+            return WebhookResponse(400, {"success": False, "message": "Invalid request body"})
+
+        # サブスクリプション作成時の検証リクエスト（トークンを設定に登録してもらう）
+        if "verification_token" in payload:
+            logger.warning(
+                "Received webhook verification token; set NOTION_WEBHOOK_VERIFICATION_TOKEN "
+                f"to: {payload['verification_token']}"
+            )
+            return WebhookResponse(200, {"success": True, "message": "Verification received"})
+
+        token = self.config.webhook_verification_token
+        if not token:
+            logger.error("NOTION_WEBHOOK_VERIFICATION_TOKEN is not configured")
+            return WebhookResponse(
+                403, {"success": False, "message": "Webhook verification token is not configured"}
+            )
+        if not verify_signature(body, _header(event, SIGNATURE_HEADER), token):
+            logger.warning("Rejected webhook event with invalid signature")
+            return WebhookResponse(401, {"success": False, "message": "Invalid signature"})
+
+        return self._apply_event(payload)
+
+    def _apply_event(self, payload: Dict[str, Any]) -> WebhookResponse:
+        event_type = payload.get("type", "")
+        entity = payload.get("entity") or {}
+        page_id = entity.get("id")
+        logger.info(f"Webhook event: {event_type} (entity: {page_id})")
+
+        if entity.get("type") != "page" or not page_id:
+            return WebhookResponse(200, {"success": True, "message": f"Ignored {event_type}"})
+        if event_type in PAGE_DELETE_EVENTS:
+            self.item_state.remove_page(page_id, self.config.notion_database_id)
+            return WebhookResponse(200, {"success": True, "message": f"Removed {page_id}"})
+        if event_type not in PAGE_UPSERT_EVENTS:
+            return WebhookResponse(200, {"success": True, "message": f"Ignored {event_type}"})
+
+        try:
+            page = self.notion_client.retrieve_page(page_id)
+        except NotionAPIError as e:
+            cause = e.__cause__
+            if isinstance(cause, urllib.error.HTTPError) and cause.code == 404:
+                # 削除済み、または連携の共有が外れたページ
+                self.item_state.remove_page(page_id, self.config.notion_database_id)
+                return WebhookResponse(200, {"success": True, "message": f"Removed {page_id}"})
+            # 5xx を返すと Notion が後で再送する
+            logger.exception(f"Failed to retrieve page {page_id}: {e}")
+            return WebhookResponse(
+                500, {"success": False, "message": "ページの取得に失敗しました。", "error": str(e)}
+            )
+
+        if not self._belongs_to_database(page) or page.get("archived") or page.get("in_trash"):
+            self.item_state.remove_page(page_id, self.config.notion_database_id)
+            return WebhookResponse(200, {"success": True, "message": f"Removed {page_id}"})
+
+        item = NotionDatabaseItem(id=page["id"], properties=page["properties"]).to_shopping_item()
+        applied = self.item_state.apply_page(
+            item, page.get("last_edited_time", ""), self.config.notion_database_id
+        )
+        message = f"Updated {page_id}" if applied else f"Ignored outdated {page_id}"
+        return WebhookResponse(200, {"success": True, "message": message})
+
+    def _belongs_to_database(self, page: Dict[str, Any]) -> bool:
+        parent = page.get("parent") or {}
+        database_id = parent.get("database_id")
+        if not database_id:
+            return False
+        return _normalize_id(database_id) == _normalize_id(self.config.notion_database_id)
@@ -10,9 +10,10 @@ module "shopping_reminder" {
   source = "../../modules/shopping-reminder"
 
   # Notion configuration
-  notion_api_key     = var.notion_api_key
-  notion_database_id = var.notion_database_id
-  notion_page_id     = var.notion_page_id
+  notion_api_key           = var.notion_api_key
+  notion_api_key_secret_id = var.notion_api_key_secret_id
+  notion_database_id       = var.notion_database_id
+  notion_page_id           = var.notion_page_id
 
   # Lambda configuration
   lambda_function_name    = var.lambda_function_name
@@ -20,6 +21,7 @@ module "shopping_reminder" {
   lambda_source_code_hash = data.archive_file.lambda_zip.output_base64sha256
   lambda_timeout          = var.lambda_timeout
   lambda_memory_size      = var.lambda_memory_size
+  lambda_layers           = var.lambda_layers
 
   # EventBridge configuration
   schedule_expression = var.schedule_expression
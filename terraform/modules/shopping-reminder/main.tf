@@ -30,15 +30,23 @@ resource "aws_lambda_function" "shopping_reminder" {
   runtime       = "python3.13"
   timeout       = var.lambda_timeout
   memory_size   = var.lambda_memory_size
+  layers        = var.lambda_layers
 
   source_code_hash = var.lambda_source_code_hash
 
   environment {
-    variables = {
-      NOTION_API_KEY     = var.notion_api_key
-      NOTION_DATABASE_ID = var.notion_database_id
-      NOTION_PAGE_ID     = var.notion_page_id
-    }
+    # シークレットIDが指定されている場合はAPIキーを環境変数に書き込まない
+    variables = merge(
+      {
+        NOTION_DATABASE_ID = var.notion_database_id
+        NOTION_PAGE_ID     = var.notion_page_id
+      },
+      var.notion_api_key_secret_id == "" ? {
+        NOTION_API_KEY = var.notion_api_key
+        } : {
+        NOTION_API_KEY_SECRET_ID = var.notion_api_key_secret_id
+      }
+    )
   }
 
   depends_on = [
@@ -107,17 +115,26 @@ resource "aws_iam_role_policy" "lambda_policy" {
 
   policy = jsonencode({
     Version = "2012-10-17"
-    Statement = [
-      {
-        Effect = "Allow"
-        Action = [
-          "logs:CreateLogGroup",
-          "logs:CreateLogStream",
-          "logs:PutLogEvents"
-        ]
-        Resource = "arn:aws:logs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:*"
-      }
-    ]
+    Statement = concat(
+      [
+        {
+          Effect = "Allow"
+          Action = [
+            "logs:CreateLogGroup",
+            "logs:CreateLogStream",
+            "logs:PutLogEvents"
+          ]
+          Resource = "arn:aws:logs:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:*"
+        }
+      ],
+      var.notion_api_key_secret_id == "" ? [] : [
+        {
+          Effect   = "Allow"
+          Action   = ["secretsmanager:GetSecretValue"]
+          Resource = "arn:aws:secretsmanager:${data.aws_region.current.name}:${data.aws_caller_identity.current.account_id}:secret:${var.notion_api_key_secret_id}-*"
+        }
+      ]
+    )
   })
 }
 
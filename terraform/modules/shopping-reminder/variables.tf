@@ -1,7 +1,25 @@
 variable "notion_api_key" {
-  description = "Notion API key for accessing the workspace"
+  description = "Notion API key for accessing the workspace (leave empty when notion_api_key_secret_id is set)"
   type        = string
   sensitive   = true
+  default     = ""
+}
+
+variable "notion_api_key_secret_id" {
+  description = "Name (not ARN) of the Secrets Manager secret holding the Notion API key (empty to use notion_api_key directly)"
+  type        = string
+  default     = ""
+
+  validation {
+    condition     = !can(regex("^arn:", var.notion_api_key_secret_id))
+    error_message = "notion_api_key_secret_id must be a secret name, not an ARN."
+  }
+}
+
+variable "lambda_layers" {
+  description = "Lambda layer ARNs to attach (e.g. AWS Parameters and Secrets Lambda Extension)"
+  type        = list(string)
+  default     = []
 }
 
 variable "notion_database_id" {
@@ -0,0 +1,40 @@
+from typing import Iterator
+
+import pytest
+
+import adaptive_concurrency
+import circuit_breaker
+import target_scheduler
+import usage
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers() -> Iterator[None]:
+    """サーキットブレーカーの状態はモジュール単位で共有されるため、テストごとに初期化する"""
+    circuit_breaker.get_default_registry().reset()
+    yield
+    circuit_breaker.get_default_registry().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_usage_tracker() -> Iterator[None]:
+    """API の利用量もモジュール単位で共有されるため、テストごとに初期化する"""
+    usage.get_usage_tracker().reset()
+    yield
+    usage.get_usage_tracker().reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_concurrency_limits() -> Iterator[None]:
+    """APIキーごとの同時実行数の上限もモジュール単位で共有されるため、テストごとに初期化する"""
+    adaptive_concurrency.reset_concurrency_limits()
+    yield
+    adaptive_concurrency.reset_concurrency_limits()
+
+
+@pytest.fixture(autouse=True)
+def reset_target_cost_history() -> Iterator[None]:
+    """対象ごとの実行コストもモジュール単位で共有されるため、テストごとに初期化する"""
+    target_scheduler.get_target_cost_history().reset()
+    yield
+    target_scheduler.get_target_cost_history().reset()
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+from src.shopping_reminder.adaptive_concurrency import (
+    AdaptiveConcurrencyLimit,
+    AdaptiveLimiter,
+    AsyncAdaptiveLimiter,
+)
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.maintenance import RateLimiter
+from src.shopping_reminder.notion_client import NotionAPIError, NotionClient
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+from tests.shopping_reminder.test_maintenance import FakeArchiveTransport, _http_error, _page
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAdaptiveConcurrencyLimit:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.limit = AdaptiveConcurrencyLimit(initial=4, max_limit=6, clock=self.clock)
+
+    def test_additive_increase_per_window(self) -> None:
+        # 成功ごとに 1/上限 ずつ増やすため、上限の数ほど成功すると1つ増える
+        for _ in range(5):
+            self.limit.record(200, 0.1)
+        assert self.limit.limit == 5
+
+        for _ in range(100):
+            self.limit.record(200, 0.1)
+        assert self.limit.limit == 6
+
+    def test_multiplicative_decrease_once_per_cooldown(self) -> None:
+        # 同時に送信していたリクエストがまとめて 429 を受けても1回だけ減らす
+        for _ in range(3):
+            self.limit.record(429, 0.1)
+        assert self.limit.limit == 2
+
+        self.clock.now += 1.0
+        self.limit.record(503, 0.1)
+        assert self.limit.limit == 1
+
+        self.clock.now += 1.0
+        self.limit.record(None, 0.1)
+        assert self.limit.limit == 1
+
+    def test_slow_responses_count_as_congestion(self) -> None:
+        self.limit.record(200, 10.0)
+        assert self.limit.limit == 2
+
+    def test_client_errors_do_not_change_limit(self) -> None:
+        self.limit.record(404, 0.1)
+        self.limit.record(400, 0.1)
+        assert self.limit.limit == 4
+
+
+class TestLimiters:
+    def test_sync_limiter_caps_in_flight(self) -> None:
+        limiter = AdaptiveLimiter(AdaptiveConcurrencyLimit(initial=2), max_concurrency=8)
+        lock = threading.Lock()
+        in_flight: List[int] = [0, 0]
+
+        def work() -> None:
+            with limiter.slot():
+                with lock:
+                    in_flight[0] += 1
+                    in_flight[1] = max(in_flight[1], in_flight[0])
+                time.sleep(0.02)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert in_flight[1] == 2
+
+    def test_async_limiter_follows_limit_changes(self) -> None:
+        limit = AdaptiveConcurrencyLimit(initial=4)
+        limiter = AsyncAdaptiveLimiter(limit, max_concurrency=8)
+        peaks: List[int] = []
+        in_flight = 0
+
+        async def work(index: int) -> None:
+            nonlocal in_flight
+            async with limiter.slot():
+                in_flight += 1
+                peaks.append(in_flight)
+                await asyncio.sleep(0.01)
+                if index == 0:
+                    # 429 を受けると以降の同時実行数は半分になる
+                    limit.record(429, 0.01)
+                in_flight -= 1
+
+        async def run() -> None:
+            await asyncio.gather(*(work(i) for i in range(12)))
+
+        asyncio.run(run())
+
+        assert max(peaks[:4]) == 4
+        assert max(peaks[6:]) <= 2
+
+
+class SequenceTransport(Transport):
+    def __init__(self, codes: List[int]) -> None:
+        self.codes = codes
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        code = self.codes.pop(0)
+        if code != 200:
+            raise _http_error(request.url, code, {})
+        return TransportResponse(status=200, body=b'{"id": "page"}')
+
+
+class TestClientSignals:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+
+    def test_client_records_status_into_shared_limit(self) -> None:
+        client = NotionClient(self.config, transport=SequenceTransport([200] * 4 + [429]))
+        other = NotionClient(self.config, transport=SequenceTransport([]))
+        assert client.concurrency is other.concurrency
+
+        for _ in range(4):
+            client.retrieve_page("page")
+        assert client.concurrency.limit == 4
+        try:
+            client.retrieve_page("page")
+        except NotionAPIError:
+            pass
+        assert client.concurrency.limit == 2
+
+    def test_archive_stays_within_adaptive_limit(self) -> None:
+        pages = [_page(i, checked=True, age_days=60) for i in range(30)]
+        transport = FakeArchiveTransport(pages, latency=0.005)
+        limit = AdaptiveConcurrencyLimit(initial=2, max_limit=2)
+        client = NotionClient(self.config, transport=transport, concurrency=limit)
+
+        result = client.archive_completed_items(
+            30, max_workers=8, rate_limiter=RateLimiter(rate_per_second=10_000, burst=10_000)
+        )
+
+        assert result.archived == 30
+        assert transport.max_in_flight == 2
@@ -0,0 +1,423 @@
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+import pytest
+
+from src.shopping_reminder.async_notion_client import (
+    AsyncHTTPClient,
+    AsyncNotionClient,
+    AsyncRateLimiter,
+    NotionAPIError,
+    get_shared_rate_limiter,
+    parse_retry_after,
+)
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor
+from src.shopping_reminder.models import ShoppingItem
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def _item(item_id: str, name: str) -> Dict[str, Any]:
+    return {
+        "id": item_id,
+        "properties": {
+            "名前": {"title": [{"text": {"content": name}}]},
+            "完了": {"checkbox": False},
+        },
+    }
+
+
+def _json_response(data: Dict[str, Any], status: int = 200) -> Response:
+    return status, {}, json.dumps(data).encode("utf-8")
+
+
+class FakeNotionServer:
+    """asyncio上で動作するNotion APIの簡易スタブ
+
+    handler が None を返した場合は応答せずに接続を切断する。終了時にクライアントが
+    接続を閉じていなければ、待ち続けずにテストを失敗させる。
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any]], Optional[Response]],
+        chunked: bool = False,
+        raw_response: Optional[bytes] = None,
+        close_timeout: float = 2.0,
+    ):
+        self.handler = handler
+        self.chunked = chunked
+        self.raw_response = raw_response
+        self.close_timeout = close_timeout
+        self.requests: List[Dict[str, Any]] = []
+        self.connections = 0
+        self.base_url = ""
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: List[asyncio.StreamWriter] = []
+
+    async def __aenter__(self) -> "FakeNotionServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        assert self._server is not None
+        self._server.close()
+        try:
+            await asyncio.wait_for(self._server.wait_closed(), self.close_timeout)
+        except asyncio.TimeoutError:
+            for writer in self._writers:
+                writer.close()
+            await self._server.wait_closed()
+            if args[0] is None:
+                raise AssertionError("client left connections open")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.append(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                request = {"method": method, "path": path, "headers": headers, "body": body}
+                self.requests.append(request)
+
+                if self.raw_response is not None:
+                    writer.write(self.raw_response)
+                    await writer.drain()
+                    break
+                response = self.handler(request)
+                if response is None:
+                    break
+                status, response_headers, response_body = response
+                writer.write(self._encode(status, response_headers, response_body))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _encode(self, status: int, headers: Dict[str, str], body: bytes) -> bytes:
+        head = f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+        for name, value in headers.items():
+            head += f"{name}: {value}\r\n"
+        if self.chunked:
+            middle = len(body) // 2
+            chunks = [body[:middle], body[middle:]]
+            encoded = b"".join(b"%x\r\n%s\r\n" % (len(c), c) for c in chunks if c)
+            return (head + "Transfer-Encoding: chunked\r\n\r\n").encode() + encoded + b"0\r\n\r\n"
+        return (head + f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+class TestAsyncNotionClient:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+
+    def _client(self, base_url: str, **kwargs: Any) -> AsyncNotionClient:
+        return AsyncNotionClient(
+            self.config,
+            base_url=base_url,
+            rate_limiter=AsyncRateLimiter(rate_per_second=1000, burst=1000),
+            **kwargs,
+        )
+
+    def test_query_unchecked_items_pagination_reuses_connection(self) -> None:
+        pages = iter(
+            [
+                {"results": [_item("item1", "牛乳")], "has_more": True, "next_cursor": "c1"},
+                {"results": [_item("item2", "パン")], "has_more": False},
+            ]
+        )
+
+        async def run() -> Tuple[List[ShoppingItem], FakeNotionServer]:
+            async with FakeNotionServer(lambda request: _json_response(next(pages))) as server:
+                client = self._client(server.base_url)
+                items = await client.query_unchecked_items()
+                await client.close()
+                return items, server
+
+        items, server = asyncio.run(run())
+
+        assert [item.name for item in items] == ["牛乳", "パン"]
+        assert server.connections == 1
+        assert server.requests[0]["path"] == "/v1/databases/test_database_id/query"
+        assert server.requests[0]["headers"]["authorization"] == "Bearer secret_test_key"
+        assert json.loads(server.requests[1]["body"])["start_cursor"] == "c1"
+
+    def test_query_top_unchecked_items_stops_early(self) -> None:
+        pages = iter(
+            [
+                {
+                    "results": [_item(f"item{i}", f"商品{i}") for i in range(3)],
+                    "has_more": True,
+                    "next_cursor": "c1",
+                },
+                {"results": [_item("item9", "卵")], "has_more": False},
+            ]
+        )
+
+        async def run() -> Tuple[Any, FakeNotionServer]:
+            async with FakeNotionServer(lambda request: _json_response(next(pages))) as server:
+                async with self._client(server.base_url) as client:
+                    return await client.query_top_unchecked_items(2), server
+
+        (items, omitted), server = asyncio.run(run())
+
+        assert [item.id for item in items] == ["item0", "item1"]
+        assert (omitted.count, omitted.lower_bound) == (1, True)
+        assert len(server.requests) == 1
+        assert json.loads(server.requests[0]["body"])["sorts"][0]["direction"] == "ascending"
+
+    def test_chunked_response(self) -> None:
+        async def run() -> List[ShoppingItem]:
+            response = _json_response({"results": [_item("item1", "卵")], "has_more": False})
+            async with FakeNotionServer(lambda request: response, chunked=True) as server:
+                async with self._client(server.base_url) as client:
+                    return await client.query_unchecked_items()
+
+        items = asyncio.run(run())
+
+        assert [item.name for item in items] == ["卵"]
+
+    def test_create_comment_success(self) -> None:
+        async def run() -> Tuple[Any, FakeNotionServer]:
+            async with FakeNotionServer(lambda request: _json_response({"id": "c"})) as server:
+                async with self._client(server.base_url) as client:
+                    result = await client.create_comment([ShoppingItem("1", "牛乳", False)])
+                return result, server
+
+        result, server = asyncio.run(run())
+
+        assert result.success is True
+        assert "1件の未チェック項目" in result.message
+        body = json.loads(server.requests[0]["body"])
+        assert body["parent"]["page_id"] == "test_page_id"
+        assert "• 牛乳" in body["rich_text"][0]["text"]["content"]
+
+    def test_create_comment_empty_items(self) -> None:
+        client = self._client("http://127.0.0.1:9/v1")
+        result = asyncio.run(client.create_comment([]))
+
+        assert result.success is True
+        assert "未チェック項目はありません" in result.message
+
+    def test_create_comment_api_error(self) -> None:
+        async def run() -> Any:
+            response = _json_response({"message": "Bad request"}, status=400)
+            async with FakeNotionServer(lambda request: response) as server:
+                async with self._client(server.base_url) as client:
+                    return await client.create_comment([ShoppingItem("1", "牛乳", False)])
+
+        result = asyncio.run(run())
+
+        assert result.success is False
+        assert "HTTP error 400" in result.error
+
+    def test_rate_limited_request_is_retried(self) -> None:
+        responses = iter(
+            [
+                (429, {"Retry-After": "0"}, b'{"message": "rate limited"}'),
+                _json_response({"results": [], "has_more": False}),
+            ]
+        )
+
+        async def run() -> Tuple[List[ShoppingItem], FakeNotionServer]:
+            async with FakeNotionServer(lambda request: next(responses)) as server:
+                async with self._client(server.base_url) as client:
+                    items = await client.query_unchecked_items()
+                return items, server
+
+        items, server = asyncio.run(run())
+
+        assert items == []
+        assert len(server.requests) == 2
+
+    def test_malformed_status_line_is_reported_as_api_error(self) -> None:
+        async def run() -> Any:
+            raw = b"HTTP/1.1 abc Broken\r\nContent-Length: 0\r\n\r\n"
+            async with FakeNotionServer(lambda request: None, raw_response=raw) as server:
+                async with self._client(server.base_url) as client:
+                    return await client.create_comment([ShoppingItem("1", "牛乳", False)])
+
+        result = asyncio.run(run())
+
+        assert result.success is False
+        assert "Malformed response" in result.error
+
+    def test_dropped_reused_connection_is_resent_for_query(self) -> None:
+        def handler(request: Dict[str, Any]) -> Optional[Response]:
+            if len(handler_calls) == 1:
+                handler_calls.append(request)
+                return None
+            handler_calls.append(request)
+            return _json_response({"results": [], "has_more": False})
+
+        handler_calls: List[Dict[str, Any]] = []
+
+        async def run() -> FakeNotionServer:
+            async with FakeNotionServer(handler) as server:
+                async with self._client(server.base_url) as client:
+                    await client.query_unchecked_items()
+                    await client.query_unchecked_items()
+                return server
+
+        server = asyncio.run(run())
+
+        assert len(server.requests) == 3
+        assert server.connections == 2
+
+    def test_dropped_reused_connection_is_not_resent_for_comment(self) -> None:
+        def handler(request: Dict[str, Any]) -> Optional[Response]:
+            if request["path"] == "/v1/comments":
+                return None
+            return _json_response({"results": [], "has_more": False})
+
+        async def run() -> Tuple[Any, FakeNotionServer]:
+            async with FakeNotionServer(handler) as server:
+                async with self._client(server.base_url) as client:
+                    await client.query_unchecked_items()
+                    result = await client.create_comment([ShoppingItem("1", "牛乳", False)])
+                return result, server
+
+        result, server = asyncio.run(run())
+
+        assert result.success is False
+        assert "Connection error" in result.error
+        assert [r["path"] for r in server.requests].count("/v1/comments") == 1
+
+    def test_connection_error(self) -> None:
+        client = self._client("http://127.0.0.1:9/v1", timeout=2.0)
+        with pytest.raises(NotionAPIError) as exc_info:
+            asyncio.run(client.query_unchecked_items())
+
+        assert "Connection error" in str(exc_info.value)
+
+    def test_concurrent_requests_share_one_event_loop(self) -> None:
+        async def run() -> Tuple[List[List[ShoppingItem]], FakeNotionServer]:
+            response = _json_response({"results": [_item("item1", "牛乳")], "has_more": False})
+            async with FakeNotionServer(lambda request: response) as server:
+                client = self._client(server.base_url, max_connections=4)
+                results = await asyncio.gather(*(client.query_unchecked_items() for _ in range(20)))
+                await client.close()
+                return list(results), server
+
+        results, server = asyncio.run(run())
+
+        assert len(results) == 20
+        assert all(items[0].name == "牛乳" for items in results)
+        assert server.connections <= 4
+
+
+class TestParseRetryAfter:
+    def test_seconds(self) -> None:
+        assert parse_retry_after("2.5") == 2.5
+
+    def test_http_date(self) -> None:
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_missing_or_invalid(self) -> None:
+        assert parse_retry_after(None) == 1.0
+        assert parse_retry_after("soon") == 1.0
+
+
+class TestAsyncRateLimiter:
+    def test_acquire_waits_when_bucket_is_empty(self) -> None:
+        limiter = AsyncRateLimiter(rate_per_second=20, burst=1)
+
+        async def run() -> float:
+            started = time.monotonic()
+            for _ in range(3):
+                await limiter.acquire()
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(run())
+
+        assert elapsed >= 0.09
+
+    def test_clients_with_same_api_key_share_default_limiter(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "shared_key",
+                "NOTION_DATABASE_ID": "db",
+                "NOTION_PAGE_ID": "page",
+            }
+        )
+
+        first = AsyncNotionClient(config)
+        second = AsyncNotionClient(config)
+
+        assert first.rate_limiter is second.rate_limiter
+        assert first.rate_limiter is get_shared_rate_limiter("shared_key")
+
+
+class TestAsyncHTTPClient:
+    def test_base_url_parsing(self) -> None:
+        client = AsyncHTTPClient("https://api.notion.com/v1")
+
+        assert client.host == "api.notion.com"
+        assert client.port == 443
+        assert client.base_path == "/v1"
+
+
+class TestProcessAsync:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+
+    def test_process_async_success(self) -> None:
+        def handler(request: Dict[str, Any]) -> Response:
+            if request["path"].endswith("/query"):
+                return _json_response({"results": [_item("item1", "牛乳")], "has_more": False})
+            return _json_response({"id": "comment"})
+
+        async def run() -> Any:
+            async with FakeNotionServer(handler) as server:
+
+                def client_factory(config: Config) -> AsyncNotionClient:
+                    return AsyncNotionClient(config, base_url=server.base_url)
+
+                with patch(
+                    "src.shopping_reminder.lambda_handler.AsyncNotionClient", client_factory
+                ):
+                    processor = ShoppingReminderProcessor(self.config)
+                    return await processor.process_async()
+
+        result = asyncio.run(run())
+
+        assert result.success is True
+        assert "1件の未チェック項目について通知を送信しました" in result.message
+
+    def test_process_async_query_error(self) -> None:
+        processor = ShoppingReminderProcessor(self.config)
+        with patch(
+            "src.shopping_reminder.lambda_handler.AsyncNotionClient.query_unchecked_items",
+            side_effect=Exception("データベースクエリエラー"),
+        ):
+            result = asyncio.run(processor.process_async())
+
+        assert result.success is False
+        assert "処理中にエラーが発生しました" in result.message
+        assert "データベースクエリエラー" in result.error
@@ -0,0 +1,247 @@
+import asyncio
+import socket
+import urllib.error
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from src.shopping_reminder import async_notion_client
+from src.shopping_reminder.async_notion_client import AsyncNotionClient, AsyncRateLimiter
+from src.shopping_reminder.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitBreakerTransport,
+    CircuitOpenError,
+    endpoint_key,
+)
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.notion_client import NotionAPIError, NotionClient
+from src.shopping_reminder.transport import (
+    Transport,
+    TransportRequest,
+    TransportResponse,
+    UrllibTransport,
+)
+from tests.shopping_reminder.test_async_notion_client import FakeNotionServer, _json_response
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(url: str = "https://api.notion.com/v1/databases/db-1/query") -> TransportRequest:
+    return TransportRequest(method="POST", url=url, headers={}, body=b"{}")
+
+
+class TestCircuitBreaker:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "POST /query", failure_threshold=3, recovery_timeout=10.0, clock=self.clock
+        )
+
+    def _fail(self, times: int) -> None:
+        for _ in range(times):
+            self.breaker.before_request()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        self._fail(2)
+        assert self.breaker.state == CLOSED
+        self._fail(1)
+        assert self.breaker.state == OPEN
+        with pytest.raises(CircuitOpenError, match="retry after 10.0s"):
+            self.breaker.before_request()
+
+    def test_success_resets_failure_count(self) -> None:
+        self._fail(2)
+        self.breaker.record_success()
+        self._fail(2)
+        assert self.breaker.state == CLOSED
+
+    def test_half_open_allows_single_probe(self) -> None:
+        self._fail(3)
+        self.clock.now = 10.0
+        assert self.breaker.state == HALF_OPEN
+
+        self.breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_request()
+
+        self.breaker.record_success()
+        assert self.breaker.state == CLOSED
+        self.breaker.before_request()
+
+    def test_failed_probe_reopens(self) -> None:
+        self._fail(3)
+        self.clock.now = 10.0
+        self.breaker.before_request()
+        self.breaker.record_failure()
+
+        assert self.breaker.state == OPEN
+        self.clock.now = 15.0
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_abandoned_probe_is_released(self) -> None:
+        self._fail(3)
+        self.clock.now = 10.0
+        self.breaker.before_request()  # 結果が記録されないまま放棄される
+
+        self.clock.now = 20.0
+        self.breaker.before_request()
+
+    def test_endpoint_key_masks_ids(self) -> None:
+        assert (
+            endpoint_key("post", "https://api.notion.com/v1/databases/abc-123/query")
+            == "POST api.notion.com/v1/databases/{id}/query"
+        )
+        assert (
+            endpoint_key("POST", "https://api.notion.com/v1/comments")
+            == "POST api.notion.com/v1/comments"
+        )
+
+
+class TestCircuitBreakerTransport:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.registry = CircuitBreakerRegistry(
+            failure_threshold=2, recovery_timeout=30.0, clock=self.clock
+        )
+        self.inner = Mock(spec=Transport)
+        self.transport = CircuitBreakerTransport(self.inner, self.registry)
+
+    def test_fails_fast_when_open(self) -> None:
+        self.inner.send.side_effect = urllib.error.URLError("timed out")
+        for _ in range(2):
+            with pytest.raises(urllib.error.URLError, match="timed out"):
+                self.transport.send(_request())
+
+        with pytest.raises(CircuitOpenError):
+            self.transport.send(_request())
+        assert self.inner.send.call_count == 2
+
+    def test_circuit_is_tracked_per_endpoint(self) -> None:
+        self.inner.send.side_effect = urllib.error.URLError("timed out")
+        for _ in range(2):
+            with pytest.raises(urllib.error.URLError):
+                self.transport.send(_request("https://api.notion.com/v1/databases/db-1/query"))
+
+        # 別のデータベースへのクエリも同じエンドポイントとして扱う
+        with pytest.raises(CircuitOpenError):
+            self.transport.send(_request("https://api.notion.com/v1/databases/db-2/query"))
+
+        self.inner.send.side_effect = None
+        self.inner.send.return_value = TransportResponse(status=200, body=b"{}")
+        assert self.transport.send(_request("https://api.notion.com/v1/comments")).status == 200
+
+    def test_client_errors_do_not_open_circuit(self) -> None:
+        self.inner.send.side_effect = urllib.error.HTTPError(
+            "url",
+            404,
+            "Not Found",
+            None,
+            None,  # type: ignore[arg-type]
+        )
+        for _ in range(3):
+            with pytest.raises(urllib.error.HTTPError):
+                self.transport.send(_request())
+        assert self.registry.get(endpoint_key("POST", _request().url)).state == CLOSED
+
+    def test_server_errors_open_circuit(self) -> None:
+        self.inner.send.return_value = TransportResponse(status=503, body=b"unavailable")
+        self.transport.send(_request())
+        self.transport.send(_request())
+        with pytest.raises(CircuitOpenError):
+            self.transport.send(_request())
+
+    def test_notion_client_reports_open_circuit(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        self.inner.send.side_effect = urllib.error.URLError("timed out")
+        client = NotionClient(config, transport=self.transport)
+
+        errors: List[str] = []
+        for _ in range(3):
+            with pytest.raises(NotionAPIError) as exc_info:
+                client.query_unchecked_items()
+            errors.append(str(exc_info.value))
+
+        assert "timed out" in errors[0]
+        assert "Circuit open" in errors[2]
+        assert self.inner.send.call_count == 2
+
+    def test_hung_connection_times_out_and_opens_circuit(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        # 接続は受け付けるが応答を返さないサーバー
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            base_url = f"http://127.0.0.1:{server.getsockname()[1]}/v1"
+            transport = CircuitBreakerTransport(UrllibTransport(timeout=0.1), self.registry)
+            client = NotionClient(config, transport=transport, base_url=base_url)
+
+            errors: List[str] = []
+            for _ in range(3):
+                with pytest.raises(NotionAPIError) as exc_info:
+                    client.query_unchecked_items()
+                errors.append(str(exc_info.value))
+
+        assert "timed out" in errors[0]
+        assert "Circuit open" in errors[2]
+
+
+class TestAsyncCircuitBreaker:
+    def test_async_client_shares_circuit_state(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        registry = CircuitBreakerRegistry(failure_threshold=2)
+
+        async def run() -> List[str]:
+            errors = []
+            async with FakeNotionServer(lambda request: _json_response({}, status=502)) as server:
+                async with AsyncNotionClient(
+                    config,
+                    base_url=server.base_url,
+                    rate_limiter=AsyncRateLimiter(rate_per_second=1000, burst=1000),
+                    circuit_breakers=registry,
+                ) as client:
+                    for _ in range(3):
+                        try:
+                            await client.query_unchecked_items()
+                        # 非同期クライアントはフラットな notion_client の例外を送出する
+                        except async_notion_client.NotionAPIError as e:
+                            errors.append(str(e))
+                requests = len(server.requests)
+            errors.append(str(requests))
+            return errors
+
+        errors = asyncio.run(run())
+
+        assert "HTTP error 502" in errors[0]
+        assert "Circuit open" in errors[2]
+        assert errors[3] == "2"
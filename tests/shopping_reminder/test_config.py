@@ -3,6 +3,12 @@ import pytest
 from unittest.mock import patch
 
 from src.shopping_reminder.config import Config, ConfigError
+from src.shopping_reminder.config_source import (
+    ChainConfigSource,
+    EnvConfigSource,
+    LocalSecretsBackend,
+    SecretsManagerConfigSource,
+)
 
 
 class TestConfig:
@@ -130,6 +136,167 @@ class TestConfig:
         assert "NOTION_API_KEY" in str(exc_info.value)
         assert "cannot be empty" in str(exc_info.value)
 
+    def test_config_creation_with_secrets_source(self) -> None:
+        backend = LocalSecretsBackend({"notion/api-key": "secret-from-store"})
+        source = ChainConfigSource(
+            [
+                SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "notion/api-key"}),
+                EnvConfigSource(),
+            ]
+        )
+        with patch.dict(
+            os.environ,
+            {
+                "NOTION_API_KEY": "env-key",
+                "NOTION_DATABASE_ID": "database-123",
+                "NOTION_PAGE_ID": "page-123",
+            },
+        ):
+            config = Config(source)
+        assert config.notion_api_key == "secret-from-store"
+        assert config.notion_database_id == "database-123"
+
+    def test_config_creation_secret_fetch_error(self) -> None:
+        # config.py と同じモジュール（Lambda環境と同じ絶対インポート）から取得元を作成する
+        import config_source
+
+        source = config_source.SecretsManagerConfigSource(
+            config_source.LocalSecretsBackend(), {"NOTION_API_KEY": "missing"}
+        )
+        with pytest.raises(ConfigError) as exc_info:
+            Config(source)
+        assert "NOTION_API_KEY" in str(exc_info.value)
+
+    def test_config_creation_invalid_secret_cache_ttl(self) -> None:
+        with patch.dict(
+            os.environ,
+            {
+                "NOTION_API_KEY_SECRET_ID": "notion/api-key",
+                "CONFIG_SECRET_CACHE_TTL_SECONDS": "five minutes",
+            },
+        ):
+            with pytest.raises(ConfigError) as exc_info:
+                Config()
+        assert "CONFIG_SECRET_CACHE_TTL_SECONDS" in str(exc_info.value)
+
+    def test_config_from_dict_with_source_fallback(self) -> None:
+        backend = LocalSecretsBackend({"notion/api-key": "secret-from-store"})
+        source = SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "notion/api-key"})
+        config = Config.from_dict(
+            {"NOTION_DATABASE_ID": "database-456", "NOTION_PAGE_ID": "page-456"}, source
+        )
+        assert config.notion_api_key == "secret-from-store"
+        assert config.notion_page_id == "page-456"
+
+    def test_config_page_ids_defaults_to_page_id(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret-key-456",
+                "NOTION_DATABASE_ID": "database-456",
+                "NOTION_PAGE_ID": "page-456",
+            }
+        )
+        assert config.notion_page_ids == ["page-456"]
+
+    def test_config_page_ids_from_env(self) -> None:
+        with patch.dict(
+            os.environ,
+            {
+                "NOTION_API_KEY": "secret-key-123",
+                "NOTION_DATABASE_ID": "database-123",
+                "NOTION_PAGE_ID": "page-123",
+                "NOTION_PAGE_IDS": "page-456, page-123,,page-789",
+            },
+        ):
+            config = Config()
+        assert config.notion_page_ids == ["page-123", "page-456", "page-789"]
+
+    def test_config_history_settings(self) -> None:
+        with patch.dict(
+            os.environ,
+            {
+                "NOTION_API_KEY": "secret-key-123",
+                "NOTION_DATABASE_ID": "database-123",
+                "NOTION_PAGE_ID": "page-123",
+                "HISTORY_DB_PATH": "/tmp/history.db",
+                "STALE_ITEM_DAYS": "7",
+            },
+        ):
+            config = Config()
+        assert config.history_db_path == "/tmp/history.db"
+        assert config.stale_item_days == 7
+
+    def test_config_history_defaults(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret-key-456",
+                "NOTION_DATABASE_ID": "database-456",
+                "NOTION_PAGE_ID": "page-456",
+            }
+        )
+        assert config.history_db_path is None
+        assert config.stale_item_days == 5
+
+    def test_config_invalid_stale_item_days(self) -> None:
+        with pytest.raises(ConfigError, match="STALE_ITEM_DAYS"):
+            Config.from_dict(
+                {
+                    "NOTION_API_KEY": "secret-key-456",
+                    "NOTION_DATABASE_ID": "database-456",
+                    "NOTION_PAGE_ID": "page-456",
+                    "STALE_ITEM_DAYS": "soon",
+                }
+            )
+
+    def test_config_query_shards(self) -> None:
+        base = {
+            "NOTION_API_KEY": "secret-key-456",
+            "NOTION_DATABASE_ID": "database-456",
+            "NOTION_PAGE_ID": "page-456",
+        }
+        assert Config.from_dict(base).query_shards == 1
+        assert Config.from_dict({**base, "QUERY_SHARDS": "4"}).query_shards == 4
+        with pytest.raises(ConfigError, match="QUERY_SHARDS must be positive"):
+            Config.from_dict({**base, "QUERY_SHARDS": "0"})
+
+    def test_config_max_comment_items(self) -> None:
+        base = {
+            "NOTION_API_KEY": "secret-key-456",
+            "NOTION_DATABASE_ID": "database-456",
+            "NOTION_PAGE_ID": "page-456",
+        }
+        assert Config.from_dict(base).max_comment_items is None
+        assert Config.from_dict({**base, "MAX_COMMENT_ITEMS": "50"}).max_comment_items == 50
+        with pytest.raises(ConfigError, match="MAX_COMMENT_ITEMS must be an integer"):
+            Config.from_dict({**base, "MAX_COMMENT_ITEMS": "all"})
+
+    def test_config_hedge_read_percentile(self) -> None:
+        base = {
+            "NOTION_API_KEY": "secret-key-456",
+            "NOTION_DATABASE_ID": "database-456",
+            "NOTION_PAGE_ID": "page-456",
+        }
+        assert Config.from_dict(base).hedge_read_percentile is None
+        assert Config.from_dict({**base, "HEDGE_READ_PERCENTILE": "95"}).hedge_read_percentile == 95
+        with pytest.raises(ConfigError, match="HEDGE_READ_PERCENTILE must be between 1 and 99"):
+            Config.from_dict({**base, "HEDGE_READ_PERCENTILE": "100"})
+
+    def test_config_query_cache(self) -> None:
+        base = {
+            "NOTION_API_KEY": "secret-key-456",
+            "NOTION_DATABASE_ID": "database-456",
+            "NOTION_PAGE_ID": "page-456",
+        }
+        config = Config.from_dict(base)
+        assert config.query_cache_db_path is None
+        assert config.query_cache_max_age_days == 7
+
+        config = Config.from_dict(
+            {**base, "QUERY_CACHE_DB_PATH": "/tmp/cache.db", "QUERY_CACHE_MAX_AGE_DAYS": "3"}
+        )
+        assert config.query_cache_db_path == "/tmp/cache.db"
+        assert config.query_cache_max_age_days == 3
+
     def test_config_str_representation_hides_sensitive_data(self) -> None:
         with patch.dict(
             os.environ,
@@ -0,0 +1,204 @@
+import json
+import os
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.shopping_reminder.config_source import (
+    CachedConfigSource,
+    ChainConfigSource,
+    ConfigSourceError,
+    EnvConfigSource,
+    FileConfigSource,
+    LambdaExtensionSecretsBackend,
+    LocalSecretsBackend,
+    SecretsManagerConfigSource,
+    build_default_source,
+    get_default_source,
+)
+
+
+class TestEnvConfigSource:
+    def test_get_returns_env_value(self) -> None:
+        with patch.dict(os.environ, {"NOTION_API_KEY": "env-key"}):
+            assert EnvConfigSource().get("NOTION_API_KEY") == "env-key"
+
+    def test_get_returns_none_when_missing(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            assert EnvConfigSource().get("NOTION_API_KEY") is None
+
+
+class TestFileConfigSource:
+    def test_get_reads_json_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({"NOTION_DATABASE_ID": "db-from-file"}), encoding="utf-8")
+
+        source = FileConfigSource(str(path))
+
+        assert source.get("NOTION_DATABASE_ID") == "db-from-file"
+        assert source.get("NOTION_PAGE_ID") is None
+
+    def test_get_reloads_when_file_changes(self, tmp_path: Path) -> None:
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({"NOTION_PAGE_ID": "page-1"}), encoding="utf-8")
+        source = FileConfigSource(str(path))
+        assert source.get("NOTION_PAGE_ID") == "page-1"
+
+        path.write_text(json.dumps({"NOTION_PAGE_ID": "page-2"}), encoding="utf-8")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+
+        assert source.get("NOTION_PAGE_ID") == "page-2"
+
+    def test_get_missing_file_raises(self, tmp_path: Path) -> None:
+        source = FileConfigSource(str(tmp_path / "missing.json"))
+        with pytest.raises(ConfigSourceError):
+            source.get("NOTION_PAGE_ID")
+
+    def test_get_non_object_raises(self, tmp_path: Path) -> None:
+        path = tmp_path / "config.json"
+        path.write_text("[1, 2]", encoding="utf-8")
+        with pytest.raises(ConfigSourceError) as exc_info:
+            FileConfigSource(str(path)).get("NOTION_PAGE_ID")
+        assert "JSON object" in str(exc_info.value)
+
+
+class TestSecretsManagerConfigSource:
+    def test_plain_secret_string(self) -> None:
+        backend = LocalSecretsBackend({"notion/api-key": "secret-plain"})
+        source = SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "notion/api-key"})
+
+        assert source.get("NOTION_API_KEY") == "secret-plain"
+        assert source.get("NOTION_PAGE_ID") is None
+
+    def test_json_secret_string(self) -> None:
+        backend = LocalSecretsBackend({"notion": json.dumps({"NOTION_API_KEY": "secret-json"})})
+        source = SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "notion"})
+
+        assert source.get("NOTION_API_KEY") == "secret-json"
+
+    def test_missing_secret_raises(self) -> None:
+        source = SecretsManagerConfigSource(LocalSecretsBackend(), {"NOTION_API_KEY": "missing"})
+        with pytest.raises(ConfigSourceError):
+            source.get("NOTION_API_KEY")
+
+
+class TestLambdaExtensionSecretsBackend:
+    @patch("urllib.request.urlopen")
+    def test_get_secret_value(self, mock_urlopen: Mock) -> None:
+        mock_response = Mock()
+        mock_response.read.return_value = json.dumps({"SecretString": "from-extension"}).encode()
+        mock_urlopen.return_value.__enter__.return_value = mock_response
+
+        with patch.dict(os.environ, {"AWS_SESSION_TOKEN": "session-token"}):
+            value = LambdaExtensionSecretsBackend().get_secret_value("notion/api-key")
+
+        assert value == "from-extension"
+        request = mock_urlopen.call_args[0][0]
+        assert "secretId=notion%2Fapi-key" in request.full_url
+        assert request.get_header("X-aws-parameters-secrets-token") == "session-token"
+
+    @patch("urllib.request.urlopen")
+    def test_get_secret_value_url_error(self, mock_urlopen: Mock) -> None:
+        import urllib.error
+
+        mock_urlopen.side_effect = urllib.error.URLError("Connection refused")
+
+        with pytest.raises(ConfigSourceError) as exc_info:
+            LambdaExtensionSecretsBackend().get_secret_value("notion/api-key")
+        assert "notion/api-key" in str(exc_info.value)
+
+
+class TestCachedConfigSource:
+    def test_fresh_value_is_served_from_cache(self) -> None:
+        backend = LocalSecretsBackend({"sid": "v1"})
+        source = CachedConfigSource(
+            SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "sid"}), ttl_seconds=60
+        )
+
+        assert source.get("NOTION_API_KEY") == "v1"
+        assert source.get("NOTION_API_KEY") == "v1"
+        assert backend.fetch_count == 1
+
+    def test_refresh_window_serves_cached_and_refreshes_in_background(self) -> None:
+        backend = LocalSecretsBackend({"sid": "v1"})
+        source = CachedConfigSource(
+            SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "sid"}),
+            ttl_seconds=60,
+            refresh_after_seconds=0,
+        )
+        assert source.get("NOTION_API_KEY") == "v1"
+
+        backend.put_secret("sid", "v2")
+        assert source.get("NOTION_API_KEY") == "v1"
+
+        deadline = time.monotonic() + 2
+        while source.get("NOTION_API_KEY") != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert source.get("NOTION_API_KEY") == "v2"
+
+    def test_expired_value_is_fetched_synchronously(self) -> None:
+        backend = LocalSecretsBackend({"sid": "v1"})
+        source = CachedConfigSource(
+            SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "sid"}), ttl_seconds=0
+        )
+        assert source.get("NOTION_API_KEY") == "v1"
+
+        backend.put_secret("sid", "v2")
+        assert source.get("NOTION_API_KEY") == "v2"
+
+    def test_expired_value_falls_back_to_stale_on_error(self) -> None:
+        inner = Mock()
+        inner.name = "mock"
+        inner.get.side_effect = ["v1", ConfigSourceError("unavailable")]
+        source = CachedConfigSource(inner, ttl_seconds=0)
+
+        assert source.get("NOTION_API_KEY") == "v1"
+        assert source.get("NOTION_API_KEY") == "v1"
+
+    def test_invalidate_forces_refetch(self) -> None:
+        backend = LocalSecretsBackend({"sid": "v1"})
+        source = CachedConfigSource(
+            SecretsManagerConfigSource(backend, {"NOTION_API_KEY": "sid"}), ttl_seconds=60
+        )
+        source.get("NOTION_API_KEY")
+        backend.put_secret("sid", "v2")
+
+        source.invalidate("NOTION_API_KEY")
+
+        assert source.get("NOTION_API_KEY") == "v2"
+
+
+class TestChainConfigSource:
+    def test_first_non_empty_value_wins(self) -> None:
+        first = SecretsManagerConfigSource(LocalSecretsBackend({"sid": "  "}), {"K": "sid"})
+        second = SecretsManagerConfigSource(LocalSecretsBackend({"sid": "second"}), {"K": "sid"})
+
+        chain = ChainConfigSource([first, second])
+
+        assert chain.get("K") == "second"
+        assert chain.get("OTHER") is None
+        assert chain.name == "chain(secretsmanager,secretsmanager)"
+
+
+class TestDefaultSource:
+    def test_build_default_source_env_only(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            assert build_default_source().name == "chain(env)"
+
+    def test_build_default_source_with_secret_and_file(self) -> None:
+        with patch.dict(
+            os.environ,
+            {"NOTION_API_KEY_SECRET_ID": "notion/api-key", "CONFIG_FILE": "/tmp/config.json"},
+            clear=True,
+        ):
+            assert build_default_source().name == "chain(cached(secretsmanager),env,file)"
+
+    def test_get_default_source_is_reused_until_env_changes(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            first = get_default_source()
+            assert get_default_source() is first
+
+            os.environ["CONFIG_FILE"] = "/tmp/config.json"
+            assert get_default_source() is not first
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from typing import List, Optional
+from unittest.mock import Mock, patch
+
+from src.shopping_reminder.cpu_profile import StackSampler, main, replay_cassette
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.models import NotificationResult
+
+# replay_cassette はフラットなモジュール名の NotionClient を差し替える
+from notion_client import NotionClient
+
+CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "query_and_comment.json")
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestStackSampler:
+    def test_records_collapsed_stacks(self) -> None:
+        with StackSampler(interval=0.001) as sampler:
+            _busy_wait(0.2)
+
+        report = sampler.report()
+        assert report["samples"] > 0
+        assert "_busy_wait" in report["top_functions"][0]["function"]
+        line = sampler.collapsed().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert "test_records_collapsed_stacks" in stack and ";" in stack
+        assert int(count) > 0
+
+
+class TestProfileCommand:
+    def test_profiles_replayed_handler_runs(self, monkeypatch, tmp_path) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_test_key")
+        monkeypatch.setenv("NOTION_DATABASE_ID", "recorded-database")
+        monkeypatch.setenv("NOTION_PAGE_ID", "recorded-page")
+        prefix = str(tmp_path / "out" / "run")
+
+        assert main(["--cassette", CASSETTE, "--repeat", "2", "--output", prefix]) == 0
+
+        with open(f"{prefix}.txt", encoding="utf-8") as f:
+            stats = f.read()
+        assert "lambda_handler.py" in stats and "create_comment" in stats
+        assert os.path.getsize(f"{prefix}.prof") > 0
+        assert os.path.exists(f"{prefix}.folded")
+
+    def test_replay_cassette_restores_default_transport(self) -> None:
+        original = NotionClient.__dict__["_default_transport"]
+        with replay_cassette(CASSETTE):
+            assert NotionClient.__dict__["_default_transport"] is not original
+        assert NotionClient.__dict__["_default_transport"] is original
+
+
+class TestHandlerCPUProfiling:
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    def test_event_flag_adds_cpu_profile(
+        self, mock_config_class: Mock, mock_processor_class: Mock
+    ) -> None:
+        def process(page_ids: Optional[List[str]] = None) -> NotificationResult:
+            _busy_wait(0.1)
+            return NotificationResult(success=True, message="ok")
+
+        mock_config_class.return_value.notion_database_id = "test_database_id"
+        mock_processor_class.return_value.process.side_effect = process
+
+        response = handler({"cpu_profiling": True}, None)
+
+        profile = json.loads(response["body"])["cpu_profile"]
+        assert profile["samples"] > 0
+        assert any("_busy_wait" in entry["function"] for entry in profile["top_functions"])
+
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    def test_no_cpu_profile_by_default(
+        self, mock_config_class: Mock, mock_processor_class: Mock
+    ) -> None:
+        mock_config_class.return_value.notion_database_id = "test_database_id"
+        mock_processor_class.return_value.process.return_value = NotificationResult(
+            success=True, message="ok"
+        )
+
+        response = handler({}, None)
+
+        assert "cpu_profile" not in json.loads(response["body"])
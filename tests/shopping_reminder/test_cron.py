@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.shopping_reminder.cron import CronError, CronSchedule
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestCronSchedule:
+    def test_daily_in_timezone(self) -> None:
+        schedule = CronSchedule.parse("0 17 * * *", "Asia/Tokyo")
+        # JST 17:00 = UTC 08:00
+        assert schedule.next_after(_utc(2025, 1, 1, 0, 0)) == _utc(2025, 1, 1, 8, 0)
+        assert schedule.next_after(_utc(2025, 1, 1, 8, 0)) == _utc(2025, 1, 2, 8, 0)
+
+    def test_steps_ranges_and_lists(self) -> None:
+        schedule = CronSchedule.parse("*/15 9-10 * * *")
+        assert schedule.next_after(_utc(2025, 1, 1, 9, 7)) == _utc(2025, 1, 1, 9, 15)
+        assert schedule.next_after(_utc(2025, 1, 1, 10, 45)) == _utc(2025, 1, 2, 9, 0)
+
+        weekdays = CronSchedule.parse("30 8 * * 1,3,5")
+        # 2025-01-04 は土曜日
+        assert weekdays.next_after(_utc(2025, 1, 4)) == _utc(2025, 1, 6, 8, 30)
+
+    def test_day_of_month_or_day_of_week(self) -> None:
+        # 日と曜日の両方を指定した場合はどちらかに一致すればよい（1日または日曜日）
+        schedule = CronSchedule.parse("0 0 1 * 0")
+        assert schedule.next_after(_utc(2025, 1, 1, 12)) == _utc(2025, 1, 5)
+        assert schedule.next_after(_utc(2025, 1, 26, 12)) == _utc(2025, 2, 1)
+
+    def test_sunday_as_seven(self) -> None:
+        assert CronSchedule.parse("0 0 * * 7").next_after(_utc(2025, 1, 1)) == _utc(2025, 1, 5)
+
+    def test_leap_day(self) -> None:
+        schedule = CronSchedule.parse("0 0 29 2 *")
+        assert schedule.next_after(_utc(2025, 3, 1)) == _utc(2028, 2, 29)
+
+    def test_daylight_saving_gap_and_overlap(self) -> None:
+        schedule = CronSchedule.parse("30 2 * * *", "America/New_York")
+        # 2024-03-10 02:30 は存在しない（夏時間の開始）ため 03:30 EDT に実行
+        assert schedule.next_after(_utc(2024, 3, 10, 5)) == _utc(2024, 3, 10, 7, 30)
+
+        overlap = CronSchedule.parse("30 1 * * *", "America/New_York")
+        # 2024-11-03 01:30 は2回あるが、1回目（EDT）のみ実行する
+        assert overlap.next_after(_utc(2024, 11, 3, 5)) == _utc(2024, 11, 3, 5, 30)
+        assert overlap.next_after(_utc(2024, 11, 3, 5, 30)) == _utc(2024, 11, 4, 6, 30)
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *", "0 0 31 2 *"],
+    )
+    def test_invalid_expressions(self, expression: str) -> None:
+        with pytest.raises(CronError):
+            CronSchedule.parse(expression).next_after(_utc(2025, 1, 1))
+
+    def test_unknown_timezone(self) -> None:
+        with pytest.raises(CronError, match="Unknown timezone"):
+            CronSchedule.parse("0 0 * * *", "Mars/Olympus_Mons")
+
+    def test_naive_datetime_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            CronSchedule.parse("0 0 * * *").next_after(datetime(2025, 1, 1))
@@ -0,0 +1,232 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.cron import CronSchedule
+from src.shopping_reminder.daemon import Daemon, ScheduledTarget, load_targets, main
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.target_scheduler import TargetCostHistory, target_key
+
+# daemon はフラットなモジュール名の ConfigError を送出する
+from config import ConfigError
+
+START = datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self, now: datetime = START) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _config(page_id: str = "test_page_id") -> Config:
+    return Config.from_dict(
+        {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": page_id,
+        }
+    )
+
+
+def _target(name: str, expression: str) -> ScheduledTarget:
+    return ScheduledTarget(name=name, config=_config(name), schedule=CronSchedule.parse(expression))
+
+
+def _wait_idle(daemon: Daemon) -> None:
+    deadline = time.monotonic() + 5
+    while daemon.running():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class TestDaemon:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.processors: List[Mock] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _factory(self, config: Config) -> Mock:
+        processor = Mock()
+        processor.config = config
+
+        def process() -> NotificationResult:
+            self.release.wait(timeout=5)
+            return NotificationResult(success=True, message="ok")
+
+        processor.process.side_effect = process
+        self.processors.append(processor)
+        return processor
+
+    def _daemon(self, targets: List[ScheduledTarget]) -> Daemon:
+        return Daemon(targets, max_workers=2, clock=self.clock, processor_factory=self._factory)
+
+    def test_targets_run_in_due_order(self) -> None:
+        daemon = self._daemon([_target("evening", "0 17 * * *"), _target("morning", "0 8 * * *")])
+        assert daemon.next_due() == START + timedelta(hours=8)
+
+        assert daemon.run_due() == 0
+        self.clock.now = START + timedelta(hours=8)
+        assert daemon.run_due() == 1
+        assert daemon.next_due() == START + timedelta(hours=17)
+        daemon.shutdown()
+
+        assert [p.config.notion_page_id for p in self.processors] == ["morning"]
+        assert daemon.last_results["morning"].success is True
+
+    def test_due_targets_start_longest_first(self) -> None:
+        history = TargetCostHistory()
+        targets = [_target(name, "0 17 * * *") for name in ("small", "large", "medium")]
+        for target, seconds in zip(targets, (1.0, 40.0, 8.0)):
+            history.record(target_key(target.config), seconds, 1, True)
+        daemon = Daemon(
+            targets,
+            max_workers=1,
+            clock=self.clock,
+            processor_factory=self._factory,
+            cost_history=history,
+        )
+        self.clock.now = START + timedelta(hours=17)
+
+        assert daemon.run_due() == 3
+        daemon.shutdown()
+
+        assert [p.config.notion_page_id for p in self.processors] == ["large", "medium", "small"]
+        assert history.get(target_key(targets[0].config)).runs == 2
+        history.close()
+
+    def test_processor_is_reused_between_runs(self) -> None:
+        daemon = self._daemon([_target("hourly", "0 * * * *")])
+        for hour in (1, 2, 3):
+            self.clock.now = START + timedelta(hours=hour)
+            assert daemon.run_due() == 1
+            _wait_idle(daemon)
+        daemon.shutdown()
+
+        assert len(self.processors) == 1
+        assert self.processors[0].process.call_count == 3
+
+    def test_missed_runs_are_coalesced(self) -> None:
+        daemon = self._daemon([_target("every-minute", "* * * * *")])
+        self.clock.now = START + timedelta(minutes=30)
+
+        assert daemon.run_due() == 1
+        assert daemon.next_due() == START + timedelta(minutes=31)
+        daemon.shutdown()
+
+    def test_overlapping_run_is_skipped(self) -> None:
+        self.release.clear()
+        daemon = self._daemon([_target("every-minute", "* * * * *")])
+        self.clock.now = START + timedelta(minutes=1)
+        assert daemon.run_due() == 1
+        self.clock.now = START + timedelta(minutes=2)
+        assert daemon.run_due() == 0
+
+        self.release.set()
+        daemon.shutdown()
+        assert self.processors[0].process.call_count == 1
+
+    def test_failure_is_recorded_and_daemon_continues(self) -> None:
+        def failing_factory(config: Config) -> Mock:
+            processor = Mock()
+            processor.process.side_effect = RuntimeError("boom")
+            return processor
+
+        daemon = Daemon(
+            [_target("broken", "* * * * *")],
+            clock=self.clock,
+            processor_factory=failing_factory,
+        )
+        self.clock.now = START + timedelta(minutes=1)
+        daemon.run_due()
+        daemon.shutdown()
+
+        assert daemon.last_results["broken"].success is False
+        assert daemon.last_results["broken"].error == "boom"
+
+    def test_run_forever_stops(self) -> None:
+        daemon = Daemon([_target("daily", "0 17 * * *")], processor_factory=self._factory)
+        threading.Timer(0.05, daemon.stop).start()
+
+        daemon.run_forever()
+        daemon.shutdown()
+
+        assert self.processors == []
+
+
+class TestLoadTargets:
+    def test_load_targets_with_defaults(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_from_env")
+        monkeypatch.setenv("STALE_ITEM_DAYS", "9")
+        monkeypatch.setenv("HISTORY_DB_PATH", "/tmp/history.db")
+        path = tmp_path / "targets.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "defaults": {"NOTION_DATABASE_ID": "shared-database"},
+                    "targets": [
+                        {
+                            "name": "home",
+                            "schedule": "0 17 * * *",
+                            "timezone": "Asia/Tokyo",
+                            "config": {"NOTION_PAGE_ID": "home-page"},
+                        },
+                        {
+                            "name": "office",
+                            "schedule": "30 12 * * 1-5",
+                            "timezone": "UTC",
+                            "config": {
+                                "NOTION_DATABASE_ID": "office-database",
+                                "NOTION_PAGE_ID": "office-page",
+                                "STALE_ITEM_DAYS": "3",
+                            },
+                        },
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        targets = load_targets(str(path))
+
+        assert [target.name for target in targets] == ["home", "office"]
+        assert targets[0].config.notion_api_key == "secret_from_env"
+        assert targets[0].config.notion_database_id == "shared-database"
+        assert targets[1].config.notion_database_id == "office-database"
+        # ファイルにない任意の設定も環境変数から補完し、対象ごとの指定を優先する
+        assert targets[0].config.history_db_path == "/tmp/history.db"
+        assert targets[0].config.stale_item_days == 9
+        assert targets[1].config.stale_item_days == 3
+        assert targets[0].schedule.next_after(START) == START + timedelta(hours=8)
+
+    @pytest.mark.parametrize(
+        "content, message",
+        [
+            ("not json", "could not be loaded"),
+            ('{"targets": {}}', "'targets' list"),
+            ('{"targets": [1]}', "must be a JSON object"),
+            ('{"targets": [{"name": "a", "schedule": "bad"}]}', "Invalid schedule"),
+            ('{"targets": [{"name": "a"}, {"name": "a"}]}', "Duplicate target name"),
+        ],
+    )
+    def test_invalid_targets_file(self, tmp_path, monkeypatch, content: str, message: str) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_from_env")
+        monkeypatch.setenv("NOTION_DATABASE_ID", "database-from-env")
+        monkeypatch.setenv("NOTION_PAGE_ID", "page-from-env")
+        path = tmp_path / "targets.json"
+        path.write_text(content, encoding="utf-8")
+        with pytest.raises(ConfigError, match=message):
+            load_targets(str(path))
+
+    def test_main_returns_error_for_missing_file(self, tmp_path) -> None:
+        assert main(["--targets", str(tmp_path / "missing.json")]) == 2
@@ -0,0 +1,210 @@
+import threading
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.hedging import (
+    HedgeBudget,
+    HedgingTransport,
+    LatencyTracker,
+    is_idempotent_read,
+)
+from src.shopping_reminder.notion_client import NotionClient
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+from src.shopping_reminder.usage import UsageTracker
+
+QUERY_URL = "https://api.notion.com/v1/databases/db-1/query"
+COMMENTS_URL = "https://api.notion.com/v1/comments"
+
+
+def _request(method: str = "POST", url: str = QUERY_URL) -> TransportRequest:
+    return TransportRequest(method=method, url=url, headers={}, body=b"{}")
+
+
+class GatedTransport(Transport):
+    """呼び出しごとに、解放されるまで応答を止められるトランスポート"""
+
+    def __init__(self, blocked_calls: int = 0, fail: bool = False) -> None:
+        self.blocked_calls = blocked_calls
+        self.fail = fail
+        self.release = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call <= self.blocked_calls:
+            self.release.wait(timeout=5)
+        if self.fail:
+            raise urllib.error.URLError(f"failure {call}")
+        return TransportResponse(200, f'{{"call":{call}}}'.encode("utf-8"))
+
+
+class TestIdempotentRead:
+    def test_reads_and_writes(self) -> None:
+        assert is_idempotent_read(_request("POST", QUERY_URL)) is True
+        assert is_idempotent_read(_request("GET", "https://api.notion.com/v1/pages/p1")) is True
+        assert is_idempotent_read(_request("POST", COMMENTS_URL)) is False
+        assert is_idempotent_read(_request("PATCH", "https://api.notion.com/v1/pages/p1")) is False
+
+
+class TestLatencyTracker:
+    def test_percentile_requires_min_samples(self) -> None:
+        tracker = LatencyTracker()
+        for ms in range(1, 11):
+            tracker.record("key", ms / 1000)
+        assert tracker.percentile("key", 90, min_samples=20) is None
+        assert tracker.percentile("key", 90, min_samples=10) == pytest.approx(0.010)
+        assert tracker.percentile("key", 50, min_samples=10) == pytest.approx(0.006)
+
+    def test_window_keeps_recent_samples(self) -> None:
+        tracker = LatencyTracker(window=3)
+        for seconds in (10.0, 1.0, 1.0, 1.0):
+            tracker.record("key", seconds)
+        assert tracker.percentile("key", 99, min_samples=1) == 1.0
+
+
+class TestHedgeBudget:
+    def test_budget_limits_extra_requests(self) -> None:
+        budget = HedgeBudget(ratio=0.5, burst=1.0)
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+        budget.on_request()
+        assert budget.try_acquire() is False
+        budget.on_request()
+        assert budget.try_acquire() is True
+
+
+class TestHedgingTransport:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.inner: Optional[GatedTransport] = None
+
+    def teardown_method(self) -> None:
+        if self.inner is not None:
+            self.inner.release.set()
+        self.executor.shutdown(wait=True)
+
+    def _transport(self, inner: GatedTransport, **kwargs) -> HedgingTransport:
+        self.inner = inner
+        kwargs.setdefault("initial_delay", 0.02)
+        return HedgingTransport(inner, tracker=LatencyTracker(), executor=self.executor, **kwargs)
+
+    def test_fast_response_is_not_hedged(self) -> None:
+        inner = GatedTransport()
+        response = self._transport(inner, initial_delay=1.0).send(_request())
+        assert response.body == b'{"call":1}'
+        assert inner.calls == 1
+
+    def test_slow_read_is_hedged_and_first_response_wins(self) -> None:
+        inner = GatedTransport(blocked_calls=1)
+        response = self._transport(inner).send(_request())
+        assert response.body == b'{"call":2}'
+        assert inner.calls == 2
+
+    def test_hedged_request_is_recorded_in_usage(self) -> None:
+        usage = UsageTracker()
+        inner = GatedTransport(blocked_calls=1)
+        transport = self._transport(inner, usage=usage, target="db-1")
+
+        transport.send(_request())
+
+        # ヘッジの1件のみを記録する（応答を使った1件は呼び出し元が記録する）
+        report = usage.report("db-1")
+        assert (report["requests"], report["retries"]) == (1, 1)
+        assert report["bytes_received"] == len(b'{"call":2}')
+
+    def test_unhedged_request_is_not_recorded(self) -> None:
+        usage = UsageTracker()
+        transport = self._transport(GatedTransport(), initial_delay=1.0, usage=usage, target="db-1")
+
+        transport.send(_request())
+
+        assert usage.requests("db-1") == 0
+
+    def test_writes_are_never_hedged(self) -> None:
+        inner = GatedTransport(blocked_calls=1)
+        transport = self._transport(inner)
+        threading.Timer(0.1, inner.release.set).start()
+
+        response = transport.send(_request("POST", COMMENTS_URL))
+
+        assert response.body == b'{"call":1}'
+        assert inner.calls == 1
+
+    def test_exhausted_budget_waits_for_primary(self) -> None:
+        inner = GatedTransport(blocked_calls=1)
+        transport = self._transport(inner, budget=HedgeBudget(ratio=0.0, burst=0.0))
+        threading.Timer(0.1, inner.release.set).start()
+
+        response = transport.send(_request())
+
+        assert response.body == b'{"call":1}'
+        assert inner.calls == 1
+
+    def test_both_attempts_failing_raises(self) -> None:
+        inner = GatedTransport(blocked_calls=1, fail=True)
+        transport = self._transport(inner)
+        threading.Timer(0.1, inner.release.set).start()
+
+        with pytest.raises(urllib.error.URLError, match="failure 2"):
+            transport.send(_request())
+        assert inner.calls == 2
+
+    def test_delay_is_learned_from_latency(self) -> None:
+        tracker = LatencyTracker()
+        transport = HedgingTransport(
+            GatedTransport(),
+            tracker=tracker,
+            min_samples=5,
+            min_delay=0.05,
+            executor=self.executor,
+        )
+        key = "POST api.notion.com/v1/databases/{id}/query"
+        assert transport.hedge_delay(key) == transport.initial_delay
+        for seconds in (0.2, 0.2, 0.2, 0.2, 0.9):
+            tracker.record(key, seconds)
+        assert transport.hedge_delay(key) == pytest.approx(0.9)
+        assert HedgingTransport(
+            GatedTransport(), percentile=50, tracker=tracker, min_samples=5
+        ).hedge_delay(key) == pytest.approx(0.2)
+
+    def test_notion_client_hedges_only_when_configured(self) -> None:
+        base = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+        plain = NotionClient(Config.from_dict(base))
+        hedged = NotionClient(Config.from_dict({**base, "HEDGE_READ_PERCENTILE": "90"}))
+
+        assert type(plain.transport).__name__ == "CircuitBreakerTransport"
+        assert type(hedged.transport).__name__ == "HedgingTransport"
+        assert hedged.transport.percentile == 90
+        assert hedged.transport.target == "test_database_id"
+
+    def test_notion_query_uses_hedged_response(self) -> None:
+        class SlowFirstPage(GatedTransport):
+            def send(self, request: TransportRequest) -> TransportResponse:
+                super().send(request)
+                body = b'{"results":[],"has_more":false,"next_cursor":null}'
+                return TransportResponse(200, body)
+
+        inner = SlowFirstPage(blocked_calls=1)
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        client = NotionClient(config, transport=self._transport(inner))
+
+        assert client.query_unchecked_items() == []
+        assert inner.calls == 2
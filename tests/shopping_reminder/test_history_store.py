@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+import history_store
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.history_store import HistoryStore, get_history_store
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor
+from src.shopping_reminder.models import NotificationResult, ShoppingItem
+
+MILK = ShoppingItem("1", "牛乳", False)
+BREAD = ShoppingItem("2", "パン", False)
+EGGS = ShoppingItem("3", "卵", False)
+
+DAY1 = date(2025, 1, 1)
+
+
+def _day(offset: int) -> date:
+    return DAY1 + timedelta(days=offset)
+
+
+class TestHistoryStore:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.store = HistoryStore()
+
+    def teardown_method(self) -> None:
+        self.store.close()
+
+    def test_empty_store(self) -> None:
+        assert self.store.item_ages() == {}
+        assert self.store.item_age_days("1") == 0
+        assert self.store.streak("1") == 0
+        assert self.store.frequency("1") == 0
+
+    def test_age_and_streak_of_continuously_unchecked_item(self) -> None:
+        for offset in range(4):
+            self.store.record_snapshot([MILK], run_date=_day(offset))
+
+        assert self.store.item_age_days("1") == 3
+        assert self.store.streak("1") == 4
+
+    def test_streak_restarts_after_gap(self) -> None:
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(0))
+        self.store.record_snapshot([BREAD], run_date=_day(1))
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(2))
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(3))
+
+        assert self.store.item_age_days("1") == 1
+        assert self.store.streak("1") == 2
+        assert self.store.item_age_days("2") == 3
+        assert self.store.streak("2") == 4
+        assert self.store.frequency("1") == 3
+
+    def test_item_not_in_latest_run_has_no_age(self) -> None:
+        self.store.record_snapshot([MILK], run_date=_day(0))
+        self.store.record_snapshot([BREAD], run_date=_day(1))
+
+        assert self.store.item_age_days("1") == 0
+        assert self.store.streak("1") == 0
+        assert self.store.item_ages() == {"2": 0}
+
+    def test_item_ages_and_stale_items(self) -> None:
+        self.store.record_snapshot([MILK], run_date=_day(0))
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(3))
+        self.store.record_snapshot([MILK, BREAD, EGGS], run_date=_day(6))
+
+        assert self.store.item_ages() == {"1": 6, "2": 3, "3": 0}
+        assert self.store.stale_items(5) == {"1": 6}
+        assert self.store.item_ages(as_of=_day(3)) == {"1": 3, "2": 0}
+
+    def test_frequency_window(self) -> None:
+        for offset in (0, 10, 20, 29):
+            self.store.record_snapshot([MILK], run_date=_day(offset))
+
+        assert self.store.frequency("1", window_days=30) == 4
+        assert self.store.frequency("1", window_days=10) == 2
+
+    def test_rerun_on_same_day_replaces_snapshot(self) -> None:
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(0))
+        self.store.record_snapshot([MILK], run_date=_day(0))
+
+        assert self.store.item_ages() == {"1": 0}
+        assert self.store.frequency("2") == 0
+
+    def test_old_snapshots_are_pruned(self) -> None:
+        store = HistoryStore(retention_days=7)
+        store.record_snapshot([MILK], run_date=_day(0))
+        store.record_snapshot([MILK], run_date=_day(10))
+
+        assert store.frequency("1", window_days=365) == 1
+        assert store.item_age_days("1") == 0
+        store.close()
+
+    def test_partial_snapshot_does_not_break_streaks(self) -> None:
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(0))
+        self.store.record_snapshot([MILK], run_date=_day(2), complete=False)
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(4))
+
+        assert self.store.item_ages() == {"1": 4, "2": 4}
+
+    def test_databases_are_recorded_separately(self) -> None:
+        self.store.record_snapshot([MILK], run_date=_day(0), database_id="home")
+        self.store.record_snapshot([MILK, BREAD], run_date=_day(0), database_id="office")
+        self.store.record_snapshot([MILK], run_date=_day(3), database_id="home")
+        # 別のデータベースの同じ日の実行で上書きされず、途切れたともみなされない
+        self.store.record_snapshot([BREAD], run_date=_day(3), database_id="office")
+        self.store.record_snapshot([MILK], run_date=_day(5), database_id="home")
+
+        assert self.store.item_ages(database_id="home") == {"1": 5}
+        assert self.store.streak("1", database_id="home") == 3
+        assert self.store.item_ages(database_id="office") == {"2": 3}
+        assert self.store.frequency("1", database_id="office") == 1
+        assert self.store.item_ages() == {}
+
+    def test_persists_to_file(self, tmp_path) -> None:
+        path = str(tmp_path / "history.db")
+        store = HistoryStore(path)
+        store.record_snapshot([MILK], run_date=_day(0))
+        store.close()
+
+        reopened = HistoryStore(path)
+        reopened.record_snapshot([MILK], run_date=_day(2))
+        assert reopened.item_age_days("1") == 2
+        reopened.close()
+
+    def test_get_history_store_reuses_instance(self, tmp_path) -> None:
+        path = str(tmp_path / "shared.db")
+        assert get_history_store(path) is get_history_store(path)
+
+
+class TestProcessorHistory:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "STALE_ITEM_DAYS": "5",
+            }
+        )
+        self.store = HistoryStore()
+
+    def teardown_method(self) -> None:
+        self.store.close()
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_process_records_snapshot_and_highlights_stale_items(
+        self, mock_notion_client_class: Mock
+    ) -> None:
+        today = date.today()
+        for days in (6, 3):
+            self.store.record_snapshot(
+                [MILK], run_date=today - timedelta(days=days), database_id="test_database_id"
+            )
+        # 同じファイルの別のデータベースの履歴は影響しない
+        self.store.record_snapshot([BREAD], run_date=today - timedelta(days=6), database_id="other")
+
+        mock_client = mock_notion_client_class.return_value
+        mock_client.query_unchecked_items.return_value = [MILK, BREAD]
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        result = ShoppingReminderProcessor(self.config, history_store=self.store).process()
+
+        assert result.success is True
+        mock_client.create_comment.assert_called_once_with([MILK, BREAD], stale_items={"1": 6})
+        assert self.store.item_ages(database_id="test_database_id") == {"1": 6, "2": 0}
+        assert self.store.item_ages(database_id="other") == {"2": 0}
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_process_continues_when_history_fails(self, mock_notion_client_class: Mock) -> None:
+        self.store.close()  # 閉じた接続への書き込みは sqlite3.Error になる
+
+        mock_client = mock_notion_client_class.return_value
+        mock_client.query_unchecked_items.return_value = [MILK]
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        result = ShoppingReminderProcessor(self.config, history_store=self.store).process()
+
+        assert result.success is True
+        mock_client.create_comment.assert_called_once_with([MILK])
+
+    def test_processor_opens_store_from_config(self, tmp_path) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "HISTORY_DB_PATH": str(tmp_path / "history.db"),
+            }
+        )
+        processor = ShoppingReminderProcessor(config)
+        # lambda_handler はLambda環境と同じくフラットなモジュール名で import している
+        assert processor.history_store is history_store.get_history_store(config.history_db_path)
+
+    def test_comment_message_marks_stale_items(self) -> None:
+        processor = ShoppingReminderProcessor(self.config)
+        message = processor.notion_client.format_comment_message([MILK, BREAD], {"1": 6})
+
+        assert "• ⚠️ 牛乳（6日間未チェック）" in message
+        assert "• パン\n" in message
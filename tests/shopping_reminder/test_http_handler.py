@@ -0,0 +1,219 @@
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import Mock, patch
+from wsgiref.util import setup_testing_defaults
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.http_handler import (
+    ItemsCache,
+    ItemsEndpoint,
+    etag_matches,
+    loggable_event,
+    make_wsgi_app,
+)
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.models import OmittedItems, ShoppingItem
+
+# http_handler・lambda_handler はフラットなモジュール名で import しているため、同じものを使う
+from http_handler import get_items_cache
+from notion_client import NotionAPIError
+
+TOKEN = "family-token"
+
+
+def _event(
+    method: str = "GET", path: str = "/items", headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """関数 URL（ペイロード 2.0）が渡す GET リクエストのイベント"""
+    return {
+        "version": "2.0",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"authorization": f"Bearer {TOKEN}", **(headers or {})},
+        "requestContext": {"http": {"method": method, "path": path}},
+        "isBase64Encoded": False,
+    }
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestItemsEndpoint:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "ITEMS_ACCESS_TOKEN": TOKEN,
+                "ITEMS_CACHE_TTL_SECONDS": "30",
+            }
+        )
+        self.clock = FakeClock()
+        self.items: List[ShoppingItem] = [
+            ShoppingItem("1", "牛乳", False),
+            ShoppingItem("2", "パン", False),
+        ]
+        self.omitted: Optional[OmittedItems] = None
+        self.queries = 0
+        self.endpoint = ItemsEndpoint(self.config, self._query, ItemsCache(clock=self.clock))
+
+    def _query(self) -> Tuple[List[ShoppingItem], Optional[OmittedItems]]:
+        self.queries += 1
+        return list(self.items), self.omitted
+
+    def test_returns_items_with_etag(self) -> None:
+        response = self.endpoint.handle(_event())
+
+        assert response.status == 200
+        assert json.loads(response.body) == {
+            "count": 2,
+            "items": [{"id": "1", "name": "牛乳"}, {"id": "2", "name": "パン"}],
+        }
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+    def test_if_none_match_returns_304_from_cache(self) -> None:
+        etag = self.endpoint.handle(_event()).headers["ETag"]
+
+        response = self.endpoint.handle(_event(headers={"if-none-match": etag}))
+
+        assert (response.status, response.body, response.headers["ETag"]) == (304, b"", etag)
+        assert self.queries == 1
+
+    def test_requeries_after_ttl_and_keeps_etag_when_unchanged(self) -> None:
+        etag = self.endpoint.handle(_event()).headers["ETag"]
+        self.clock.now += 30
+
+        response = self.endpoint.handle(_event(headers={"if-none-match": etag}))
+
+        assert response.status == 304
+        assert self.queries == 2
+
+    def test_changed_items_get_new_etag(self) -> None:
+        etag = self.endpoint.handle(_event()).headers["ETag"]
+        self.items.append(ShoppingItem("3", "卵", False))
+        self.omitted = OmittedItems(count=4, lower_bound=True)
+        self.clock.now += 30
+
+        response = self.endpoint.handle(_event(headers={"if-none-match": etag}))
+
+        assert response.status == 200
+        assert response.headers["ETag"] != etag
+        body = json.loads(response.body)
+        assert body["count"] == 7
+        assert body["omitted"] == {"count": 4, "lower_bound": True}
+
+    def test_head_returns_headers_only(self) -> None:
+        response = self.endpoint.handle(_event(method="HEAD"))
+        assert (response.status, response.body) == (200, b"")
+        assert "ETag" in response.headers
+
+    def test_serves_stale_response_when_query_fails(self) -> None:
+        first = self.endpoint.handle(_event())
+        self.clock.now += 60
+        self.endpoint.query = Mock(side_effect=NotionAPIError("HTTP error 503"))
+
+        response = self.endpoint.handle(_event())
+
+        assert (response.status, response.body) == (200, first.body)
+
+    def test_query_failure_without_cache(self) -> None:
+        self.endpoint.query = Mock(side_effect=NotionAPIError("HTTP error 503"))
+        assert self.endpoint.handle(_event()).status == 502
+
+    def test_rejects_invalid_token(self) -> None:
+        response = self.endpoint.handle(_event(headers={"authorization": "Bearer wrong"}))
+        assert response.status == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+        assert self.queries == 0
+
+    def test_token_not_configured(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        endpoint = ItemsEndpoint(config, self._query, ItemsCache())
+        assert endpoint.handle(_event()).status == 403
+
+    def test_unknown_path(self) -> None:
+        assert self.endpoint.handle(_event(path="/favicon.ico")).status == 404
+
+
+class TestHelpers:
+    def test_etag_matches(self) -> None:
+        assert etag_matches('"a", "b"', '"b"') is True
+        assert etag_matches('W/"b"', '"b"') is True
+        assert etag_matches("*", '"b"') is True
+        assert etag_matches('"a"', '"b"') is False
+        assert etag_matches(None, '"b"') is False
+
+    def test_loggable_event_redacts_authorization(self) -> None:
+        event = _event()
+        logged = loggable_event(event)
+        assert logged["headers"]["authorization"] == "***REDACTED***"
+        assert event["headers"]["authorization"] == f"Bearer {TOKEN}"
+
+
+class TestHandlerRouting:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        get_items_cache().reset()
+
+    def teardown_method(self) -> None:
+        get_items_cache().reset()
+
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    def test_get_returns_items_without_commenting(
+        self, mock_processor_class: Mock, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_test_key")
+        monkeypatch.setenv("NOTION_DATABASE_ID", "test_database_id")
+        monkeypatch.setenv("NOTION_PAGE_ID", "test_page_id")
+        monkeypatch.setenv("ITEMS_ACCESS_TOKEN", TOKEN)
+        processor = mock_processor_class.return_value
+        processor.query_items.return_value = ([ShoppingItem("1", "牛乳", False)], None)
+
+        response = handler(_event(), None)
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["items"] == [{"id": "1", "name": "牛乳"}]
+        processor.process.assert_not_called()
+
+    def test_wsgi_app_passes_function_url_event(self) -> None:
+        events: List[Dict[str, Any]] = []
+
+        def fake_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            events.append(event)
+            return {"statusCode": 304, "headers": {"ETag": '"x"'}, "body": ""}
+
+        environ: Dict[str, Any] = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/webhook",
+            "HTTP_X_NOTION_SIGNATURE": "sha256=abc",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": "2",
+            "wsgi.input": io.BytesIO(b"{}"),
+        }
+        setup_testing_defaults(environ)
+        start_response = Mock()
+
+        body = make_wsgi_app(fake_handler)(environ, start_response)
+
+        assert list(body) == [b""]
+        start_response.assert_called_once_with("304 Not Modified", [("ETag", '"x"')])
+        event = events[0]
+        assert event["requestContext"]["http"]["method"] == "POST"
+        assert event["rawPath"] == "/webhook"
+        assert event["headers"]["x-notion-signature"] == "sha256=abc"
+        assert event["body"] == "{}"
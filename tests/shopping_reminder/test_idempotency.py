@@ -0,0 +1,210 @@
+import json
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.idempotency import (
+    COMPLETED,
+    IN_PROGRESS,
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+    idempotency_key,
+)
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.models import DestinationResult, NotificationResult
+
+SCHEDULED_EVENT = {
+    "id": "cdc73f9d-aea9-11e3-9d5a-835b769c0d9c",
+    "detail-type": "Scheduled Event",
+    "source": "aws.events",
+    "time": "2025-01-01T08:00:00Z",
+}
+
+RESPONSE = {"statusCode": 200, "body": '{"success": true}'}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _config(**settings: str) -> Config:
+    return Config.from_dict(
+        {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+            **settings,
+        }
+    )
+
+
+class TestIdempotencyStore:
+    @pytest.fixture(params=["memory", "sqlite"])
+    def store(self, request: pytest.FixtureRequest) -> Iterator[IdempotencyStore]:
+        self.clock = FakeClock()
+        if request.param == "memory":
+            yield InMemoryIdempotencyStore(clock=self.clock)
+        else:
+            store = SQLiteIdempotencyStore(clock=self.clock)
+            yield store
+            store.close()
+
+    def test_begin_then_complete(self, store: IdempotencyStore) -> None:
+        assert store.begin("event-1", lease_seconds=60) is None
+
+        in_progress = store.begin("event-1", lease_seconds=60)
+        assert in_progress is not None
+        assert in_progress.status == IN_PROGRESS
+
+        store.complete("event-1", RESPONSE)
+        completed = store.begin("event-1", lease_seconds=60)
+        assert completed is not None
+        assert completed.status == COMPLETED
+        assert completed.response == RESPONSE
+
+    def test_release_allows_retry(self, store: IdempotencyStore) -> None:
+        assert store.begin("event-1", lease_seconds=60) is None
+        store.release("event-1")
+        assert store.begin("event-1", lease_seconds=60) is None
+
+    def test_release_keeps_completed_record(self, store: IdempotencyStore) -> None:
+        store.begin("event-1", lease_seconds=60)
+        store.complete("event-1", RESPONSE)
+        store.release("event-1")
+        record = store.begin("event-1", lease_seconds=60)
+        assert record is not None
+        assert record.status == COMPLETED
+
+    def test_expired_lease_can_be_taken_over(self, store: IdempotencyStore) -> None:
+        assert store.begin("event-1", lease_seconds=60) is None
+        self.clock.now += 61
+        assert store.begin("event-1", lease_seconds=60) is None
+
+    def test_completed_record_expires(self, store: IdempotencyStore) -> None:
+        store.begin("event-1", lease_seconds=60)
+        store.complete("event-1", RESPONSE, retention_seconds=3600)
+        self.clock.now += 3601
+        assert store.begin("event-1", lease_seconds=60) is None
+
+
+class TestIdempotencyKey:
+    def test_key_uses_event_id_and_target(self) -> None:
+        key = idempotency_key(SCHEDULED_EVENT, _config())
+        assert key is not None
+        assert key.startswith(f"{SCHEDULED_EVENT['id']}:")
+        assert idempotency_key(SCHEDULED_EVENT, _config()) == key
+        assert idempotency_key(SCHEDULED_EVENT, _config(NOTION_PAGE_ID="other_page")) != key
+
+    def test_key_falls_back_to_time(self) -> None:
+        key = idempotency_key({"time": "2025-01-01T08:00:00Z"}, _config())
+        assert key is not None
+        assert key.startswith("2025-01-01T08:00:00Z:")
+
+    def test_no_key_without_id_or_time(self) -> None:
+        assert idempotency_key({}, _config()) is None
+
+
+class TestIdempotentHandler:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.processor = Mock()
+        self.processor.process.return_value = NotificationResult(success=True, message="ok")
+
+    def _invoke(self, config: Config, event: dict) -> dict:
+        with (
+            patch("src.shopping_reminder.lambda_handler.Config", return_value=config),
+            patch(
+                "src.shopping_reminder.lambda_handler.ShoppingReminderProcessor",
+                return_value=self.processor,
+            ),
+        ):
+            return handler(event, None)
+
+    def test_retried_event_returns_recorded_response(self, tmp_path) -> None:
+        config = _config(IDEMPOTENCY_DB_PATH=str(tmp_path / "idempotency.db"))
+
+        first = self._invoke(config, SCHEDULED_EVENT)
+        second = self._invoke(config, SCHEDULED_EVENT)
+
+        assert first["statusCode"] == 200
+        assert second == first
+        self.processor.process.assert_called_once()
+
+    def test_failed_event_is_processed_again(self, tmp_path) -> None:
+        config = _config(IDEMPOTENCY_DB_PATH=str(tmp_path / "idempotency.db"))
+        self.processor.process.side_effect = [
+            NotificationResult(success=False, message="failed", error="HTTP error 502"),
+            NotificationResult(success=True, message="ok"),
+        ]
+
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 500
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 200
+        assert self.processor.process.call_count == 2
+
+    def test_retry_after_partial_failure_posts_only_to_failed_pages(self, tmp_path) -> None:
+        config = _config(
+            IDEMPOTENCY_DB_PATH=str(tmp_path / "idempotency.db"), NOTION_PAGE_IDS="page-2"
+        )
+        self.processor.process.side_effect = [
+            NotificationResult(
+                success=False,
+                message="failed",
+                error="page-2: HTTP error 502",
+                destinations=[
+                    DestinationResult("test_page_id", True),
+                    DestinationResult("page-2", False, "HTTP error 502"),
+                ],
+            ),
+            NotificationResult(
+                success=True, message="ok", destinations=[DestinationResult("page-2", True)]
+            ),
+        ]
+
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 500
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 200
+        # 投稿済みのページには再試行でコメントしない
+        assert [call.args[0] for call in self.processor.process.call_args_list] == [
+            ["test_page_id", "page-2"],
+            ["page-2"],
+        ]
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 200
+        assert self.processor.process.call_count == 2
+
+    def test_exception_releases_pages_for_retry(self, tmp_path) -> None:
+        config = _config(IDEMPOTENCY_DB_PATH=str(tmp_path / "idempotency.db"))
+        self.processor.process.side_effect = [
+            RuntimeError("boom"),
+            NotificationResult(success=True, message="ok"),
+        ]
+
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 500
+        assert self._invoke(config, SCHEDULED_EVENT)["statusCode"] == 200
+        assert self.processor.process.call_args.args[0] == ["test_page_id"]
+
+    def test_event_in_progress_is_skipped(self, tmp_path) -> None:
+        path = str(tmp_path / "idempotency.db")
+        config = _config(IDEMPOTENCY_DB_PATH=path)
+        key = idempotency_key(SCHEDULED_EVENT, config)
+        assert key is not None
+        other = SQLiteIdempotencyStore(path)
+        other.begin(key, lease_seconds=600)
+
+        response = self._invoke(config, SCHEDULED_EVENT)
+        other.close()
+
+        assert response["statusCode"] == 409
+        assert json.loads(response["body"])["success"] is False
+        self.processor.process.assert_not_called()
+
+    def test_events_without_id_are_always_processed(self) -> None:
+        config = _config()
+        self._invoke(config, {})
+        self._invoke(config, {})
+        assert self.processor.process.call_count == 2
@@ -0,0 +1,175 @@
+from unittest.mock import Mock, patch
+
+import item_state
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.item_state import ItemState
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor
+from src.shopping_reminder.models import NotificationResult
+
+# ItemState はフラットなモジュール名の ShoppingItem を返すため、比較できるよう同じものを使う
+from models import ShoppingItem
+
+MILK = ShoppingItem("1", "牛乳", False)
+BREAD = ShoppingItem("2", "パン", False)
+EGGS = ShoppingItem("3", "卵", False)
+
+DAY = 24 * 60 * 60
+
+DATABASE_ID = "test_database_id"
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestItemState:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.state = ItemState(clock=self.clock)
+
+    def teardown_method(self) -> None:
+        self.state.close()
+
+    def test_empty_state_is_not_fresh(self) -> None:
+        assert self.state.synced_at() is None
+        assert self.state.is_fresh(DAY) is False
+        assert self.state.unchecked_items() == []
+
+    def test_replace_all_keeps_query_order(self) -> None:
+        self.state.replace_all([BREAD, MILK])
+        assert self.state.unchecked_items() == [BREAD, MILK]
+        assert self.state.is_fresh(DAY) is True
+
+        self.clock.now += DAY
+        assert self.state.is_fresh(DAY) is False
+
+    def test_apply_page_appends_and_updates(self) -> None:
+        self.state.replace_all([MILK])
+        assert self.state.apply_page(EGGS, "2025-01-01T00:00:00.000Z") is True
+        assert self.state.unchecked_items() == [MILK, EGGS]
+
+        checked = ShoppingItem("1", "牛乳", True)
+        assert self.state.apply_page(checked, "2025-01-01T00:01:00.000Z") is True
+        assert self.state.unchecked_items() == [EGGS]
+
+    def test_outdated_update_is_ignored(self) -> None:
+        self.state.apply_page(ShoppingItem("1", "牛乳", True), "2025-01-02T00:00:00.000Z")
+        # 再送などで古いイベントの取得結果が後から届いた場合
+        assert self.state.apply_page(MILK, "2025-01-01T00:00:00.000Z") is False
+        assert self.state.unchecked_items() == []
+
+    def test_remove_page(self) -> None:
+        self.state.replace_all([MILK, BREAD])
+        assert self.state.remove_page("1") is True
+        assert self.state.remove_page("1") is False
+        assert self.state.unchecked_items() == [BREAD]
+
+    def test_persists_to_file(self, tmp_path) -> None:
+        path = str(tmp_path / "state.db")
+        state = ItemState(path, clock=self.clock)
+        state.replace_all([MILK])
+        state.close()
+
+        reopened = ItemState(path, clock=self.clock)
+        assert reopened.unchecked_items() == [MILK]
+        assert reopened.synced_at() == self.clock.now
+        reopened.close()
+
+    def test_databases_sharing_a_file_are_kept_apart(self, tmp_path) -> None:
+        path = str(tmp_path / "state.db")
+        state = ItemState(path, clock=self.clock)
+        state.replace_all([MILK], database_id="home")
+        state.replace_all([BREAD], database_id="office")
+        state.apply_page(EGGS, "2025-01-01T00:00:00.000Z", database_id="office")
+        state.remove_page("1", database_id="office")
+
+        assert state.unchecked_items("home") == [MILK]
+        assert state.unchecked_items("office") == [BREAD, EGGS]
+        assert state.is_fresh(DAY, "home") is True
+        assert state.is_fresh(DAY, "other") is False
+        state.close()
+
+
+class TestProcessorItemState:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.settings = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": DATABASE_ID,
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+        self.config = Config.from_dict(self.settings)
+        self.state = ItemState()
+
+    def teardown_method(self) -> None:
+        self.state.close()
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_first_run_syncs_state_with_full_query(self, mock_notion_client_class: Mock) -> None:
+        mock_client = mock_notion_client_class.return_value
+        mock_client.query_unchecked_items.return_value = [MILK, BREAD]
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        result = ShoppingReminderProcessor(self.config, item_state=self.state).process()
+
+        assert result.success is True
+        mock_client.query_unchecked_items.assert_called_once()
+        assert self.state.unchecked_items(DATABASE_ID) == [MILK, BREAD]
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_fresh_state_skips_query(self, mock_notion_client_class: Mock) -> None:
+        self.state.replace_all([MILK], DATABASE_ID)
+        self.state.apply_page(BREAD, "2025-01-01T00:00:00.000Z", DATABASE_ID)
+        mock_client = mock_notion_client_class.return_value
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        ShoppingReminderProcessor(self.config, item_state=self.state).process()
+
+        mock_client.query_unchecked_items.assert_not_called()
+        mock_client.query_top_unchecked_items.assert_not_called()
+        mock_client.create_comment.assert_called_once_with([MILK, BREAD])
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_fresh_state_is_truncated_in_top_n_mode(self, mock_notion_client_class: Mock) -> None:
+        config = Config.from_dict({**self.settings, "MAX_COMMENT_ITEMS": "2"})
+        self.state.replace_all([MILK, BREAD, EGGS], DATABASE_ID)
+        mock_client = mock_notion_client_class.return_value
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        ShoppingReminderProcessor(config, item_state=self.state).process()
+
+        mock_client.query_top_unchecked_items.assert_not_called()
+        items = mock_client.create_comment.call_args.args[0]
+        omitted = mock_client.create_comment.call_args.kwargs["omitted"]
+        assert items == [MILK, BREAD]
+        assert (omitted.count, omitted.lower_bound) == (1, False)
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_outdated_state_is_resynced(self, mock_notion_client_class: Mock) -> None:
+        clock = FakeClock()
+        state = ItemState(clock=clock)
+        state.replace_all([MILK], DATABASE_ID)
+        clock.now += self.config.item_state_max_age_days * DAY
+        mock_client = mock_notion_client_class.return_value
+        mock_client.query_unchecked_items.return_value = [BREAD]
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        ShoppingReminderProcessor(self.config, item_state=state).process()
+
+        mock_client.query_unchecked_items.assert_called_once()
+        assert state.unchecked_items(DATABASE_ID) == [BREAD]
+        assert state.is_fresh(DAY, DATABASE_ID) is True
+        state.close()
+
+    def test_processor_opens_state_from_config(self, tmp_path) -> None:
+        config = Config.from_dict(
+            {**self.settings, "ITEM_STATE_DB_PATH": str(tmp_path / "state.db")}
+        )
+        processor = ShoppingReminderProcessor(config)
+        # lambda_handler はLambda環境と同じくフラットなモジュール名で import している
+        assert processor.item_state is item_state.get_item_state(config.item_state_db_path)
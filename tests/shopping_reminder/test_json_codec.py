@@ -0,0 +1,47 @@
+import importlib.util
+import json
+import logging
+
+import pytest
+
+from src.shopping_reminder import json_codec
+from src.shopping_reminder.json_codec import LazyJSON
+
+
+class TestJsonCodec:
+    def test_dumps_returns_utf8_bytes(self) -> None:
+        encoded = json_codec.dumps({"name": "牛乳", "checked": False})
+
+        assert isinstance(encoded, bytes)
+        assert "牛乳".encode("utf-8") in encoded
+        assert json.loads(encoded) == {"name": "牛乳", "checked": False}
+
+    def test_dumps_str(self) -> None:
+        assert json.loads(json_codec.dumps_str({"a": [1, 2]})) == {"a": [1, 2]}
+
+    def test_loads_accepts_bytes_and_str(self) -> None:
+        assert json_codec.loads(b'{"a": 1}') == {"a": 1}
+        assert json_codec.loads('{"a": "\\u725b"}') == {"a": "牛"}
+
+    def test_decode_error_is_stdlib_exception(self) -> None:
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads(b"{invalid")
+
+    def test_control_characters_are_escaped(self) -> None:
+        # ページIDの差し込み位置の目印に使うため、NULはエスケープされる必要がある
+        assert json_codec.dumps("\x00") == b'"\\u0000"'
+
+    def test_backend_selection(self) -> None:
+        expected = "orjson" if importlib.util.find_spec("orjson") else "json"
+        assert json_codec.BACKEND == expected
+
+    def test_lazy_json_is_only_encoded_when_logged(self) -> None:
+        class Unserializable:
+            pass
+
+        logger = logging.getLogger("test_json_codec")
+        logger.setLevel(logging.INFO)
+        # DEBUG は出力されないため、エンコードできないオブジェクトでもエラーにならない
+        logger.debug("body: %s", LazyJSON(Unserializable()))
+
+        assert str(LazyJSON({"a": 1})) == '{"a":1}'
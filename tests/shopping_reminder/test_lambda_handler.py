@@ -3,7 +3,12 @@ from typing import Dict, Any
 from unittest.mock import Mock, patch
 
 from src.shopping_reminder.lambda_handler import handler, ShoppingReminderProcessor
-from src.shopping_reminder.models import ShoppingItem, NotificationResult
+from src.shopping_reminder.models import (
+    ShoppingItem,
+    NotificationResult,
+    DestinationResult,
+    OmittedItems,
+)
 from src.shopping_reminder.config import Config, ConfigError
 
 
@@ -93,6 +98,29 @@ class TestShoppingReminderProcessor:
         assert "コメントの作成に失敗しました" in result.message
         assert "API key が無効です" in result.error
 
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_process_top_n_mode(self, mock_notion_client_class: Mock) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "MAX_COMMENT_ITEMS": "2",
+            }
+        )
+        mock_client = mock_notion_client_class.return_value
+        items = [ShoppingItem("1", "牛乳", False), ShoppingItem("2", "パン", False)]
+        omitted = OmittedItems(count=98, lower_bound=True)
+        mock_client.query_top_unchecked_items.return_value = (items, omitted)
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+
+        result = ShoppingReminderProcessor(config).process()
+
+        assert result.success is True
+        mock_client.query_top_unchecked_items.assert_called_once_with(2)
+        mock_client.query_unchecked_items.assert_not_called()
+        mock_client.create_comment.assert_called_once_with(items, omitted=omitted)
+
 
 class TestLambdaHandler:
     @patch("src.shopping_reminder.lambda_handler.Config")
@@ -170,6 +198,32 @@ class TestLambdaHandler:
         assert "処理中にエラーが発生しました" in body["message"]
         assert "データベースクエリエラー" in body["error"]
 
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    def test_handler_reports_destinations(
+        self, mock_processor_class: Mock, mock_config_class: Mock
+    ) -> None:
+        mock_processor = Mock()
+        mock_processor_class.return_value = mock_processor
+        mock_processor.process.return_value = NotificationResult(
+            success=False,
+            message="2ページ中1ページへのコメントの作成に失敗しました。",
+            error="page-2: HTTP error 404",
+            destinations=[
+                DestinationResult(page_id="page-1", success=True),
+                DestinationResult(page_id="page-2", success=False, error="HTTP error 404"),
+            ],
+        )
+
+        response = handler({}, Mock())
+
+        assert response["statusCode"] == 500
+        body = json.loads(response["body"])
+        assert body["destinations"] == [
+            {"page_id": "page-1", "success": True, "error": None},
+            {"page_id": "page-2", "success": False, "error": "HTTP error 404"},
+        ]
+
     @patch("src.shopping_reminder.lambda_handler.Config")
     def test_handler_unexpected_error(self, mock_config_class: Mock) -> None:
         mock_config_class.side_effect = Exception("予期しないエラー")
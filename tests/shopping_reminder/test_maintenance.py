@@ -0,0 +1,243 @@
+import io
+import json
+import threading
+import time
+import urllib.error
+from datetime import datetime, timedelta, timezone
+from email.message import Message
+from typing import Any, Dict, List, Set
+from unittest.mock import Mock, patch
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.maintenance import ArchiveResult, RateLimiter
+from src.shopping_reminder.notion_client import NotionClient
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+
+NOW = datetime.now(timezone.utc)
+
+
+def _page(index: int, checked: bool, age_days: int) -> Dict[str, Any]:
+    edited = (NOW - timedelta(days=age_days)).isoformat()
+    return {
+        "id": f"page-{index:04d}",
+        "created_time": edited,
+        "last_edited_time": edited,
+        "properties": {
+            "名前": {"title": [{"text": {"content": f"項目{index}"}}]},
+            "完了": {"checkbox": checked},
+        },
+    }
+
+
+class FakeArchiveTransport(Transport):
+    """完了・最終編集日時での絞り込み、ページIDのカーソル、アーカイブを再現するデータベース"""
+
+    def __init__(self, pages: List[Dict[str, Any]], latency: float = 0.0) -> None:
+        self.pages = pages
+        self.latency = latency
+        self.archived: List[str] = []
+        self.rate_limited: Set[str] = set()
+        self.failing: Set[str] = set()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        if request.method == "PATCH":
+            return self._archive(request)
+        body = json.loads(request.body)
+        before = body["filter"]["and"][1]["last_edited_time"]["before"]
+        with self._lock:
+            matched = [
+                page
+                for page in self.pages
+                if page["id"] not in self.archived
+                and page["properties"]["完了"]["checkbox"]
+                and datetime.fromisoformat(page["last_edited_time"])
+                < datetime.fromisoformat(before)
+            ]
+        ids = [page["id"] for page in matched]
+        start = ids.index(body["start_cursor"]) if body.get("start_cursor") else 0
+        end = start + body["page_size"]
+        has_more = end < len(matched)
+        payload = {
+            "results": matched[start:end],
+            "has_more": has_more,
+            # Notion と同じく、カーソルは次のページの先頭の項目のID
+            "next_cursor": matched[end]["id"] if has_more else None,
+        }
+        return TransportResponse(status=200, body=json.dumps(payload).encode())
+
+    def _archive(self, request: TransportRequest) -> TransportResponse:
+        page_id = request.url.rsplit("/", 1)[1]
+        assert json.loads(request.body) == {"archived": True}
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.latency)
+            with self._lock:
+                if page_id in self.rate_limited:
+                    self.rate_limited.discard(page_id)
+                    raise _http_error(request.url, 429, {"Retry-After": "0"})
+                if page_id in self.failing:
+                    raise _http_error(request.url, 404, {})
+                self.archived.append(page_id)
+            return TransportResponse(status=200, body=b'{"object": "page", "archived": true}')
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def _http_error(url: str, code: int, headers: Dict[str, str]) -> urllib.error.HTTPError:
+    message = Message()
+    for name, value in headers.items():
+        message[name] = value
+    return urllib.error.HTTPError(url, code, "error", message, io.BytesIO(b'{"object": "error"}'))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter:
+    def test_burst_then_steady_rate(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_per_second=3.0, burst=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(6):
+            limiter.acquire()
+
+        # 最初の3件は待たずに、その後は1/3秒ごとに送信できる
+        assert len(clock.sleeps) == 3
+        assert abs(clock.now - 1.0) < 1e-9
+
+
+class TestArchiveCompletedItems:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        # 古い完了済み250件、最近の完了済み5件、古い未チェック5件
+        self.pages = (
+            [_page(i, checked=True, age_days=60) for i in range(250)]
+            + [_page(300 + i, checked=True, age_days=1) for i in range(5)]
+            + [_page(400 + i, checked=False, age_days=60) for i in range(5)]
+        )
+        self.limiter = RateLimiter(rate_per_second=10_000, burst=10_000)
+
+    def test_dry_run_counts_without_archiving(self) -> None:
+        transport = FakeArchiveTransport(self.pages)
+        client = NotionClient(self.config, transport=transport)
+
+        result = client.archive_completed_items(30, dry_run=True, rate_limiter=self.limiter)
+
+        assert (result.dry_run, result.matched, result.archived) == (True, 250, 0)
+        assert transport.archived == []
+
+    def test_archives_old_completed_items_across_pages(self) -> None:
+        transport = FakeArchiveTransport(self.pages, latency=0.002)
+        client = NotionClient(self.config, transport=transport)
+        checkpoints: List[ArchiveResult] = []
+
+        result = client.archive_completed_items(
+            30, max_workers=4, rate_limiter=self.limiter, on_checkpoint=checkpoints.append
+        )
+
+        assert (result.matched, result.archived, result.failed, result.complete) == (
+            250,
+            250,
+            0,
+            True,
+        )
+        assert sorted(transport.archived) == [f"page-{i:04d}" for i in range(250)]
+        assert [checkpoint.archived for checkpoint in checkpoints] == [100, 200, 250]
+        assert 1 < transport.max_in_flight <= 4
+
+    def test_rate_limited_requests_are_retried_and_failures_reported(self) -> None:
+        transport = FakeArchiveTransport(self.pages[:10])
+        transport.rate_limited = {"page-0001"}
+        transport.failing = {"page-0002"}
+        client = NotionClient(self.config, transport=transport)
+
+        result = client.archive_completed_items(30, rate_limiter=self.limiter)
+
+        assert (result.archived, result.failed, result.failed_ids) == (9, 1, ["page-0002"])
+        assert "page-0001" in transport.archived
+
+    def test_stops_at_checkpoint(self) -> None:
+        transport = FakeArchiveTransport(self.pages)
+        client = NotionClient(self.config, transport=transport)
+
+        result = client.archive_completed_items(
+            30, rate_limiter=self.limiter, should_stop=lambda: True
+        )
+
+        assert (result.archived, result.complete) == (100, False)
+
+    def test_uses_shared_rate_limiter(self) -> None:
+        limiter = Mock(spec=RateLimiter)
+        transport = FakeArchiveTransport(self.pages[:3])
+        client = NotionClient(self.config, transport=transport)
+
+        with patch(
+            "src.shopping_reminder.notion_client.get_rate_limiter", return_value=limiter
+        ) as get_limiter:
+            client.archive_completed_items(30)
+
+        get_limiter.assert_called_once_with("secret_test_key")
+        assert limiter.acquire.call_count == 3
+
+
+class TestArchiveEvent:
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    def test_handler_runs_archive(self, mock_config_class: Mock, mock_client_class: Mock) -> None:
+        mock_client = mock_client_class.return_value
+        mock_client.archive_completed_items.return_value = ArchiveResult(dry_run=True, matched=42)
+        context = Mock()
+        context.get_remaining_time_in_millis.return_value = 30_000
+
+        response = handler(
+            {"maintenance": "archive_completed", "older_than_days": 14, "dry_run": True}, context
+        )
+
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert (body["success"], body["matched"], body["dry_run"]) == (True, 42, True)
+        args, kwargs = mock_client.archive_completed_items.call_args
+        assert args == (14,)
+        assert kwargs["dry_run"] is True
+        # 残り時間が余裕（60秒）より少ないため、最初のページの後で打ち切る
+        assert kwargs["should_stop"]() is True
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    def test_handler_reports_failures(
+        self, mock_config_class: Mock, mock_client_class: Mock
+    ) -> None:
+        mock_client_class.return_value.archive_completed_items.return_value = ArchiveResult(
+            matched=2, archived=1, failed=1, failed_ids=["page-1"]
+        )
+
+        response = handler({"maintenance": "archive_completed"}, None)
+
+        assert response["statusCode"] == 500
+        body = json.loads(response["body"])
+        assert body["failed_ids"] == ["page-1"]
+        assert mock_client_class.return_value.archive_completed_items.call_args.args == (30,)
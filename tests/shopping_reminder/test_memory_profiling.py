@@ -0,0 +1,132 @@
+import json
+import os
+import tracemalloc
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.memory_profiling import (
+    MemoryProfiler,
+    activate_profiler,
+    is_profiling_requested,
+    profile_phase,
+)
+
+
+def _allocate(size: int) -> bytes:
+    return b"x" * size
+
+
+class TestMemoryProfiler:
+    def test_phase_without_active_profiler_is_noop(self) -> None:
+        with profile_phase("query"):
+            data = _allocate(1000)
+        assert len(data) == 1000
+
+    def test_records_peak_and_allocation_sites(self) -> None:
+        profiler = MemoryProfiler()
+        with activate_profiler(profiler):
+            with profile_phase("render"):
+                kept = _allocate(200_000)
+
+        report = profiler.report()
+        phase = report["phases"][0]
+        assert phase["name"] == "render"
+        assert phase["calls"] == 1
+        assert phase["peak_bytes"] >= 200_000
+        assert phase["allocated_bytes"] >= 200_000
+        assert any("test_memory_profiling.py" in site["site"] for site in phase["top_allocations"])
+        assert report["peak_bytes"] >= phase["peak_bytes"]
+        assert not tracemalloc.is_tracing()
+        del kept
+
+    def test_nested_peak_is_propagated_to_outer_phase(self) -> None:
+        profiler = MemoryProfiler()
+        with activate_profiler(profiler):
+            with profile_phase("query"):
+                with profile_phase("decode"):
+                    transient = _allocate(500_000)
+                    del transient
+
+        phases = {phase.name: phase for phase in profiler.phases.values()}
+        assert phases["decode"].peak_bytes >= 500_000
+        assert phases["query"].peak_bytes >= phases["decode"].peak_bytes
+
+    def test_repeated_phase_is_aggregated(self) -> None:
+        profiler = MemoryProfiler()
+        with activate_profiler(profiler):
+            for size in (10_000, 300_000, 20_000):
+                with profile_phase("decode"):
+                    _allocate(size)
+
+        assert profiler.phases["decode"].calls == 3
+        assert profiler.phases["decode"].peak_bytes >= 300_000
+
+    def test_is_profiling_requested(self) -> None:
+        with patch.dict(os.environ, {"MEMORY_PROFILING": ""}):
+            assert is_profiling_requested({}) is False
+            assert is_profiling_requested({"memory_profiling": True}) is True
+        with patch.dict(os.environ, {"MEMORY_PROFILING": "true"}):
+            assert is_profiling_requested(None) is True
+
+
+class TestHandlerMemoryProfiling:
+    def _responses(self) -> List[Mock]:
+        query: Dict[str, Any] = {
+            "results": [
+                {
+                    "id": f"item{i}",
+                    "properties": {
+                        "名前": {"title": [{"text": {"content": f"商品{i}"}}]},
+                        "完了": {"checkbox": False},
+                    },
+                }
+                for i in range(50)
+            ],
+            "has_more": False,
+        }
+        responses = []
+        for data in (query, {"id": "comment"}):
+            response = Mock()
+            response.read.return_value = json.dumps(data).encode("utf-8")
+            response.getcode.return_value = 200
+            context = Mock()
+            context.__enter__ = Mock(return_value=response)
+            context.__exit__ = Mock(return_value=False)
+            responses.append(context)
+        return responses
+
+    @patch("urllib.request.urlopen")
+    def test_handler_reports_memory_profile_when_requested(self, mock_urlopen: Mock) -> None:
+        mock_urlopen.side_effect = self._responses()
+        env = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+        with patch.dict(os.environ, env):
+            response = handler({"memory_profiling": True}, None)
+
+        assert response["statusCode"] == 200
+        profile = json.loads(response["body"])["memory_profile"]
+        assert {phase["name"] for phase in profile["phases"]} == {
+            "query",
+            "decode",
+            "render",
+            "post",
+        }
+        assert profile["peak_bytes"] > 0
+
+    @patch("urllib.request.urlopen")
+    def test_handler_omits_memory_profile_by_default(self, mock_urlopen: Mock) -> None:
+        mock_urlopen.side_effect = self._responses()
+        env = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+            "MEMORY_PROFILING": "",
+        }
+        with patch.dict(os.environ, env):
+            response = handler({}, None)
+
+        assert "memory_profile" not in json.loads(response["body"])
@@ -0,0 +1,199 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+from unittest.mock import patch
+
+from src.shopping_reminder.async_notion_client import AsyncNotionClient, AsyncRateLimiter
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor
+from src.shopping_reminder.models import NotificationResult, ShoppingItem
+from src.shopping_reminder.notification_dispatcher import NotificationDispatcher
+from tests.shopping_reminder.test_async_notion_client import (
+    FakeNotionServer,
+    Response,
+    _item,
+    _json_response,
+)
+
+
+class TestNotificationDispatcher:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "page-1",
+                "NOTION_PAGE_IDS": "page-2,page-3",
+            }
+        )
+        self.items = [ShoppingItem("1", "牛乳", False), ShoppingItem("2", "パン", False)]
+
+    def _dispatch(
+        self, handler: Any, max_concurrency: int = 5
+    ) -> Tuple[NotificationResult, FakeNotionServer]:
+        async def run() -> Tuple[NotificationResult, FakeNotionServer]:
+            async with FakeNotionServer(handler) as server:
+                async with AsyncNotionClient(
+                    self.config,
+                    base_url=server.base_url,
+                    rate_limiter=AsyncRateLimiter(rate_per_second=1000, burst=1000),
+                ) as client:
+                    dispatcher = NotificationDispatcher(client, max_concurrency=max_concurrency)
+                    result = await dispatcher.dispatch(self.items, self.config.notion_page_ids)
+                return result, server
+
+        return asyncio.run(run())
+
+    def test_dispatch_posts_same_message_to_every_page(self) -> None:
+        result, server = self._dispatch(lambda request: _json_response({"id": "c"}))
+
+        assert result.success is True
+        assert "2件の未チェック項目について3ページに通知を送信しました" in result.message
+        assert [d.page_id for d in result.destinations] == ["page-1", "page-2", "page-3"]
+        assert all(d.success for d in result.destinations)
+
+        bodies = [json.loads(request["body"]) for request in server.requests]
+        assert sorted(body["parent"]["page_id"] for body in bodies) == [
+            "page-1",
+            "page-2",
+            "page-3",
+        ]
+        assert len({json.dumps(body["rich_text"]) for body in bodies}) == 1
+        assert "• 牛乳" in bodies[0]["rich_text"][0]["text"]["content"]
+
+    def test_dispatch_reports_per_destination_failures(self) -> None:
+        def handler(request: Dict[str, Any]) -> Optional[Response]:
+            if json.loads(request["body"])["parent"]["page_id"] == "page-2":
+                return _json_response({"message": "Could not find page"}, status=404)
+            return _json_response({"id": "c"})
+
+        result, _ = self._dispatch(handler)
+
+        assert result.success is False
+        assert "3ページ中1ページへのコメントの作成に失敗しました" in result.message
+        assert "page-2" in result.error
+        failed = [d for d in result.destinations if not d.success]
+        assert [d.page_id for d in failed] == ["page-2"]
+        assert "404" in failed[0].error
+
+    def test_dispatch_respects_concurrency_limit(self) -> None:
+        result, server = self._dispatch(
+            lambda request: _json_response({"id": "c"}), max_concurrency=1
+        )
+
+        assert result.success is True
+        assert server.connections == 1
+
+    def test_dispatch_empty_items(self) -> None:
+        self.items = []
+        result, server = self._dispatch(lambda request: _json_response({"id": "c"}))
+
+        assert result.success is True
+        assert "未チェック項目はありません" in result.message
+        assert server.requests == []
+
+    def test_page_id_is_json_escaped(self) -> None:
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": 'page-"quoted"',
+            }
+        )
+        result, server = self._dispatch(lambda request: _json_response({"id": "c"}))
+
+        assert result.success is True
+        assert json.loads(server.requests[0]["body"])["parent"]["page_id"] == 'page-"quoted"'
+
+
+class TestProcessorFanOut:
+    def test_process_dispatches_to_multiple_pages(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "page-1",
+                "NOTION_PAGE_IDS": ["page-2"],
+            }
+        )
+
+        def handler(request: Dict[str, Any]) -> Optional[Response]:
+            if request["path"].endswith("/query"):
+                return _json_response({"results": [_item("item1", "牛乳")], "has_more": False})
+            return _json_response({"id": "c"})
+
+        async def run() -> NotificationResult:
+            async with FakeNotionServer(handler) as server:
+
+                def client_factory(config: Config) -> AsyncNotionClient:
+                    return AsyncNotionClient(config, base_url=server.base_url)
+
+                with patch(
+                    "src.shopping_reminder.lambda_handler.AsyncNotionClient", client_factory
+                ):
+                    return await ShoppingReminderProcessor(config).process_async()
+
+        result = asyncio.run(run())
+
+        assert result.success is True
+        assert [d.page_id for d in result.destinations] == ["page-1", "page-2"]
+
+    def test_sync_process_dispatches_to_multiple_pages(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "page-1",
+                "NOTION_PAGE_IDS": "page-2",
+            }
+        )
+        dispatched = NotificationResult(success=True, message="送信しました。")
+
+        with (
+            patch("src.shopping_reminder.lambda_handler.NotionClient") as mock_client_class,
+            patch.object(
+                ShoppingReminderProcessor, "_dispatch_async", return_value=dispatched
+            ) as mock_dispatch,
+        ):
+            mock_client_class.return_value.query_unchecked_items.return_value = [
+                ShoppingItem("1", "牛乳", False)
+            ]
+            result = ShoppingReminderProcessor(config).process()
+
+        assert result is dispatched
+        mock_dispatch.assert_called_once_with(
+            [ShoppingItem("1", "牛乳", False)], page_ids=["page-1", "page-2"]
+        )
+        mock_client_class.return_value.create_comment.assert_not_called()
+
+    def test_sync_process_inside_running_event_loop(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "page-1",
+                "NOTION_PAGE_IDS": "page-2",
+            }
+        )
+        dispatched = NotificationResult(success=True, message="送信しました。")
+
+        async def dispatch_async(
+            self: ShoppingReminderProcessor, items: Any, **options: Any
+        ) -> NotificationResult:
+            return dispatched
+
+        async def run() -> NotificationResult:
+            # イベントループの中から同期版の process を呼び出しても asyncio.run の例外にならない
+            return ShoppingReminderProcessor(config).process()
+
+        with (
+            patch("src.shopping_reminder.lambda_handler.NotionClient") as mock_client_class,
+            patch.object(ShoppingReminderProcessor, "_dispatch_async", dispatch_async),
+        ):
+            mock_client_class.return_value.query_unchecked_items.return_value = [
+                ShoppingItem("1", "牛乳", False)
+            ]
+            result = asyncio.run(run())
+
+        assert result is dispatched
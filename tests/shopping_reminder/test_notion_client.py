@@ -1,11 +1,84 @@
 import json
-from typing import List
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
 from unittest.mock import Mock, patch
 import pytest
 
 from src.shopping_reminder.notion_client import NotionClient, NotionAPIError
-from src.shopping_reminder.models import ShoppingItem
+from src.shopping_reminder.models import OmittedItems, ShoppingItem
 from src.shopping_reminder.config import Config
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+from src.shopping_reminder.maintenance import RateLimiter
+from tests.shopping_reminder.test_maintenance import _http_error
+
+
+class FakeDatabaseTransport(Transport):
+    """フィルター・並べ替え・ページングを簡易的に再現するNotionデータベース"""
+
+    def __init__(self, pages: List[Dict[str, Any]], latency: float = 0.0) -> None:
+        self.pages = pages
+        self.latency = latency
+        self.bodies: List[Dict[str, Any]] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        body = json.loads(request.body)
+        with self._lock:
+            self.bodies.append(body)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.latency)
+            return TransportResponse(status=200, body=json.dumps(self._query(body)).encode())
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _query(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        matched = [page for page in self.pages if self._matches(page, body["filter"])]
+        for sort in reversed(body.get("sorts", [])):
+            matched.sort(
+                key=lambda page: page["created_time"], reverse=sort["direction"] == "descending"
+            )
+        start = int(body.get("start_cursor") or 0)
+        end = start + body["page_size"]
+        has_more = end < len(matched)
+        return {
+            "results": matched[start:end],
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+    def _matches(self, page: Dict[str, Any], filter_obj: Dict[str, Any]) -> bool:
+        if "and" in filter_obj:
+            return all(self._matches(page, condition) for condition in filter_obj["and"])
+        if filter_obj.get("timestamp") == "created_time":
+            created = datetime.fromisoformat(page["created_time"])
+            condition = filter_obj["created_time"]
+            if "on_or_after" in condition:
+                return created >= datetime.fromisoformat(condition["on_or_after"])
+            return created < datetime.fromisoformat(condition["before"])
+        checked = page["properties"][filter_obj["property"]]["checkbox"]
+        return bool(checked == filter_obj["checkbox"]["equals"])
+
+
+def _database_pages(count: int, checked_every: int = 0) -> List[Dict[str, Any]]:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"item{i}",
+            "created_time": (base + timedelta(minutes=7 * i)).isoformat().replace("+00:00", "Z"),
+            "properties": {
+                "名前": {"title": [{"text": {"content": f"商品{i}"}}]},
+                "完了": {"checkbox": bool(checked_every and i % checked_every == 0)},
+            },
+        }
+        for i in range(count)
+    ]
 
 
 class TestNotionClient:
@@ -230,7 +303,7 @@ class TestNotionClient:
 
     def test_format_comment_message_single_item(self) -> None:
         items = [ShoppingItem("1", "牛乳", False)]
-        message = self.client._format_comment_message(items)
+        message = self.client.format_comment_message(items)
 
         assert "1件の未チェック項目があります" in message
         assert "• 牛乳" in message
@@ -241,7 +314,7 @@ class TestNotionClient:
             ShoppingItem("2", "パン", False),
             ShoppingItem("3", "卵", False),
         ]
-        message = self.client._format_comment_message(items)
+        message = self.client.format_comment_message(items)
 
         assert "3件の未チェック項目があります" in message
         assert "• 牛乳" in message
@@ -249,6 +322,161 @@ class TestNotionClient:
         assert "• 卵" in message
 
 
+class RateLimitedShardTransport(FakeDatabaseTransport):
+    """区間ごとのクエリの最初の1回だけ 429 を返す"""
+
+    def __init__(self, pages: List[Dict[str, Any]]) -> None:
+        super().__init__(pages)
+        self.rate_limited = 0
+        self._seen: List[str] = []
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        body = json.loads(request.body)
+        window = json.dumps(body["filter"], sort_keys=True)
+        if "and" in body["filter"]:
+            with self._lock:
+                first = window not in self._seen
+                self._seen.append(window)
+                if first:
+                    self.rate_limited += 1
+            if first:
+                raise _http_error(request.url, 429, {"Retry-After": "0"})
+        return super().send(request)
+
+
+class TestShardedQuery:
+    def _client(self, transport: Transport, shards: int) -> NotionClient:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "QUERY_SHARDS": str(shards),
+            }
+        )
+        return NotionClient(config, transport=transport)
+
+    def test_sharded_query_matches_serial_query(self) -> None:
+        pages = _database_pages(750, checked_every=4)
+        serial = self._client(FakeDatabaseTransport(pages), shards=1).query_unchecked_items()
+
+        transport = FakeDatabaseTransport(pages, latency=0.01)
+        sharded = self._client(transport, shards=4).query_unchecked_items()
+
+        assert len(serial) == 562
+        assert sorted(item.id for item in sharded) == sorted(item.id for item in serial)
+        assert len({item.id for item in sharded}) == len(sharded)
+        assert transport.max_in_flight > 1
+
+    def test_sharded_query_uses_probe_then_disjoint_windows(self) -> None:
+        transport = FakeDatabaseTransport(_database_pages(10))
+        self._client(transport, shards=3).query_unchecked_items()
+
+        probes = [body for body in transport.bodies if body["page_size"] == 1]
+        assert [probe["sorts"][0]["direction"] for probe in probes] == [
+            "ascending",
+            "descending",
+        ]
+        windows = [
+            body["filter"]["and"][1:] for body in transport.bodies if "and" in body["filter"]
+        ]
+        assert len(windows) == 3
+        # 先頭の区間は下限なし、末尾の区間は上限なし
+        assert sorted(len(window) for window in windows) == [1, 1, 2]
+
+    def test_sharded_query_empty_database(self) -> None:
+        transport = FakeDatabaseTransport([])
+        assert self._client(transport, shards=4).query_unchecked_items() == []
+        assert len(transport.bodies) == 1
+
+    def test_sharded_query_single_timestamp_falls_back_to_serial(self) -> None:
+        pages = _database_pages(3)
+        for page in pages:
+            page["created_time"] = pages[0]["created_time"]
+        transport = FakeDatabaseTransport(pages)
+
+        items = self._client(transport, shards=4).query_unchecked_items()
+
+        assert len(items) == 3
+        assert "and" not in transport.bodies[-1]["filter"]
+
+    def test_sharded_query_is_rate_limited_and_retries_429(self) -> None:
+        pages = _database_pages(30)
+        transport = RateLimitedShardTransport(pages)
+        limiter = Mock(spec=RateLimiter)
+
+        with patch(
+            "src.shopping_reminder.notion_client.get_rate_limiter", return_value=limiter
+        ) as get_limiter:
+            items = self._client(transport, shards=3).query_unchecked_items()
+
+        assert len(items) == 30
+        get_limiter.assert_called_once_with("secret_test_key")
+        # 区間ごとのクエリ3件と、429 を受けた各区間の再試行3件
+        assert transport.rate_limited == 3
+        assert limiter.acquire.call_count == 6
+
+
+class TestTopNQuery:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+
+    def _query(self, pages: List[Dict[str, Any]], limit: int) -> Any:
+        transport = FakeDatabaseTransport(list(reversed(pages)))
+        items, omitted = NotionClient(self.config, transport=transport).query_top_unchecked_items(
+            limit
+        )
+        return items, omitted, transport
+
+    def test_stops_paginating_after_limit(self) -> None:
+        items, omitted, transport = self._query(_database_pages(450), limit=50)
+
+        assert [item.id for item in items] == [f"item{i}" for i in range(50)]
+        assert (omitted.count, omitted.lower_bound) == (50, True)
+        assert len(transport.bodies) == 1
+        assert transport.bodies[0]["sorts"] == [
+            {"timestamp": "created_time", "direction": "ascending"}
+        ]
+
+    def test_limit_spanning_multiple_pages(self) -> None:
+        items, omitted, transport = self._query(_database_pages(450), limit=120)
+
+        assert len(items) == 120
+        assert (omitted.count, omitted.lower_bound) == (80, True)
+        assert len(transport.bodies) == 2
+
+    def test_exact_omitted_count_when_all_pages_fetched(self) -> None:
+        items, omitted, _ = self._query(_database_pages(80), limit=50)
+
+        assert len(items) == 50
+        assert (omitted.count, omitted.lower_bound) == (30, False)
+
+    def test_no_omission_when_under_limit(self) -> None:
+        items, omitted, _ = self._query(_database_pages(30), limit=50)
+
+        assert len(items) == 30
+        assert omitted is None
+
+    def test_comment_message_with_omitted_items(self) -> None:
+        client = NotionClient(self.config)
+        items = [ShoppingItem("1", "牛乳", False), ShoppingItem("2", "パン", False)]
+
+        message = client.format_comment_message(items, omitted=OmittedItems(48, True))
+        assert "🛒 50件以上の未チェック項目があります" in message
+        assert "…ほか48件以上" in message
+
+        message = client.format_comment_message(items, omitted=OmittedItems(3))
+        assert "🛒 5件の未チェック項目があります" in message
+        assert "…ほか3件\n" in message
+
+
 class TestNotionAPIError:
     def test_notion_api_error_creation(self) -> None:
         error = NotionAPIError("Test error message")
@@ -0,0 +1,76 @@
+import gc
+import socket
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.shopping_reminder.priming import is_priming_enabled, prime
+
+
+@pytest.fixture
+def listener() -> Iterator[socket.socket]:
+    """接続を受け付けるだけのサーバー（accept しなくてもバックログで接続は確立する）"""
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        sock.settimeout(2)
+        yield sock
+
+
+@pytest.fixture(autouse=True)
+def unfreeze() -> Iterator[None]:
+    yield
+    gc.unfreeze()
+
+
+@pytest.fixture
+def env(monkeypatch) -> pytest.MonkeyPatch:
+    monkeypatch.setenv("NOTION_API_KEY", "secret_test_key")
+    monkeypatch.setenv("NOTION_DATABASE_ID", "test_database_id")
+    monkeypatch.setenv("NOTION_PAGE_ID", "test_page_id")
+    return monkeypatch
+
+
+class TestPriming:
+    @pytest.mark.parametrize(
+        "value,expected", [("1", True), ("true", True), ("", False), ("0", False)]
+    )
+    def test_is_priming_enabled(self, monkeypatch, value: str, expected: bool) -> None:
+        monkeypatch.setenv("PRIME_ON_INIT", value)
+        assert is_priming_enabled() is expected
+
+    def test_prime_connects_builds_and_freezes(self, env, listener: socket.socket) -> None:
+        port = listener.getsockname()[1]
+        env.setenv("NOTION_API_BASE_URL", f"http://127.0.0.1:{port}/v1")
+        build = Mock()
+
+        report = prime(build)
+
+        assert report.errors == {}
+        assert set(report.timings) == {"config", "connect", "codec", "clients"}
+        conn, _ = listener.accept()
+        conn.close()
+        assert build.call_args.args[0].notion_database_id == "test_database_id"
+        assert report.frozen > 0
+
+    def test_failed_steps_do_not_stop_priming(self, env) -> None:
+        with socket.create_server(("127.0.0.1", 0)) as sock:
+            port = sock.getsockname()[1]
+        env.setenv("NOTION_API_BASE_URL", f"http://127.0.0.1:{port}/v1")
+        build = Mock()
+
+        report = prime(build, connect_timeout=0.5)
+
+        assert list(report.errors) == ["connect"]
+        build.assert_called_once()
+        assert report.frozen > 0
+
+    def test_missing_config_skips_clients(self, monkeypatch) -> None:
+        monkeypatch.delenv("NOTION_API_KEY", raising=False)
+        build = Mock()
+
+        with patch("src.shopping_reminder.priming._open_connection"):
+            report = prime(build)
+
+        assert list(report.errors) == ["config"]
+        assert "codec" in report.timings
+        build.assert_not_called()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.notion_client import NEWEST_EDIT_FIRST, NotionClient
+from src.shopping_reminder.query_cache import QueryCache
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+
+# QueryCache・lambda_handler はフラットなモジュール名で import しているため、比較や送出に同じものを使う
+from models import OmittedItems, ShoppingItem
+from notion_client import NotionAPIError
+
+MILK = ShoppingItem("1", "牛乳", False)
+BREAD = ShoppingItem("2", "パン", False)
+
+EDITED = "2025-01-01T00:00:00.000Z"
+EDITED_AT = 1735689600.0
+WATERMARK = f"{EDITED} page-1"
+DAY = 24 * 60 * 60
+
+
+class FakeClock:
+    def __init__(self, now: float = EDITED_AT + 600) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeProbeTransport(Transport):
+    """最後に編集された順に並べた1件を返すデータベース"""
+
+    def __init__(self, pages: List[Dict[str, Any]]) -> None:
+        self.pages = pages
+        self.bodies: List[Dict[str, Any]] = []
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        body = json.loads(request.body)
+        self.bodies.append(body)
+        pages = sorted(self.pages, key=lambda page: page["last_edited_time"], reverse=True)
+        payload = {"results": pages[: body["page_size"]], "has_more": False, "next_cursor": None}
+        return TransportResponse(status=200, body=json.dumps(payload).encode())
+
+
+class TestQueryCache:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.cache = QueryCache(clock=self.clock)
+
+    def teardown_method(self) -> None:
+        self.cache.close()
+
+    def test_round_trip(self) -> None:
+        assert self.cache.get("db:0") is None
+        self.cache.put("db:0", WATERMARK, self.clock.now, [MILK, BREAD], OmittedItems(3, True))
+
+        cached = self.cache.get("db:0")
+        assert cached is not None
+        assert cached.watermark == WATERMARK
+        assert cached.items == [MILK, BREAD]
+        assert cached.omitted == OmittedItems(3, True)
+
+    def test_reusable_only_when_unchanged_and_recent(self) -> None:
+        self.cache.put("db:0", WATERMARK, self.clock.now, [MILK])
+        cached = self.cache.get("db:0")
+        assert cached is not None
+
+        assert cached.is_reusable(WATERMARK, DAY, self.clock.now + 60) is True
+        assert cached.is_reusable(f"{EDITED} page-2", DAY, self.clock.now + 60) is False
+        assert cached.is_reusable(WATERMARK, DAY, self.clock.now + DAY) is False
+
+    def test_not_reusable_when_fetched_within_edit_minute(self) -> None:
+        # last_edited_time は分単位のため、編集直後に取得した結果は同じ分の後続の編集を含まない可能性がある
+        self.cache.put("db:0", WATERMARK, EDITED_AT + 30, [MILK])
+        cached = self.cache.get("db:0")
+        assert cached is not None
+        assert cached.is_reusable(WATERMARK, DAY, self.clock.now) is False
+
+    def test_empty_database_is_reusable(self) -> None:
+        self.cache.put("db:0", "", self.clock.now, [])
+        cached = self.cache.get("db:0")
+        assert cached is not None
+        assert cached.is_reusable("", DAY, self.clock.now) is True
+
+
+class TestProbeWatermark:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+
+    def test_probe_returns_newest_edit(self) -> None:
+        transport = FakeProbeTransport(
+            [
+                {"id": "page-1", "last_edited_time": "2025-01-01T00:00:00.000Z"},
+                {"id": "page-2", "last_edited_time": "2025-01-02T09:30:00.000Z"},
+            ]
+        )
+        client = NotionClient(self.config, transport=transport)
+
+        assert client.probe_watermark() == "2025-01-02T09:30:00.000Z page-2"
+        assert transport.bodies == [{"page_size": 1, "sorts": NEWEST_EDIT_FIRST}]
+
+    def test_probe_empty_database(self) -> None:
+        client = NotionClient(self.config, transport=FakeProbeTransport([]))
+        assert client.probe_watermark() == ""
+
+
+class TestProcessorWithQueryCache:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.settings = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+        self.config = Config.from_dict(self.settings)
+        self.clock = FakeClock()
+        self.cache = QueryCache(clock=self.clock)
+
+    def teardown_method(self) -> None:
+        self.cache.close()
+
+    def _client(self, mock_notion_client_class: Mock) -> Mock:
+        mock_client = mock_notion_client_class.return_value
+        mock_client.probe_watermark.return_value = WATERMARK
+        mock_client.query_unchecked_items.return_value = [MILK, BREAD]
+        mock_client.create_comment.return_value = NotificationResult(success=True, message="ok")
+        return mock_client
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_unchanged_database_skips_full_query(self, mock_notion_client_class: Mock) -> None:
+        mock_client = self._client(mock_notion_client_class)
+        processor = ShoppingReminderProcessor(self.config, query_cache=self.cache)
+
+        processor.process()
+        self.clock.now += DAY / 2
+        result = processor.process()
+
+        assert result.success is True
+        assert mock_client.probe_watermark.call_count == 2
+        mock_client.query_unchecked_items.assert_called_once()
+        assert mock_client.create_comment.call_args.args[0] == [MILK, BREAD]
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_changed_database_is_queried_again(self, mock_notion_client_class: Mock) -> None:
+        mock_client = self._client(mock_notion_client_class)
+        processor = ShoppingReminderProcessor(self.config, query_cache=self.cache)
+
+        processor.process()
+        mock_client.probe_watermark.return_value = "2025-01-01T00:05:00.000Z page-2"
+        mock_client.query_unchecked_items.return_value = [BREAD]
+        self.clock.now += DAY / 2
+        processor.process()
+
+        assert mock_client.query_unchecked_items.call_count == 2
+        assert mock_client.create_comment.call_args.args[0] == [BREAD]
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_outdated_cache_is_queried_again(self, mock_notion_client_class: Mock) -> None:
+        mock_client = self._client(mock_notion_client_class)
+        processor = ShoppingReminderProcessor(self.config, query_cache=self.cache)
+
+        processor.process()
+        self.clock.now += self.config.query_cache_max_age_days * DAY
+        processor.process()
+
+        assert mock_client.query_unchecked_items.call_count == 2
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_top_n_result_is_cached_separately(self, mock_notion_client_class: Mock) -> None:
+        mock_client = self._client(mock_notion_client_class)
+        mock_client.query_top_unchecked_items.return_value = ([MILK], OmittedItems(1))
+        ShoppingReminderProcessor(self.config, query_cache=self.cache).process()
+
+        config = Config.from_dict({**self.settings, "MAX_COMMENT_ITEMS": "1"})
+        processor = ShoppingReminderProcessor(config, query_cache=self.cache)
+        processor.process()
+        processor.process()
+
+        mock_client.query_top_unchecked_items.assert_called_once_with(1)
+        assert mock_client.create_comment.call_args.args[0] == [MILK]
+        assert mock_client.create_comment.call_args.kwargs["omitted"] == OmittedItems(1)
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_probe_failure_falls_back_to_full_query(self, mock_notion_client_class: Mock) -> None:
+        mock_client = self._client(mock_notion_client_class)
+        mock_client.probe_watermark.side_effect = NotionAPIError("HTTP error 502")
+
+        processor = ShoppingReminderProcessor(self.config, query_cache=self.cache)
+        result = processor.process()
+
+        assert result.success is True
+        mock_client.query_unchecked_items.assert_called_once()
+        assert self.cache.get(processor._query_cache_key()) is None
+
+    @patch("src.shopping_reminder.lambda_handler.AsyncNotionClient")
+    def test_async_process_reuses_cached_result(self, mock_async_client_class: MagicMock) -> None:
+        mock_client = MagicMock()
+        mock_client.probe_watermark = AsyncMock(return_value=WATERMARK)
+        mock_client.query_unchecked_items = AsyncMock(return_value=[MILK])
+        mock_client.create_comment = AsyncMock(
+            return_value=NotificationResult(success=True, message="ok")
+        )
+        mock_async_client_class.return_value.__aenter__.return_value = mock_client
+        processor = ShoppingReminderProcessor(self.config, query_cache=self.cache)
+
+        asyncio.run(processor.process_async())
+        self.clock.now += DAY / 2
+        result = asyncio.run(processor.process_async())
+
+        assert result.success is True
+        mock_client.query_unchecked_items.assert_awaited_once()
+        assert mock_client.create_comment.await_args.args[0] == [MILK]
+
+    def test_processor_opens_cache_from_config(self, tmp_path) -> None:
+        config = Config.from_dict(
+            {**self.settings, "QUERY_CACHE_DB_PATH": str(tmp_path / "query_cache.db")}
+        )
+        processor = ShoppingReminderProcessor(config)
+        assert processor.query_cache is not None
+        assert processor.query_cache.path == config.query_cache_db_path
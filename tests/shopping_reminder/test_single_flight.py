@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.notion_client import NotionAPIError, NotionClient
+from src.shopping_reminder.single_flight import SingleFlight
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+
+CALLERS = 4
+
+
+def _config(api_key: str = "secret_test_key") -> Config:
+    return Config.from_dict(
+        {
+            "NOTION_API_KEY": api_key,
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+    )
+
+
+class BlockingTransport(Transport):
+    """全ての呼び出し元が揃うまで応答を止めるトランスポート"""
+
+    def __init__(self, status: int = 200) -> None:
+        self.status = status
+        self.release = threading.Event()
+        self.requests: List[TransportRequest] = []
+        self._lock = threading.Lock()
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        with self._lock:
+            self.requests.append(request)
+        self.release.wait(timeout=5)
+        if request.url.endswith("/comments"):
+            return TransportResponse(self.status, b'{"object":"comment"}')
+        page = {
+            "id": "1",
+            "properties": {
+                "名前": {"title": [{"text": {"content": "牛乳"}}]},
+                "完了": {"checkbox": False},
+            },
+        }
+        body = {"results": [page], "has_more": False, "next_cursor": None}
+        return TransportResponse(self.status, json.dumps(body).encode("utf-8"))
+
+
+def _wait_for(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_result(self) -> None:
+        group: SingleFlight[int] = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work() -> int:
+            calls.append(1)
+            release.wait(timeout=5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+            futures = [executor.submit(group.do, "key", work) for _ in range(CALLERS)]
+            _wait_for(lambda: group.waiting() == CALLERS - 1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == [42] * CALLERS
+        assert len(calls) == 1
+        assert group.in_flight() == 0
+
+    def test_error_is_shared_and_not_remembered(self) -> None:
+        group: SingleFlight[int] = SingleFlight()
+
+        def fail() -> int:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            group.do("key", fail)
+        assert group.do("key", lambda: 1) == 1
+
+    def test_different_keys_run_separately(self) -> None:
+        group: SingleFlight[str] = SingleFlight()
+        assert group.do("a", lambda: "a") == "a"
+        assert group.do("b", lambda: "b") == "b"
+
+
+class TestNotionClientSingleFlight:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.group: SingleFlight = SingleFlight()
+        self.transport = BlockingTransport()
+
+    def teardown_method(self) -> None:
+        self.transport.release.set()
+
+    def _run_concurrently(self, clients: List[NotionClient], ready: Callable[[], bool]) -> list:
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            futures = [executor.submit(client.query_unchecked_items) for client in clients]
+            _wait_for(ready)
+            self.transport.release.set()
+            return [future.result() for future in futures]
+
+    def test_identical_queries_share_one_request(self) -> None:
+        clients = [
+            NotionClient(_config(), transport=self.transport, single_flight=self.group)
+            for _ in range(CALLERS)
+        ]
+
+        results = self._run_concurrently(clients, lambda: self.group.waiting() == CALLERS - 1)
+
+        assert len(self.transport.requests) == 1
+        assert [[item.name for item in items] for items in results] == [["牛乳"]] * CALLERS
+
+    def test_different_api_keys_are_not_shared(self) -> None:
+        clients = [
+            NotionClient(_config(f"secret_{i}"), transport=self.transport, single_flight=self.group)
+            for i in range(2)
+        ]
+
+        self._run_concurrently(clients, lambda: len(self.transport.requests) == 2)
+
+        assert len(self.transport.requests) == 2
+
+    def test_errors_are_delivered_to_every_caller(self) -> None:
+        self.transport.status = 502
+        clients = [
+            NotionClient(_config(), transport=self.transport, single_flight=self.group)
+            for _ in range(CALLERS)
+        ]
+
+        with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+            futures = [executor.submit(client.query_unchecked_items) for client in clients]
+            _wait_for(lambda: self.group.waiting() == CALLERS - 1)
+            self.transport.release.set()
+            for future in futures:
+                with pytest.raises(NotionAPIError, match="status 502"):
+                    future.result()
+        assert len(self.transport.requests) == 1
+
+    def test_sequential_queries_are_not_cached(self) -> None:
+        self.transport.release.set()
+        client = NotionClient(_config(), transport=self.transport, single_flight=self.group)
+
+        client.query_unchecked_items()
+        client.query_unchecked_items()
+
+        assert len(self.transport.requests) == 2
+
+    def test_comments_are_never_coalesced(self) -> None:
+        self.transport.release.set()
+        client = NotionClient(_config(), transport=self.transport, single_flight=self.group)
+        items = client.query_unchecked_items()
+        self.transport.requests.clear()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(client.create_comment, items) for _ in range(2)]
+            assert all(future.result().success for future in futures)
+
+        assert len(self.transport.requests) == 2
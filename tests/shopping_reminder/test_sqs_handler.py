@@ -0,0 +1,216 @@
+import json
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.sqs_handler import BatchProcessor, handler, parse_job
+from src.shopping_reminder.target_scheduler import TargetCostHistory, target_key
+
+# sqs_handler はフラットなモジュール名の ConfigError を送出する
+from config import ConfigError
+from config_source import EnvConfigSource
+
+
+def _record(body: Any, message_id: Optional[str] = None) -> Dict[str, Any]:
+    """SQS イベントソースが渡すレコードと同じ形式"""
+    return {
+        "messageId": message_id or str(uuid.uuid4()),
+        "receiptHandle": "AQEBwJnKyrHigUMZj6rYigCgxlaS3SLy0a...",
+        "body": body if isinstance(body, str) else json.dumps(body),
+        "attributes": {
+            "ApproximateReceiveCount": "1",
+            "SentTimestamp": "1735718400000",
+            "SenderId": "AIDAIENQZJOLO23YVJ4VO",
+            "ApproximateFirstReceiveTimestamp": "1735718400001",
+        },
+        "messageAttributes": {},
+        "md5OfBody": "e4e68fb7bd0e697a0ae8f1bb342846b3",
+        "eventSource": "aws:sqs",
+        "eventSourceARN": "arn:aws:sqs:ap-northeast-1:123456789012:shopping-reminder-jobs",
+        "awsRegion": "ap-northeast-1",
+    }
+
+
+def _job(page_id: str, **settings: str) -> Dict[str, Any]:
+    return {
+        "name": page_id,
+        "config": {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": page_id,
+            **settings,
+        },
+    }
+
+
+class TestParseJob:
+    def test_parse_job_fills_missing_keys_from_source(self, monkeypatch) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_from_env")
+        monkeypatch.setenv("NOTION_DATABASE_ID", "database-from-env")
+
+        job = parse_job(
+            _record({"name": "home", "config": {"NOTION_PAGE_ID": "home-page"}}, "m-1"),
+            EnvConfigSource(),
+        )
+
+        assert (job.message_id, job.name) == ("m-1", "home")
+        assert job.config.notion_api_key == "secret_from_env"
+        assert job.config.notion_page_id == "home-page"
+
+    def test_parse_job_fills_optional_keys_from_source(self, monkeypatch) -> None:
+        monkeypatch.setenv("NOTION_API_KEY", "secret_from_env")
+        monkeypatch.setenv("NOTION_DATABASE_ID", "database-from-env")
+        monkeypatch.setenv("IDEMPOTENCY_DB_PATH", "/tmp/idempotency.db")
+        monkeypatch.setenv("MAX_COMMENT_ITEMS", "10")
+
+        job = parse_job(
+            _record({"config": {"NOTION_PAGE_ID": "home-page", "MAX_COMMENT_ITEMS": "5"}}, "m-1"),
+            EnvConfigSource(),
+        )
+
+        # メッセージの指定を優先し、無い任意の設定は環境変数から補完する
+        assert job.config.idempotency_db_path == "/tmp/idempotency.db"
+        assert job.config.max_comment_items == 5
+
+    @pytest.mark.parametrize("body", ["not json", "[1, 2]", json.dumps({"config": {}})])
+    def test_invalid_message(self, body: str) -> None:
+        with pytest.raises(ConfigError):
+            parse_job(_record(body))
+
+
+class TestBatchProcessor:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.lock = threading.Lock()
+        self.processed: List[str] = []
+        self.failing_pages = {"broken"}
+
+    def _factory(self, config: Config) -> Mock:
+        processor = Mock()
+
+        def process() -> NotificationResult:
+            with self.lock:
+                self.processed.append(config.notion_page_id)
+            if config.notion_page_id in self.failing_pages:
+                return NotificationResult(success=False, message="failed", error="HTTP error 502")
+            return NotificationResult(success=True, message="ok")
+
+        processor.process.side_effect = process
+        return processor
+
+    def test_only_failed_messages_are_reported(self, tmp_path) -> None:
+        db = str(tmp_path / "idempotency.db")
+        records = [
+            _record(_job("home", IDEMPOTENCY_DB_PATH=db), "m-home"),
+            _record(_job("broken", IDEMPOTENCY_DB_PATH=db), "m-broken"),
+            _record("not json", "m-invalid"),
+            _record(_job("office", IDEMPOTENCY_DB_PATH=db), "m-office"),
+        ]
+
+        failures = BatchProcessor(max_workers=4, processor_factory=self._factory).process(records)
+
+        assert failures == ["m-broken", "m-invalid"]
+        assert sorted(self.processed) == ["broken", "home", "office"]
+
+    def test_redelivered_messages_skip_successful_lists(self, tmp_path) -> None:
+        db = str(tmp_path / "idempotency.db")
+        records = [
+            _record(_job("home", IDEMPOTENCY_DB_PATH=db), "m-home"),
+            _record(_job("broken", IDEMPOTENCY_DB_PATH=db), "m-broken"),
+        ]
+        batch = BatchProcessor(max_workers=2, processor_factory=self._factory)
+        assert batch.process(records) == ["m-broken"]
+
+        # 失敗したメッセージのみ再配信されるが、成功済みのメッセージが重複して届いても通知しない
+        self.failing_pages.clear()
+        assert batch.process(records) == []
+        assert sorted(self.processed) == ["broken", "broken", "home"]
+
+    def test_messages_are_processed_concurrently(self) -> None:
+        barrier = threading.Barrier(3)
+
+        def factory(config: Config) -> Mock:
+            processor = Mock()
+
+            def process() -> NotificationResult:
+                # 3件が同時に実行されなければタイムアウトする
+                barrier.wait(timeout=5)
+                return NotificationResult(success=True, message="ok")
+
+            processor.process.side_effect = process
+            return processor
+
+        records = [_record(_job(f"page-{i}")) for i in range(3)]
+        assert BatchProcessor(max_workers=3, processor_factory=factory).process(records) == []
+
+    def test_processor_exception_is_reported(self) -> None:
+        def factory(config: Config) -> Mock:
+            processor = Mock()
+            processor.process.side_effect = RuntimeError("boom")
+            return processor
+
+        record = _record(_job("home"))
+        failures = BatchProcessor(processor_factory=factory).process([record])
+        assert failures == [record["messageId"]]
+
+    def test_longest_lists_are_processed_first(self) -> None:
+        history = TargetCostHistory()
+        for page_id, seconds in (("small", 1.0), ("large", 40.0), ("medium", 8.0)):
+            history.record(target_key(parse_job(_record(_job(page_id))).config), seconds, 1, True)
+        records = [_record(_job(page_id)) for page_id in ("small", "medium", "large", "new")]
+
+        batch = BatchProcessor(max_workers=1, processor_factory=self._factory, cost_history=history)
+        assert batch.process(records) == []
+
+        assert self.processed == ["large", "new", "medium", "small"]
+        assert history.get(target_key(parse_job(records[0]).config)).runs == 2
+        history.close()
+
+    def test_lists_that_cannot_finish_in_time_are_redelivered(self) -> None:
+        history = TargetCostHistory()
+        slow = _record(_job("slow"), "m-slow")
+        history.record(target_key(parse_job(slow).config), 120.0, 30, True)
+        context = Mock()
+        context.get_remaining_time_in_millis.return_value = 60_000
+
+        batch = BatchProcessor(processor_factory=self._factory, cost_history=history)
+        failures = batch.process([slow, _record(_job("home"), "m-home")], context)
+
+        assert failures == ["m-slow"]
+        assert self.processed == ["home"]
+        history.close()
+
+
+class TestSQSHandler:
+    def test_handler_returns_batch_item_failures(self, monkeypatch) -> None:
+        monkeypatch.setenv("SQS_MAX_CONCURRENCY", "2")
+        ok = _record(_job("home"))
+        broken = _record(_job("broken"))
+        results = {
+            "home": NotificationResult(success=True, message="ok"),
+            "broken": NotificationResult(success=False, message="failed", error="boom"),
+        }
+
+        def factory(config: Config) -> Mock:
+            processor = Mock()
+            processor.process.return_value = results[config.notion_page_id]
+            return processor
+
+        with patch("src.shopping_reminder.sqs_handler.ShoppingReminderProcessor", factory):
+            response = handler({"Records": [ok, broken]}, None)
+
+        assert response == {"batchItemFailures": [{"itemIdentifier": broken["messageId"]}]}
+
+    def test_handler_with_invalid_concurrency_fails_all(self, monkeypatch) -> None:
+        monkeypatch.setenv("SQS_MAX_CONCURRENCY", "0")
+        record = _record(_job("home"))
+        response = handler({"Records": [record]}, None)
+        assert response == {"batchItemFailures": [{"itemIdentifier": record["messageId"]}]}
+
+    def test_handler_with_empty_batch(self) -> None:
+        assert handler({"Records": []}, None) == {"batchItemFailures": []}
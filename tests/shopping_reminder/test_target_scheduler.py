@@ -0,0 +1,128 @@
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.target_scheduler import (
+    TargetCostHistory,
+    fits_in_remaining_time,
+    order_longest_first,
+    record_run,
+    target_key,
+)
+
+# record_run はフラットなモジュール名の共有の UsageTracker を参照する
+from usage import get_usage_tracker
+
+
+def _config(page_id: str) -> Config:
+    return Config.from_dict(
+        {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": page_id,
+        }
+    )
+
+
+class TestTargetCostHistory:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.history = TargetCostHistory(clock=lambda: 1000.0)
+
+    def teardown_method(self) -> None:
+        self.history.close()
+
+    def test_successful_runs_are_smoothed(self) -> None:
+        assert self.history.get("home") is None
+
+        self.history.record("home", 10.0, 4, success=True)
+        cost = self.history.record("home", 20.0, 6, success=True)
+
+        assert (cost.seconds, cost.requests, cost.runs, cost.failed) == (15.0, 6, 2, False)
+        assert self.history.get("home") == cost
+
+    def test_failed_run_does_not_shorten_estimate(self) -> None:
+        self.history.record("home", 10.0, 4, success=True)
+
+        assert self.history.record("home", 1.0, 1, success=False).seconds == 10.0
+        assert self.history.record("home", 30.0, 9, success=False).seconds == 30.0
+        assert self.history.get("home").failed is True
+
+    def test_history_persists_in_file(self, tmp_path) -> None:
+        path = str(tmp_path / "costs.db")
+        history = TargetCostHistory(path)
+        history.record("home", 12.5, 3, success=True)
+        history.close()
+
+        reopened = TargetCostHistory(path)
+        try:
+            assert reopened.get("home").seconds == 12.5
+        finally:
+            reopened.close()
+
+
+class TestOrderLongestFirst:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.history = TargetCostHistory()
+
+    def teardown_method(self) -> None:
+        self.history.close()
+
+    def test_longest_first_with_failed_and_unknown_targets(self) -> None:
+        self.history.record("short", 1.0, 1, success=True)
+        self.history.record("long", 50.0, 60, success=True)
+        self.history.record("medium", 10.0, 8, success=True)
+        self.history.record("retry", 2.0, 2, success=False)
+
+        ordered = order_longest_first(
+            ["short", "new", "medium", "long", "retry"], lambda name: name, self.history
+        )
+
+        # 前回失敗した対象が最初、未実行の対象は記録済みの最長と同じ長さとして元の順序を保つ
+        assert ordered == ["retry", "new", "long", "medium", "short"]
+
+    def test_order_is_stable_without_history(self) -> None:
+        names = ["c", "a", "b"]
+        assert order_longest_first(names, lambda name: name, self.history) == names
+
+
+class TestRecordRun:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.history = TargetCostHistory()
+        self.config = _config("home")
+
+    def teardown_method(self) -> None:
+        self.history.close()
+
+    def test_records_requests_made_during_run(self) -> None:
+        def run() -> NotificationResult:
+            tracker = get_usage_tracker()
+            tracker.record("test_database_id", "query", 100, 2000, 0.1)
+            tracker.record("test_database_id", "comment", 300, 500, 0.1)
+            return NotificationResult(success=True, message="ok")
+
+        assert record_run(self.history, self.config, run).success is True
+
+        cost = self.history.get(target_key(self.config))
+        assert (cost.requests, cost.failed) == (2, False)
+        assert cost.seconds >= 0
+
+    def test_exception_is_recorded_as_failure(self) -> None:
+        def run() -> NotificationResult:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            record_run(self.history, self.config, run)
+
+        assert self.history.get(target_key(self.config)).failed is True
+
+    def test_fits_in_remaining_time(self) -> None:
+        assert fits_in_remaining_time(self.history, self.config, None)
+        assert fits_in_remaining_time(self.history, self.config, 1.0)
+
+        self.history.record(target_key(self.config), 30.0, 5, success=True)
+
+        assert fits_in_remaining_time(self.history, self.config, 45.0, margin=10.0)
+        assert not fits_in_remaining_time(self.history, self.config, 35.0, margin=10.0)
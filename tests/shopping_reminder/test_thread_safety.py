@@ -0,0 +1,153 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+from unittest.mock import patch
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import handler
+from src.shopping_reminder.logger import get_logger
+
+INVOCATIONS = 32
+WORKERS = 16
+
+
+class _BacklogHTTPServer(ThreadingHTTPServer):
+    # 既定の待ち行列（5）では同時接続がリセットされるため広げる
+    request_queue_size = 64
+
+
+class FakeNotionHTTPServer:
+    """スレッドごとに接続を処理する、Notion API の代わりのローカルサーバー"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: List[Dict[str, Any]] = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            timeout = 5
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake.lock:
+                    fake.requests.append({"path": self.path, "body": json.loads(body)})
+                if self.path.endswith("/query"):
+                    payload: Dict[str, Any] = {
+                        "results": [_page("1", "牛乳"), _page("2", "パン")],
+                        "has_more": False,
+                        "next_cursor": None,
+                    }
+                else:
+                    payload = {"object": "comment", "id": "comment-id"}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = _BacklogHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeNotionHTTPServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=5)
+
+    def paths(self, suffix: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [request for request in self.requests if request["path"].endswith(suffix)]
+
+
+def _page(page_id: str, name: str) -> Dict[str, Any]:
+    return {
+        "id": page_id,
+        "properties": {
+            "名前": {"title": [{"text": {"content": name}}]},
+            "完了": {"checkbox": False},
+        },
+    }
+
+
+@pytest.fixture
+def fake_server() -> Iterator[FakeNotionHTTPServer]:
+    with FakeNotionHTTPServer() as server:
+        yield server
+
+
+class TestConcurrentHandler:
+    def test_many_concurrent_invocations(self, fake_server: FakeNotionHTTPServer) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+                "NOTION_API_BASE_URL": fake_server.base_url,
+            }
+        )
+        start = threading.Barrier(WORKERS)
+
+        def invoke(index: int) -> Dict[str, Any]:
+            if index < WORKERS:
+                start.wait(timeout=5)
+            return handler({}, None)
+
+        with patch("src.shopping_reminder.lambda_handler.Config", return_value=config):
+            with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+                responses = list(executor.map(invoke, range(INVOCATIONS)))
+
+        assert [response["statusCode"] for response in responses] == [200] * INVOCATIONS
+        assert all(json.loads(r["body"])["success"] for r in responses)
+        comments = fake_server.paths("/comments")
+        assert len(comments) == INVOCATIONS
+        for comment in comments:
+            message = comment["body"]["rich_text"][0]["text"]["content"]
+            assert message.startswith("🛒 2件の未チェック項目があります")
+        # 同時に実行中のクエリは1件にまとめられるため、呼び出し回数以下になる
+        assert 1 <= len(fake_server.paths("/query")) <= INVOCATIONS
+
+
+class TestThreadSafeSetup:
+    def test_logger_setup_adds_one_handler(self) -> None:
+        name = "thread_safety.concurrent_logger"
+        start = threading.Barrier(WORKERS)
+
+        def setup() -> logging.Logger:
+            start.wait(timeout=5)
+            return get_logger(name)
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            loggers = list(executor.map(lambda _: setup(), range(WORKERS)))
+
+        assert all(logger is loggers[0] for logger in loggers)
+        assert len(loggers[0].handlers) == 1
+        assert loggers[0].propagate is False
+
+    def test_config_is_immutable(self) -> None:
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "test_database_id",
+                "NOTION_PAGE_ID": "test_page_id",
+            }
+        )
+        with pytest.raises(FrozenInstanceError):
+            config.notion_database_id = "other"
+        with pytest.raises(FrozenInstanceError):
+            del config.notion_page_id
+        assert config.notion_database_id == "test_database_id"
@@ -0,0 +1,179 @@
+import io
+import json
+import os
+import urllib.error
+from typing import List
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.notion_client import NotionAPIError, NotionClient
+from src.shopping_reminder.transport import (
+    CassetteError,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    TransportRequest,
+    TransportResponse,
+    UrllibTransport,
+    get_ssl_context,
+)
+
+CASSETTE_DIR = os.path.join(os.path.dirname(__file__), "cassettes")
+
+
+class StubTransport(Transport):
+    """決まった応答を順番に返すトランスポート"""
+
+    def __init__(self, responses: List[TransportResponse]) -> None:
+        self.responses = list(responses)
+        self.requests: List[TransportRequest] = []
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                request.url,
+                response.status,
+                "error",
+                None,  # type: ignore[arg-type]
+                None,  # type: ignore[arg-type]
+            )
+        return response
+
+
+def _json(data: object, status: int = 200) -> TransportResponse:
+    return TransportResponse(status=status, body=json.dumps(data).encode("utf-8"))
+
+
+def _page(item_id: str, name: str) -> dict:
+    return {
+        "id": item_id,
+        "properties": {
+            "名前": {"title": [{"text": {"content": name}}]},
+            "完了": {"checkbox": False},
+        },
+    }
+
+
+class TestTransport:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "recorded-database",
+                "NOTION_PAGE_ID": "recorded-page",
+            }
+        )
+
+    def test_record_then_replay_round_trip(self, tmp_path) -> None:
+        path = str(tmp_path / "cassette.json")
+        stub = StubTransport(
+            [_json({"results": [_page("1", "牛乳")], "has_more": False}), _json({"id": "c"})]
+        )
+        with RecordingTransport(stub, path) as recorder:
+            client = NotionClient(self.config, transport=recorder)
+            items = client.query_unchecked_items()
+            client.create_comment(items)
+
+        with open(path, encoding="utf-8") as f:
+            cassette_text = f.read()
+        assert "secret_test_key" not in cassette_text
+        assert "***REDACTED***" in cassette_text
+
+        replay = ReplayTransport(path)
+        client = NotionClient(self.config, transport=replay)
+        replayed = client.query_unchecked_items()
+        result = client.create_comment(replayed)
+
+        assert replayed == items
+        assert result.success is True
+        assert replay.remaining == 0
+
+    def test_replay_checked_in_cassette(self) -> None:
+        replay = ReplayTransport(os.path.join(CASSETTE_DIR, "query_and_comment.json"))
+        client = NotionClient(self.config, transport=replay)
+
+        items = client.query_unchecked_items()
+        result = client.create_comment(items)
+
+        assert [item.name for item in items] == ["牛乳", "パン", "卵"]
+        assert result.success is True
+        assert replay.remaining == 0
+
+    def test_replay_recorded_latency(self) -> None:
+        sleeps: List[float] = []
+        replay = ReplayTransport(
+            os.path.join(CASSETTE_DIR, "query_and_comment.json"),
+            replay_latency=True,
+            latency_scale=0.5,
+            sleep=sleeps.append,
+        )
+        NotionClient(self.config, transport=replay).query_unchecked_items()
+
+        assert sleeps == [pytest.approx(0.091), pytest.approx(0.0775)]
+
+    def test_http_error_is_recorded_and_replayed(self, tmp_path) -> None:
+        path = str(tmp_path / "cassette.json")
+        inner = Mock(spec=Transport)
+        inner.send.side_effect = urllib.error.HTTPError(
+            "url",
+            404,
+            "Not Found",
+            None,  # type: ignore[arg-type]
+            io.BytesIO(b'{"message": "missing"}'),
+        )
+        with RecordingTransport(inner, path) as recorder:
+            with pytest.raises(NotionAPIError, match="HTTP error 404: .*missing"):
+                NotionClient(self.config, transport=recorder).query_unchecked_items()
+
+        with pytest.raises(NotionAPIError, match="HTTP error 404: .*missing"):
+            NotionClient(self.config, transport=ReplayTransport(path)).query_unchecked_items()
+
+    def test_replay_unknown_request_fails_loudly(self) -> None:
+        replay = ReplayTransport(os.path.join(CASSETTE_DIR, "query_and_comment.json"))
+        config = Config.from_dict(
+            {
+                "NOTION_API_KEY": "secret_test_key",
+                "NOTION_DATABASE_ID": "other-database",
+                "NOTION_PAGE_ID": "recorded-page",
+            }
+        )
+        with pytest.raises(CassetteError, match="other-database"):
+            NotionClient(config, transport=replay).query_unchecked_items()
+
+    def test_load_invalid_cassette(self, tmp_path) -> None:
+        path = tmp_path / "broken.json"
+        path.write_text("{not json")
+        with pytest.raises(CassetteError, match="Failed to load cassette"):
+            ReplayTransport(str(path))
+
+    @patch("urllib.request.urlopen")
+    def test_urllib_transport_passes_timeout(self, mock_urlopen: Mock) -> None:
+        mock_response = Mock()
+        mock_response.read.return_value = b"{}"
+        mock_response.getcode.return_value = 200
+        mock_urlopen.return_value.__enter__.return_value = mock_response
+
+        response = UrllibTransport(timeout=5).send(
+            TransportRequest(method="POST", url="https://example.com", headers={}, body=b"{}")
+        )
+
+        assert response.status == 200
+        assert mock_urlopen.call_args.kwargs == {"timeout": 5, "context": get_ssl_context()}
+
+    @patch("urllib.request.urlopen")
+    def test_urllib_transport_shares_ssl_context(self, mock_urlopen: Mock) -> None:
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = b"{}"
+        mock_urlopen.return_value.__enter__.return_value.getcode.return_value = 200
+        transport = UrllibTransport()
+
+        transport.send(TransportRequest(method="GET", url="https://example.com/a", headers={}))
+        transport.send(TransportRequest(method="GET", url="https://example.com/b", headers={}))
+        transport.send(TransportRequest(method="GET", url="http://127.0.0.1/c", headers={}))
+
+        contexts = [call.kwargs.get("context") for call in mock_urlopen.call_args_list]
+        assert contexts == [get_ssl_context(), get_ssl_context(), None]
@@ -0,0 +1,171 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+from src.shopping_reminder.async_notion_client import AsyncNotionClient, AsyncRateLimiter
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor, handler
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.notion_client import NotionClient
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+from src.shopping_reminder.usage import DEGRADED_MAX_COMMENT_ITEMS, UsageTracker
+from tests.shopping_reminder.test_async_notion_client import FakeNotionServer, _json_response
+
+# lambda_handler はフラットなモジュール名で import しているため、同じ共有インスタンスを使う
+from usage import get_usage_tracker
+
+DAY = 24 * 60 * 60
+QUERY = "POST api.notion.com/v1/databases/{id}/query"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1735689600.0  # 2025-01-01T00:00:00Z
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeTransport(Transport):
+    def __init__(self, responses: List[Dict[str, Any]]) -> None:
+        self.responses = iter(responses)
+        self.requests: List[TransportRequest] = []
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        self.requests.append(request)
+        return TransportResponse(status=200, body=json.dumps(next(self.responses)).encode())
+
+
+def _config(**settings: str) -> Config:
+    return Config.from_dict(
+        {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": "test_database_id",
+            "NOTION_PAGE_ID": "test_page_id",
+            **settings,
+        }
+    )
+
+
+class TestUsageTracker:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.clock = FakeClock()
+        self.tracker = UsageTracker(clock=self.clock)
+
+    def test_report_totals_and_endpoints(self) -> None:
+        self.tracker.record("db-1", QUERY, 100, 2000, 0.25)
+        self.tracker.record("db-1", QUERY, 120, 0, 0.5, error=True)
+        self.tracker.record_retry("db-1", QUERY)
+        self.tracker.record("db-1", "POST api.notion.com/v1/comments", 300, 50, 0.25)
+        self.tracker.record("db-2", QUERY, 100, 100, 1.0)
+
+        report = self.tracker.report("db-1")
+
+        assert report["day"] == "2025-01-01"
+        assert (report["requests"], report["retries"], report["errors"]) == (3, 1, 1)
+        assert (report["bytes_sent"], report["bytes_received"]) == (520, 2050)
+        assert report["seconds"] == 1.0
+        assert report["endpoints"][QUERY]["requests"] == 2
+        assert self.tracker.requests("db-1") == 3
+        assert self.tracker.requests("db-2") == 1
+
+    def test_resets_at_utc_midnight(self) -> None:
+        self.tracker.record("db-1", QUERY, 100, 100, 0.1)
+        self.clock.now += DAY
+
+        assert self.tracker.requests("db-1") == 0
+        assert self.tracker.report("db-1")["day"] == "2025-01-02"
+
+
+class TestClientUsage:
+    def test_sync_client_records_per_endpoint(self) -> None:
+        tracker = UsageTracker()
+        transport = FakeTransport(
+            [
+                {"results": [], "has_more": True, "next_cursor": "c1"},
+                {"results": [], "has_more": False, "next_cursor": None},
+            ]
+        )
+        client = NotionClient(_config(), transport=transport, usage=tracker)
+
+        client.query_unchecked_items()
+
+        endpoint = tracker.report("test_database_id")["endpoints"][QUERY]
+        assert endpoint["requests"] == 2
+        assert endpoint["bytes_sent"] == sum(len(r.body) for r in transport.requests)
+        assert endpoint["bytes_received"] > 0
+
+    def test_async_client_records_rate_limit_retries(self) -> None:
+        tracker = UsageTracker()
+        responses = iter(
+            [
+                (429, {"Retry-After": "0"}, b'{"object": "error"}'),
+                _json_response({"results": [], "has_more": False}),
+            ]
+        )
+
+        async def run() -> None:
+            async with FakeNotionServer(lambda request: next(responses)) as server:
+                async with AsyncNotionClient(
+                    _config(),
+                    base_url=server.base_url,
+                    rate_limiter=AsyncRateLimiter(rate_per_second=1000, burst=1000),
+                    usage=tracker,
+                ) as client:
+                    await client.query_unchecked_items()
+
+        asyncio.run(run())
+
+        report = tracker.report("test_database_id")
+        assert (report["requests"], report["retries"], report["errors"]) == (2, 1, 1)
+
+
+class TestRequestQuota:
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_over_quota_queries_top_items_only(self, mock_client_class: Mock) -> None:
+        tracker = UsageTracker()
+        for _ in range(5):
+            tracker.record("test_database_id", QUERY, 0, 0, 0.0)
+        mock_client = mock_client_class.return_value
+        mock_client.query_top_unchecked_items.return_value = ([], None)
+        processor = ShoppingReminderProcessor(
+            _config(DAILY_REQUEST_QUOTA="5"), query_cache=Mock(), usage=tracker
+        )
+
+        processor.query_items()
+
+        mock_client.query_top_unchecked_items.assert_called_once_with(DEGRADED_MAX_COMMENT_ITEMS)
+        mock_client.probe_watermark.assert_not_called()
+        mock_client.query_unchecked_items.assert_not_called()
+
+    @patch("src.shopping_reminder.lambda_handler.NotionClient")
+    def test_under_quota_queries_all_items(self, mock_client_class: Mock) -> None:
+        tracker = UsageTracker()
+        tracker.record("test_database_id", QUERY, 0, 0, 0.0)
+        mock_client = mock_client_class.return_value
+        mock_client.query_unchecked_items.return_value = []
+        processor = ShoppingReminderProcessor(_config(DAILY_REQUEST_QUOTA="5"), usage=tracker)
+
+        assert processor.query_items() == ([], None)
+        mock_client.query_top_unchecked_items.assert_not_called()
+
+
+class TestHandlerUsageReport:
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    def test_response_includes_usage(
+        self, mock_config_class: Mock, mock_processor_class: Mock
+    ) -> None:
+        mock_config_class.return_value.notion_database_id = "test_database_id"
+        mock_processor_class.return_value.process.return_value = NotificationResult(
+            success=True, message="ok"
+        )
+        get_usage_tracker().record("test_database_id", QUERY, 10, 20, 0.5)
+
+        response = handler({}, None)
+
+        usage = json.loads(response["body"])["usage"]
+        assert (usage["requests"], usage["bytes_sent"], usage["bytes_received"]) == (1, 10, 20)
+        assert list(usage["endpoints"]) == [QUERY]
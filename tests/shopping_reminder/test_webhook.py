@@ -0,0 +1,297 @@
+import base64
+import io
+import json
+import urllib.error
+from typing import Any, Dict, List, Optional
+from unittest.mock import Mock, patch
+
+from src.shopping_reminder.config import Config
+from src.shopping_reminder.item_state import ItemState
+from src.shopping_reminder.lambda_handler import ShoppingReminderProcessor, handler
+from src.shopping_reminder.models import NotificationResult
+from src.shopping_reminder.transport import Transport, TransportRequest, TransportResponse
+from src.shopping_reminder.webhook import compute_signature, is_webhook_event
+
+# WebhookProcessor は NotionAPIError をフラットなモジュール名で捕捉するため、同じものを使う
+from notion_client import NotionClient
+from webhook import WebhookProcessor
+
+TOKEN = "secret_webhook_token"
+DATABASE_ID = "1234abcd-0000-0000-0000-000000000000"
+
+
+def _page(
+    page_id: str,
+    name: str,
+    checked: bool = False,
+    last_edited_time: str = "2025-01-01T00:00:00.000Z",
+    database_id: str = DATABASE_ID,
+    archived: bool = False,
+) -> Dict[str, Any]:
+    return {
+        "object": "page",
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "archived": archived,
+        "in_trash": archived,
+        "parent": {"type": "database_id", "database_id": database_id},
+        "properties": {
+            "名前": {"title": [{"text": {"content": name}}]},
+            "完了": {"checkbox": checked},
+        },
+    }
+
+
+class FakePagesTransport(Transport):
+    """ページの取得とデータベースのクエリに応答する Notion API の代わり"""
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[TransportRequest] = []
+        self.fail_with: Optional[int] = None
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        self.requests.append(request)
+        if self.fail_with is not None:
+            raise urllib.error.HTTPError(
+                request.url, self.fail_with, "error", {}, io.BytesIO(b'{"object":"error"}')
+            )
+        if request.method == "GET" and "/pages/" in request.url:
+            page = self.pages.get(request.url.rsplit("/", 1)[1])
+            if page is None:
+                raise urllib.error.HTTPError(
+                    request.url, 404, "Not Found", {}, io.BytesIO(b'{"code":"object_not_found"}')
+                )
+            return TransportResponse(200, json.dumps(page).encode("utf-8"))
+        if request.method == "POST" and request.url.endswith("/query"):
+            results = [page for page in self.pages.values() if not page["archived"]]
+            results = [page for page in results if not page["properties"]["完了"]["checkbox"]]
+            body = {"results": results, "has_more": False, "next_cursor": None}
+            return TransportResponse(200, json.dumps(body).encode("utf-8"))
+        return TransportResponse(200, b'{"object":"comment"}')
+
+    def count(self, method: str) -> int:
+        return sum(1 for request in self.requests if request.method == method)
+
+
+class LocalWebhookEmitter:
+    """Notion の Webhook の代わりに、署名付きの関数 URL イベントを作成する"""
+
+    def __init__(self, token: str = TOKEN) -> None:
+        self.token = token
+        self.sequence = 0
+
+    def event(self, event_type: str, page_id: str, base64_encoded: bool = False) -> Dict[str, Any]:
+        self.sequence += 1
+        payload = {
+            "id": f"event-{self.sequence}",
+            "timestamp": "2025-01-01T00:00:00.000Z",
+            "type": event_type,
+            "entity": {"id": page_id, "type": "page"},
+            "data": {"parent": {"id": DATABASE_ID, "type": "database"}},
+        }
+        return self.raw(json.dumps(payload).encode("utf-8"), base64_encoded=base64_encoded)
+
+    def raw(
+        self, body: bytes, signature: Optional[str] = None, base64_encoded: bool = False
+    ) -> Dict[str, Any]:
+        if signature is None:
+            signature = compute_signature(body, self.token)
+        return {
+            "version": "2.0",
+            "rawPath": "/",
+            "headers": {"content-type": "application/json", "x-notion-signature": signature},
+            "requestContext": {"http": {"method": "POST", "path": "/"}},
+            "body": base64.b64encode(body).decode("ascii") if base64_encoded else body.decode(),
+            "isBase64Encoded": base64_encoded,
+        }
+
+
+class TestWebhookProcessor:
+    def setup_method(self) -> None:
+        """各テストメソッドの前に実行される"""
+        self.settings = {
+            "NOTION_API_KEY": "secret_test_key",
+            "NOTION_DATABASE_ID": DATABASE_ID.replace("-", ""),
+            "NOTION_PAGE_ID": "test_page_id",
+        }
+        self.config = Config.from_dict(
+            {**self.settings, "NOTION_WEBHOOK_VERIFICATION_TOKEN": TOKEN}
+        )
+        self.state = ItemState()
+        self.transport = FakePagesTransport()
+        self.client = NotionClient(self.config, transport=self.transport)
+        self.processor = WebhookProcessor(self.config, self.state, self.client)
+        self.emitter = LocalWebhookEmitter()
+
+    def teardown_method(self) -> None:
+        self.state.close()
+
+    def _names(self) -> List[str]:
+        return [item.name for item in self.state.unchecked_items(self.config.notion_database_id)]
+
+    def test_is_webhook_event(self) -> None:
+        assert is_webhook_event(self.emitter.event("page.created", "p1")) is True
+        assert is_webhook_event({}) is False
+        assert is_webhook_event({"source": "aws.events", "detail": {}}) is False
+
+    def test_created_page_is_added(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+
+        response = self.processor.handle(self.emitter.event("page.created", "p1"))
+
+        assert response.status == 200
+        assert self._names() == ["牛乳"]
+        assert self.transport.count("GET") == 1
+
+    def test_base64_encoded_body(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+
+        response = self.processor.handle(
+            self.emitter.event("page.created", "p1", base64_encoded=True)
+        )
+
+        assert response.status == 200
+        assert self._names() == ["牛乳"]
+
+    def test_checked_page_leaves_unchecked_items(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+        self.processor.handle(self.emitter.event("page.created", "p1"))
+
+        self.transport.pages["p1"] = _page(
+            "p1", "牛乳", checked=True, last_edited_time="2025-01-01T00:05:00.000Z"
+        )
+        self.processor.handle(self.emitter.event("page.properties_updated", "p1"))
+
+        assert self._names() == []
+
+    def test_deleted_page_is_removed_without_fetch(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+        self.processor.handle(self.emitter.event("page.created", "p1"))
+        self.transport.requests.clear()
+
+        response = self.processor.handle(self.emitter.event("page.deleted", "p1"))
+
+        assert response.status == 200
+        assert self._names() == []
+        assert self.transport.requests == []
+
+    def test_page_not_found_is_removed(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+        self.processor.handle(self.emitter.event("page.created", "p1"))
+        del self.transport.pages["p1"]
+
+        response = self.processor.handle(self.emitter.event("page.properties_updated", "p1"))
+
+        assert response.status == 200
+        assert self._names() == []
+
+    def test_archived_or_foreign_pages_are_removed(self) -> None:
+        self.transport.pages["p1"] = _page("p1", "牛乳", archived=True)
+        self.transport.pages["p2"] = _page("p2", "パン", database_id="other-database")
+
+        self.processor.handle(self.emitter.event("page.created", "p1"))
+        self.processor.handle(self.emitter.event("page.created", "p2"))
+
+        assert self._names() == []
+
+    def test_server_error_asks_notion_to_retry(self) -> None:
+        self.transport.fail_with = 502
+
+        response = self.processor.handle(self.emitter.event("page.created", "p1"))
+
+        assert response.status == 500
+        assert response.body["success"] is False
+
+    def test_other_events_are_ignored(self) -> None:
+        response = self.processor.handle(self.emitter.event("comment.created", "p1"))
+
+        assert response.status == 200
+        assert self.transport.requests == []
+
+    def test_invalid_signature_is_rejected(self) -> None:
+        event = self.emitter.raw(b'{"type":"page.created"}', signature="sha256=forged")
+
+        response = self.processor.handle(event)
+
+        assert response.status == 401
+        assert self.transport.requests == []
+
+    def test_missing_token_rejects_events(self) -> None:
+        processor = WebhookProcessor(Config.from_dict(self.settings), self.state, self.client)
+
+        response = processor.handle(self.emitter.event("page.created", "p1"))
+
+        assert response.status == 403
+
+    def test_verification_request_is_acknowledged(self) -> None:
+        processor = WebhookProcessor(Config.from_dict(self.settings), self.state, self.client)
+        event = self.emitter.raw(b'{"verification_token":"secret_new"}', signature="")
+
+        response = processor.handle(event)
+
+        assert response.status == 200
+
+    def test_invalid_body(self) -> None:
+        assert self.processor.handle(self.emitter.raw(b"not json")).status == 400
+
+    def test_events_replace_daily_full_query(self) -> None:
+        """初回の全件取得の後は、イベントで変更されたページだけを取得する"""
+        self.transport.pages["p1"] = _page("p1", "牛乳")
+        self.transport.pages["p2"] = _page("p2", "パン")
+        reminder = ShoppingReminderProcessor(self.config, item_state=self.state)
+        reminder.notion_client = self.client
+        assert reminder.process().success is True
+        assert self._names() == ["牛乳", "パン"]
+
+        self.transport.requests.clear()
+        self.transport.pages["p3"] = _page("p3", "卵")
+        self.transport.pages["p1"] = _page(
+            "p1", "牛乳", checked=True, last_edited_time="2025-01-02T00:00:00.000Z"
+        )
+        self.processor.handle(self.emitter.event("page.created", "p3"))
+        self.processor.handle(self.emitter.event("page.properties_updated", "p1"))
+        assert reminder.process().success is True
+
+        # ページ取得2件とコメント1件のみで、データベースのクエリは行わない
+        assert self.transport.count("GET") == 2
+        assert len(self.transport.requests) == 3
+        assert not any(request.url.endswith("/query") for request in self.transport.requests)
+        comment = json.loads(self.transport.requests[-1].body)
+        message = comment["rich_text"][0]["text"]["content"]
+        assert "• パン" in message and "• 卵" in message and "牛乳" not in message
+
+
+class TestHandlerWebhookRouting:
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    @patch("src.shopping_reminder.lambda_handler.WebhookProcessor")
+    def test_webhook_event_is_routed(
+        self, mock_webhook_class: Mock, mock_processor_class: Mock, mock_config_class: Mock
+    ) -> None:
+        mock_webhook_class.return_value.handle.return_value = Mock(
+            status=200, body={"success": True, "message": "Updated p1"}
+        )
+        event = LocalWebhookEmitter().event("page.created", "p1")
+
+        response = handler(event, Mock())
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["message"] == "Updated p1"
+        mock_webhook_class.return_value.handle.assert_called_once_with(event)
+        mock_processor_class.assert_not_called()
+
+    @patch("src.shopping_reminder.lambda_handler.Config")
+    @patch("src.shopping_reminder.lambda_handler.ShoppingReminderProcessor")
+    @patch("src.shopping_reminder.lambda_handler.WebhookProcessor")
+    def test_scheduled_event_runs_reminder(
+        self, mock_webhook_class: Mock, mock_processor_class: Mock, mock_config_class: Mock
+    ) -> None:
+        mock_processor_class.return_value.process.return_value = NotificationResult(
+            success=True, message="ok"
+        )
+
+        response = handler({"source": "aws.events"}, Mock())
+
+        assert response["statusCode"] == 200
+        mock_webhook_class.assert_not_called()